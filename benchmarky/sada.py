@@ -0,0 +1,403 @@
+# benchmarky/sada.py
+#
+# Sada výkonnostních měření hlavních částí simulace: generování cen, simulace portfolia
+# (jednotlivá cesta, sdílené ceny, Monte Carlo, porovnání mnoha portfolií), rebalancování
+# a kontrola odchylky, statistiky, exporty a grafy. Každé měření běží pro několik velikostí úlohy
+# (počet dní, počet aktiv, počet scénářů); výsledky se ukládají do JSON.
+#
+#   python benchmarky/sada.py spust [--profil rychly|plny] [--filtr REGEX] [--vystup soubor.json]
+#   python benchmarky/sada.py porovnej zaklad.json novy.json [--prah 0.15]
+#
+# `porovnej` vrací návratový kód 1, pokud je některé měření pomalejší než základ o víc než prah.
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import re
+import subprocess
+import sys
+import tempfile
+import time
+import warnings
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+
+SLOZKA_VYSLEDKU = os.path.join(KOREN, "benchmarky", "vysledky")
+SEED = 42
+
+# Velikosti úloh. Rozměry se mění po jednom (ostatní zůstávají na výchozí hodnotě),
+# aby největší případy zůstaly v rozumné paměti (50 000 dní x 500 aktiv x 1000 scénářů by nestačilo).
+PROFILY = {
+    "rychly": {
+        "dni": [252, 2520],
+        "aktiva": [4, 50],
+        "scenare": [10, 100],
+        "vychozi_dni": 2520,
+        "vychozi_aktiva": 4,
+        "opakovani": 3,
+    },
+    "plny": {
+        "dni": [252, 2520, 10000, 50000],
+        "aktiva": [4, 50, 200, 500],
+        "scenare": [1, 100, 1000],
+        "vychozi_dni": 2520,
+        "vychozi_aktiva": 4,
+        "opakovani": 5,
+    },
+}
+
+# ========================
+# VSTUPNÍ DATA
+# ========================
+
+def synteticke_portfolio(pocet_aktiv):
+    """Portfolio s `pocet_aktiv` aktivy střídajících typy z konfigurace, stejné váhy, cena 100."""
+    from konfigurace import PARAMETRY_TYPU_AKTIVA
+    from portfolio import Portfolio, vypocitej_zakladni_mnozstvi
+    typy = list(PARAMETRY_TYPU_AKTIVA)
+    portfolio = Portfolio(
+        [f"A{j}" for j in range(pocet_aktiv)],
+        [typy[j % len(typy)] for j in range(pocet_aktiv)],
+        np.full(pocet_aktiv, 100.0),
+        np.full(pocet_aktiv, 1.0 / pocet_aktiv),
+        np.full(pocet_aktiv, 0.5),
+    )
+    vypocitej_zakladni_mnozstvi(portfolio, 100000)
+    return portfolio
+
+def _parametry_simulace():
+    return {"rebalancovaci_perioda": 63, "zpusob_rebalancovani": "kombinovane",
+            "tolerance_vahy": 0.05, "transakcni_poplatek": 0.01}
+
+def _simulovane_portfolio(pocet_dni, pocet_aktiv):
+    """Portfolio po simulaci (ceny, historie množství) a jeho vývoj a historie rebalancování."""
+    import simulace as sim
+    portfolio = synteticke_portfolio(pocet_aktiv)
+    p = _parametry_simulace()
+    vyvoj, historie = sim.simuluj_portfolio(
+        portfolio, portfolio.cilove_vahy(), pocet_dni, p["rebalancovaci_perioda"],
+        p["zpusob_rebalancovani"], p["tolerance_vahy"], p["transakcni_poplatek"], rng=SEED
+    )
+    return portfolio, vyvoj, historie
+
+# ========================
+# MĚŘENÉ PŘÍPADY
+# ========================
+# Každý případ je funkce (velikosti) -> funkce bez argumentů, která provede měřenou operaci.
+# Příprava (generování vstupů) se do času nezapočítává.
+
+def _pripad_generuj_sdilene_ceny(dni, aktiva):
+    import simulace as sim
+    portfolio = synteticke_portfolio(aktiva)
+    return lambda: sim.generuj_sdilene_ceny(portfolio, dni, rng=SEED)
+
+def _pripad_simuluj_portfolio(dni, aktiva):
+    import simulace as sim
+    portfolio = synteticke_portfolio(aktiva)
+    p = _parametry_simulace()
+
+    def beh():
+        kopie = portfolio.kopie()
+        sim.simuluj_portfolio(kopie, kopie.cilove_vahy(), dni, p["rebalancovaci_perioda"],
+                              p["zpusob_rebalancovani"], p["tolerance_vahy"], p["transakcni_poplatek"],
+                              rng=SEED)
+    return beh
+
+def _pripad_simuluj_portfolio_sdilene(dni, aktiva):
+    import simulace as sim
+    portfolio = synteticke_portfolio(aktiva)
+    ceny = sim.generuj_sdilene_ceny(portfolio, dni, rng=SEED)
+    p = _parametry_simulace()
+
+    def beh():
+        kopie = portfolio.kopie()
+        sim.simuluj_portfolio_sdilene(kopie, kopie.cilove_vahy(), ceny, p["rebalancovaci_perioda"],
+                                      p["zpusob_rebalancovani"], p["tolerance_vahy"],
+                                      p["transakcni_poplatek"])
+    return beh
+
+def _pripad_simuluj_portfolio_mc(dni, aktiva, scenare):
+    import simulace as sim
+    portfolio = synteticke_portfolio(aktiva)
+    p = _parametry_simulace()
+    return lambda: sim.simuluj_portfolio_mc(
+        portfolio.kopie(), portfolio.cilove_vahy(), dni, scenare, p["rebalancovaci_perioda"],
+        p["zpusob_rebalancovani"], p["tolerance_vahy"], p["transakcni_poplatek"], rng=SEED
+    )
+
+def _pripad_porovnej_portfolia(dni, aktiva, scenare, pocet_portfolii=100):
+    """Dávkové porovnání `pocet_portfolii` náhodných vektorů vah na stejných scénářích."""
+    import porovnani as po
+    vesmir = synteticke_portfolio(aktiva)
+    vahy = np.random.default_rng(SEED).dirichlet(np.ones(aktiva), pocet_portfolii)
+    nazvy = [f"P{i}" for i in range(pocet_portfolii)]
+    p = _parametry_simulace()
+    return lambda: po.porovnej_portfolia(
+        vesmir, nazvy, vahy, dni, scenare, p["rebalancovaci_perioda"], p["zpusob_rebalancovani"],
+        p["tolerance_vahy"], p["transakcni_poplatek"], rng=SEED
+    )
+
+def _pripad_rebalancuj_portfolio(dni, aktiva):
+    """Rebalancování v každém 21. dni celé historie (jednotlivá volání rebalancuj_portfolio)."""
+    from rebalancovani import rebalancuj_portfolio
+    portfolio, _, _ = _simulovane_portfolio(dni, aktiva)
+    cilove_vahy = portfolio.cilove_vahy()
+    mnozstvi = portfolio.mnozstvi.copy()
+
+    def beh():
+        portfolio.mnozstvi = mnozstvi.copy()
+        portfolio.historie_mnozstvi = None
+        historie = []
+        for den in range(21, dni + 1, 21):
+            rebalancuj_portfolio(portfolio, den, cilove_vahy, historie, 0.01)
+    return beh
+
+def _pripad_je_odchylka_prilis_velka(dni, aktiva):
+    """Kontrola odchylky vah v každém dni celé historie (jednotlivá volání)."""
+    from rebalancovani import je_odchylka_prilis_velka
+    portfolio, _, _ = _simulovane_portfolio(dni, aktiva)
+    cilove_vahy = portfolio.cilove_vahy()
+
+    def beh():
+        for den in range(dni + 1):
+            je_odchylka_prilis_velka(portfolio, cilove_vahy, 0.05, den)
+    return beh
+
+def _pripad_spocitej_statistiky(dni, aktiva):
+    import statistiky as stat
+    _, vyvoj, _ = _simulovane_portfolio(dni, aktiva)
+    return lambda: stat.spocitej_statistiky(vyvoj)
+
+def _pripad_souhrn_scenaru(dni, aktiva, scenare):
+    import statistiky as stat
+    rng = np.random.default_rng(SEED)
+    hodnoty = 100000 * np.cumprod(1 + rng.normal(0.0003, 0.01, (scenare, dni)), axis=1)
+    return lambda: stat.souhrn_scenaru(hodnoty)
+
+def _pripad_export_csv(dni, aktiva):
+    """Všechny CSV exporty jednoho portfolia (transakce, vývoj, ceny, statistiky)."""
+    import soubory as f
+    portfolio, vyvoj, historie = _simulovane_portfolio(dni, aktiva)
+
+    def beh():
+        f.uloz_transakce_do_csv(historie, prefix="bench")
+        f.uloz_vyvoj_portfolia_do_csv(vyvoj, prefix="bench")
+        f.uloz_ceny_aktiv_do_csv(portfolio, prefix="bench")
+        f.uloz_statistiky_do_csv(vyvoj, prefix="bench")
+    return beh
+
+def _pripad_export_npz(dni, aktiva):
+    import soubory as f
+    portfolio, vyvoj, historie = _simulovane_portfolio(dni, aktiva)
+    return lambda: f.uloz_vysledky_binarne("bench", "npz", portfolio, vyvoj, historie)
+
+def _pripad_graf_vyvoj_portfolia(dni, aktiva):
+    import grafy
+    _, vyvoj, _ = _simulovane_portfolio(dni, aktiva)
+    grafy.nastav_vystup(dpi=100)
+    return lambda: grafy.vykresli_vyvoj_portfolia(vyvoj, prefix="bench")
+
+def _pripad_graf_ceny_aktiv(dni, aktiva):
+    import grafy
+    portfolio, _, _ = _simulovane_portfolio(dni, aktiva)
+    grafy.nastav_vystup(dpi=100)
+    return lambda: grafy.vykresli_ceny_aktiv(portfolio, prefix="bench")
+
+# (název, funkce případu, rozměry, které se mění)
+PRIPADY = [
+    ("generuj_sdilene_ceny", _pripad_generuj_sdilene_ceny, ("dni", "aktiva")),
+    ("simuluj_portfolio", _pripad_simuluj_portfolio, ("dni", "aktiva")),
+    ("simuluj_portfolio_sdilene", _pripad_simuluj_portfolio_sdilene, ("dni", "aktiva")),
+    ("simuluj_portfolio_mc", _pripad_simuluj_portfolio_mc, ("scenare",)),
+    ("porovnej_portfolia", _pripad_porovnej_portfolia, ("scenare",)),
+    ("rebalancuj_portfolio", _pripad_rebalancuj_portfolio, ("dni", "aktiva")),
+    ("je_odchylka_prilis_velka", _pripad_je_odchylka_prilis_velka, ("dni", "aktiva")),
+    ("spocitej_statistiky", _pripad_spocitej_statistiky, ("dni",)),
+    ("souhrn_scenaru", _pripad_souhrn_scenaru, ("scenare",)),
+    ("export_csv", _pripad_export_csv, ("dni", "aktiva")),
+    ("export_npz", _pripad_export_npz, ("dni", "aktiva")),
+    ("graf_vyvoj_portfolia", _pripad_graf_vyvoj_portfolia, ("dni",)),
+    ("graf_ceny_aktiv", _pripad_graf_ceny_aktiv, ("dni", "aktiva")),
+]
+
+def velikosti_pripadu(rozmery, profil):
+    """
+    Seznam slovníků velikostí pro případ: každý měněný rozměr projde své hodnoty,
+    ostatní zůstanou na výchozí hodnotě profilu (bez duplicit).
+    """
+    vychozi = {"dni": profil["vychozi_dni"], "aktiva": profil["vychozi_aktiva"]}
+    if "scenare" in rozmery:
+        vychozi["scenare"] = profil["scenare"][0]
+    velikosti = []
+    for rozmer in rozmery:
+        for hodnota in profil[rozmer]:
+            velikost = dict(vychozi, **{rozmer: hodnota})
+            if velikost not in velikosti:
+                velikosti.append(velikost)
+    return velikosti
+
+def id_mereni(nazev, velikost):
+    """Stabilní identifikátor měření, např. 'simuluj_portfolio[dni=2520,aktiva=4]'."""
+    return nazev + "[" + ",".join(f"{k}={v}" for k, v in velikost.items()) + "]"
+
+# ========================
+# MĚŘENÍ
+# ========================
+
+def zmer(beh, opakovani):
+    """Časy `opakovani` běhů funkce v sekundách (výstup a varování funkce se potlačí)."""
+    casy = []
+    for _ in range(opakovani):
+        with contextlib.redirect_stdout(io.StringIO()), warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            zacatek = time.perf_counter()
+            beh()
+            casy.append(time.perf_counter() - zacatek)
+    return casy
+
+def _popis_prostredi():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=KOREN,
+                                capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {
+        "cas": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platforma": platform.platform(),
+        "pocet_jader": os.cpu_count(),
+    }
+
+def spust(profil="rychly", filtr=None, opakovani=None):
+    """Spustí všechna měření profilu (volitelně jen ta, jejichž id odpovídá regulárnímu výrazu `filtr`)."""
+    nastaveni = PROFILY[profil]
+    opakovani = opakovani or nastaveni["opakovani"]
+    vzor = re.compile(filtr) if filtr else None
+    vysledky = {}
+
+    puvodni_slozka = os.getcwd()
+    with tempfile.TemporaryDirectory() as slozka:
+        # Exporty a grafy zapisují do ./vystupy – měří se v dočasné složce
+        os.chdir(slozka)
+        try:
+            for nazev, pripad, rozmery in PRIPADY:
+                for velikost in velikosti_pripadu(rozmery, nastaveni):
+                    identifikator = id_mereni(nazev, velikost)
+                    if vzor and not vzor.search(identifikator):
+                        continue
+                    with contextlib.redirect_stdout(io.StringIO()):
+                        beh = pripad(**velikost)
+                    # Zahřívací běh (importy, alokace) se nezapočítává
+                    zmer(beh, 1)
+                    casy = zmer(beh, opakovani)
+                    median = float(np.median(casy))
+                    vysledky[identifikator] = {
+                        "nazev": nazev,
+                        "velikost": velikost,
+                        "casy_s": casy,
+                        "median_s": median,
+                        "minimum_s": min(casy),
+                    }
+                    print(f"{identifikator:<60}{median * 1000:>12.2f} ms")
+        finally:
+            os.chdir(puvodni_slozka)
+
+    return {"prostredi": _popis_prostredi(), "profil": profil, "opakovani": opakovani, "vysledky": vysledky}
+
+# ========================
+# POROVNÁNÍ
+# ========================
+
+def porovnej(zaklad, novy, prah=0.15, min_rozdil=0.002):
+    """
+    Porovná mediány měření dvou běhů. Regrese je měření, které je pomalejší o víc než `prah`
+    (relativně) a zároveň o víc než `min_rozdil` sekund (šum u velmi krátkých měření).
+    Vrací seznam řádků (id, zaklad_s, novy_s, pomer, stav).
+    """
+    radky = []
+    for identifikator in sorted(set(zaklad["vysledky"]) | set(novy["vysledky"])):
+        a = zaklad["vysledky"].get(identifikator)
+        b = novy["vysledky"].get(identifikator)
+        if a is None or b is None:
+            radky.append((identifikator, a and a["median_s"], b and b["median_s"], None,
+                          "jen v základu" if b is None else "nové"))
+            continue
+        pomer = b["median_s"] / a["median_s"] if a["median_s"] > 0 else float("inf")
+        rozdil = b["median_s"] - a["median_s"]
+        if pomer > 1 + prah and rozdil > min_rozdil:
+            stav = "REGRESE"
+        elif pomer < 1 / (1 + prah) and -rozdil > min_rozdil:
+            stav = "zrychlení"
+        else:
+            stav = "ok"
+        radky.append((identifikator, a["median_s"], b["median_s"], pomer, stav))
+    return radky
+
+def vypis_porovnani(radky):
+    print(f"{'Měření':<60}{'Základ (ms)':>13}{'Nový (ms)':>13}{'Poměr':>8}  Stav")
+    for identifikator, a, b, pomer, stav in radky:
+        a_text = f"{a * 1000:.2f}" if a is not None else "-"
+        b_text = f"{b * 1000:.2f}" if b is not None else "-"
+        pomer_text = f"{pomer:.2f}" if pomer is not None else "-"
+        print(f"{identifikator:<60}{a_text:>13}{b_text:>13}{pomer_text:>8}  {stav}")
+    regrese = sum(1 for r in radky if r[4] == "REGRESE")
+    print(f"\nRegresí: {regrese} z {len(radky)} měření.")
+    return regrese
+
+# ========================
+# SPUŠTĚNÍ
+# ========================
+
+def _nacti_json(cesta):
+    with open(cesta, encoding="utf-8") as f:
+        return json.load(f)
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Výkonnostní měření simulace portfolia.")
+    prikazy = parser.add_subparsers(dest="prikaz", required=True)
+
+    p_spust = prikazy.add_parser("spust", help="spustit měření a uložit výsledky do JSON")
+    p_spust.add_argument("--profil", choices=sorted(PROFILY), default="rychly")
+    p_spust.add_argument("--filtr", help="regulární výraz pro výběr měření podle id")
+    p_spust.add_argument("--opakovani", type=int, help="počet měřených běhů (výchozí podle profilu)")
+    p_spust.add_argument("--vystup", help="cílový JSON (výchozí benchmarky/vysledky/<profil>_<čas>.json)")
+    p_spust.add_argument("--zaklad", help="po měření porovnat se základním JSON")
+    p_spust.add_argument("--prah", type=float, default=0.15, help="relativní zpomalení hlášené jako regrese")
+
+    p_porovnej = prikazy.add_parser("porovnej", help="porovnat dva uložené běhy")
+    p_porovnej.add_argument("zaklad")
+    p_porovnej.add_argument("novy")
+    p_porovnej.add_argument("--prah", type=float, default=0.15, help="relativní zpomalení hlášené jako regrese")
+
+    args = parser.parse_args(argv)
+
+    if args.prikaz == "porovnej":
+        regrese = vypis_porovnani(porovnej(_nacti_json(args.zaklad), _nacti_json(args.novy), args.prah))
+        return 1 if regrese else 0
+
+    vysledek = spust(args.profil, args.filtr, args.opakovani)
+    vystup = args.vystup or os.path.join(
+        SLOZKA_VYSLEDKU, f"{args.profil}_{time.strftime('%Y%m%d_%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(vystup)), exist_ok=True)
+    with open(vystup, "w", encoding="utf-8") as f:
+        json.dump(vysledek, f, indent=2, ensure_ascii=False)
+    print(f"Výsledky uloženy do '{vystup}'")
+
+    if args.zaklad:
+        print()
+        regrese = vypis_porovnani(porovnej(_nacti_json(args.zaklad), vysledek, args.prah))
+        return 1 if regrese else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
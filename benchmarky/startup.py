@@ -0,0 +1,85 @@
+# benchmarky/startup.py
+#
+# Regresní měření doby startu headless běhu: `cli.py simulate --no-plots --no-export`
+# s krátkým horizontem. Kontroluje také, že se při běhu bez grafů nenačetla grafická knihovna.
+#
+#   python benchmarky/startup.py [--opakovani 5] [--limit 1.0]
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TEZKE_MODULY = ("matplotlib", "seaborn", "pandas", "plotly")
+
+# Spustí CLI ve stejném procesu a vypíše, které těžké moduly se načetly
+KONTROLA_IMPORTU = """
+import sys
+sys.path.insert(0, {koren!r})
+import cli
+cli.main({argv!r})
+print("NACTENE_MODULY=" + ",".join(m for m in {tezke!r} if m in sys.modules))
+"""
+
+def zmer_start(argv, opakovani, slozka):
+    """Doba běhu `python cli.py <argv>` v sekundách pro každé opakování."""
+    casy = []
+    for _ in range(opakovani):
+        zacatek = time.perf_counter()
+        subprocess.run([sys.executable, os.path.join(KOREN, "cli.py")] + argv,
+                       cwd=slozka, check=True, stdout=subprocess.DEVNULL)
+        casy.append(time.perf_counter() - zacatek)
+    return casy
+
+def nactene_moduly(argv, slozka):
+    """Seznam těžkých modulů načtených během běhu CLI."""
+    kod = KONTROLA_IMPORTU.format(argv=argv, koren=KOREN, tezke=TEZKE_MODULY)
+    vystup = subprocess.run([sys.executable, "-c", kod], cwd=slozka, check=True,
+                            capture_output=True, text=True).stdout
+    radek = [r for r in vystup.splitlines() if r.startswith("NACTENE_MODULY=")][-1]
+    return [m for m in radek.split("=", 1)[1].split(",") if m]
+
+def main():
+    parser = argparse.ArgumentParser(description="Měření doby startu CLI bez grafů.")
+    parser.add_argument("--opakovani", type=int, default=5)
+    parser.add_argument("--limit", type=float, default=1.0, help="maximální přípustný medián (s)")
+    parser.add_argument("--json", help="uložit výsledek do JSON souboru")
+    args = parser.parse_args()
+
+    argv = ["simulate", "--no-plots", "--no-export", "--dni", "252", "--scenare", "1",
+            "--konfigurace", os.path.join(KOREN, "konfigurace.csv")]
+    with tempfile.TemporaryDirectory() as slozka:
+        casy = zmer_start(argv, args.opakovani, slozka)
+        moduly = nactene_moduly(argv, slozka)
+
+    median = sorted(casy)[len(casy) // 2]
+    vysledek = {
+        "prikaz": " ".join(argv[:-2]),
+        "casy_s": casy,
+        "median_s": median,
+        "minimum_s": min(casy),
+        "limit_s": args.limit,
+        "nactene_tezke_moduly": moduly,
+    }
+    print(f"Start `cli.py {vysledek['prikaz']}`: medián {median:.3f} s, minimum {min(casy):.3f} s "
+          f"(limit {args.limit:.2f} s, {args.opakovani} opakování)")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(vysledek, f, indent=2)
+
+    chyby = []
+    if median > args.limit:
+        chyby.append(f"medián {median:.3f} s překročil limit {args.limit:.2f} s")
+    if moduly:
+        chyby.append(f"běh bez grafů načetl moduly: {', '.join(moduly)}")
+    for chyba in chyby:
+        print(f"REGRESE: {chyba}")
+    return 1 if chyby else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
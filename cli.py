@@ -0,0 +1,161 @@
+# cli.py
+
+import argparse
+import sys
+
+# Těžké moduly (numpy, matplotlib, pandas, plotly...) se importují až uvnitř příkazů –
+# `--help` ani běh s --no-plots grafickou knihovnu vůbec nenačtou.
+
+# ========================
+# PARAMETRY PŘÍKAZOVÉ ŘÁDKY
+# ========================
+
+def _spolecne_parametry(parser):
+    """Parametry společné pro simulate, sweep a compare."""
+    parser.add_argument("--konfigurace", default="konfigurace.csv",
+                        help="konfigurační CSV soubor (výchozí: konfigurace.csv)")
+    parser.add_argument("--portfolia", nargs="+", metavar="CSV",
+                        help="vstupní soubory portfolií (výchozí: ukázková portfolia)")
+    parser.add_argument("--no-plots", action="store_true", help="nevykreslovat grafy")
+    parser.add_argument("--no-export", action="store_true", help="neukládat CSV/binární výstupy")
+    parser.add_argument("--format-vystupu", choices=["csv", "npy", "npz", "parquet"],
+                        help="formát exportu výsledků (přepíše konfiguraci)")
+    parser.add_argument("--dni", type=int, help="počet simulovaných dní")
+    parser.add_argument("--scenare", type=int, help="počet Monte Carlo scénářů")
+    parser.add_argument("--seed", type=int, help="seed generátoru náhodných čísel")
+    parser.add_argument("--procesy", type=int, help="počet procesů simulace (0 = všechna jádra)")
+    parser.add_argument("--model", help="model vývoje cen (viz modely.MODELY)")
+    parser.add_argument("--redukce-rozptylu", choices=["zadna", "antiteticke", "sobol"],
+                        help="redukce rozptylu scénářů: antitetické páry nebo Sobolova posloupnost")
+    parser.add_argument("--kontrolni-promenna", action="store_true",
+                        help="odhad průměrů s kontrolní proměnnou (konečná hodnota bez rebalancování)")
+    parser.add_argument("--historicka-data", metavar="CSV",
+                        help="CSV s historickými cenami (datum + sloupec na ticker) pro backtest a model bootstrap")
+    parser.add_argument("--backtest", action="store_true", help="simulovat nad skutečnými historickými cenami")
+    parser.add_argument("--mereni", action="store_true",
+                        help="měřit časy etap a čítače (souhrn + JSON ve vystupy/mereni)")
+    parser.add_argument("--profilovat", action="store_true", help="s --mereni navíc cProfile každé etapy")
+    parser.add_argument("--sledovat-pamet", action="store_true", help="s --mereni navíc špičky paměti (tracemalloc)")
+
+def _prepsani(args):
+    """Hodnoty z příkazové řádky, které přepíší konfigurační soubor (stejné klíče jako konfigurace.csv)."""
+    prepsat = {
+        "format_vystupu": args.format_vystupu,
+        "pocet_dni": args.dni,
+        "pocet_scenaru": args.scenare,
+        "seed": float(args.seed) if args.seed is not None else None,
+        "pocet_procesu": args.procesy,
+        "model": args.model,
+        "redukce_rozptylu": args.redukce_rozptylu,
+        "kontrolni_promenna": args.kontrolni_promenna or None,
+        "historicka_data": args.historicka_data,
+        "historicky_backtest": args.backtest or None,
+        "mereni": args.mereni or args.profilovat or args.sledovat_pamet or None,
+        "mereni_profil": args.profilovat or None,
+        "mereni_pamet": args.sledovat_pamet or None,
+    }
+    if getattr(args, "prikaz", None) == "simulate":
+        prepsat.update({
+            "adaptivni_mc": args.adaptivni or None,
+            "adaptivni_tolerance": args.ci_tolerance,
+            "adaptivni_max_scenaru": args.max_scenaru,
+            "adaptivni_max_cas_s": args.max_cas,
+            "cache_behu": args.cache or None,
+            "cache_behu_vymazat": args.clear_cache or None,
+        })
+        if args.no_cache:
+            prepsat.update({"cache_behu": False, "cache_scenaru": False, "preskakovat_nezmenene_grafy": False})
+    if getattr(args, "prikaz", None) == "sweep":
+        prepsat.update({
+            "pruzkum": True,
+            "pruzkum_periody": args.periody,
+            "pruzkum_tolerance": args.tolerance,
+            "pruzkum_poplatky": args.poplatky,
+            "pruzkum_zpusoby": args.zpusoby,
+        })
+    if getattr(args, "prikaz", None) == "compare":
+        prepsat.update({
+            "porovnani_vahy": args.vahy,
+            "porovnani_razeni": args.razeni,
+            "porovnani_pocet": args.pocet,
+        })
+    return {klic: hodnota for klic, hodnota in prepsat.items() if hodnota is not None}
+
+def vytvor_parser():
+    parser = argparse.ArgumentParser(
+        prog="portfolio",
+        description="Simulace a rebalancování investičních portfolií."
+    )
+    prikazy = parser.add_subparsers(dest="prikaz", required=True)
+
+    simulate = prikazy.add_parser("simulate", help="simulace portfolií, exporty a grafy")
+    _spolecne_parametry(simulate)
+    simulate.add_argument("--adaptivni", action="store_true",
+                          help="Monte Carlo po dávkách, dokud intervaly spolehlivosti metrik nejsou užší než tolerance")
+    simulate.add_argument("--ci-tolerance", type=float,
+                          help="relativní šířka intervalu spolehlivosti pro ukončení adaptivního MC (např. 0.01)")
+    simulate.add_argument("--max-scenaru", type=int, help="rozpočet scénářů adaptivního MC")
+    simulate.add_argument("--max-cas", type=float, help="časový rozpočet adaptivního MC v sekundách")
+    simulate.add_argument("--cache", action="store_true",
+                          help="mezipaměť běhu: opakovaný běh se stejnými vstupy vezme hotové etapy z disku")
+    simulate.add_argument("--no-cache", action="store_true",
+                          help="nepoužívat mezipaměť běhu, úložiště scénářů ani přeskakování nezměněných grafů")
+    simulate.add_argument("--clear-cache", action="store_true",
+                          help="před během vymazat mezipaměť běhu a otisky vykreslených grafů")
+
+    sweep = prikazy.add_parser("sweep", help="průzkum parametrů rebalancování na sdílených scénářích")
+    _spolecne_parametry(sweep)
+    sweep.add_argument("--periody", help="rebalancovací periody, např. \"21;63;126\"")
+    sweep.add_argument("--tolerance", help="tolerance vah, např. \"0.02;0.05\"")
+    sweep.add_argument("--poplatky", help="transakční poplatky, např. \"0.001;0.005\"")
+    sweep.add_argument("--zpusoby", help="způsoby rebalancování, např. \"periodicky;kombinovane\"")
+
+    compare = prikazy.add_parser("compare", help="porovnání mnoha portfolií (matice vah) na stejných scénářích")
+    _spolecne_parametry(compare)
+    compare.add_argument("--vahy", metavar="CSV",
+                         help="široké CSV vektorů vah (portfolio + sloupec na aktivum) nad aktivy vstupních portfolií")
+    compare.add_argument("--razeni", help="metrika řazení tabulky (výchozí sharpe_ratio)")
+    compare.add_argument("--pocet", type=int, help="počet vypsaných nejlepších portfolií")
+
+    report = prikazy.add_parser("report", help="statistiky a grafy z uložených výsledků bez simulace")
+    report.add_argument("--konfigurace", default="konfigurace.csv",
+                        help="konfigurační CSV soubor (výchozí: konfigurace.csv)")
+    report.add_argument("--portfolia", nargs="+", metavar="NAZEV",
+                        help="portfolia (složky ve vystupy/ nebo jejich vstupní CSV); výchozí jsou všechna")
+    report.add_argument("--no-plots", action="store_true", help="nevykreslovat grafy")
+    report.add_argument("--no-export", action="store_true", help="neukládat statistiky do CSV/TXT")
+
+    return parser
+
+# ========================
+# SPUŠTĚNÍ
+# ========================
+
+def main(argv=None):
+    args = vytvor_parser().parse_args(argv)
+    import main as aplikace
+
+    if args.prikaz == "report":
+        import os
+        prefixy = [os.path.splitext(os.path.basename(p))[0] for p in args.portfolia or []]
+        aplikace.report(prefixy, soubor_konfigurace=args.konfigurace,
+                        vykreslit=not args.no_plots, exportovat=not args.no_export)
+        return 0
+
+    if args.prikaz == "compare":
+        aplikace.porovnej(soubor_konfigurace=args.konfigurace, vstupni_soubory=args.portfolia,
+                          exportovat=not args.no_export, prepsat=_prepsani(args))
+        return 0
+
+    aplikace.main(
+        soubor_konfigurace=args.konfigurace,
+        vstupni_soubory=args.portfolia,
+        vykreslit=not args.no_plots,
+        exportovat=not args.no_export,
+        prepsat=_prepsani(args)
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
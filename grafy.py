@@ -1,93 +1,149 @@
 # grafy.py
 
 import os
+import numpy as np
+import matplotlib
+matplotlib.use("Agg")  # grafy se jen ukládají do souborů – bez interaktivního okna
 import matplotlib.pyplot as plt
 import seaborn as sns
 import pandas as pd
 import plotly.graph_objs as go
 
+# Nastavení ukládaných obrázků (mění se přes nastav_vystup)
+# max_bodu -- nejvyšší počet bodů jedné křivky v grafu (0 = bez zmenšování)
+NASTAVENI_VYSTUPU = {"dpi": 300, "format": "png", "max_bodu": 2000}
+
+def nastav_vystup(dpi=None, format=None, max_bodu=None):
+    """Nastaví rozlišení (dpi), formát ukládaných grafů (png, svg, pdf, jpg...) a počet bodů křivky."""
+    if dpi is not None:
+        NASTAVENI_VYSTUPU["dpi"] = dpi
+    if format is not None:
+        NASTAVENI_VYSTUPU["format"] = format.lower().lstrip(".")
+    if max_bodu is not None:
+        NASTAVENI_VYSTUPU["max_bodu"] = int(max_bodu)
+
+# ========================
+# ZMENŠENÍ POČTU BODŮ
+# ========================
+
+def lttb(y, pocet_bodu, x=None):
+    """
+    Vybere `pocet_bodu` bodů křivky metodou Largest-Triangle-Three-Buckets.
+    Křivka se rozdělí na koše a z každého se vezme bod, který s vybraným bodem předchozího koše
+    a průměrem následujícího koše tvoří největší trojúhelník – zachovají se vrcholy a propady.
+    První a poslední bod zůstávají vždy. Vrací vzestupné indexy vybraných bodů.
+    """
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if pocet_bodu <= 2 or n <= pocet_bodu:
+        return np.arange(n)
+    x = np.arange(n, dtype=float) if x is None else np.asarray(x, dtype=float)
+
+    # pocet_bodu - 2 košů mezi prvním a posledním bodem
+    hranice = np.linspace(1, n - 1, pocet_bodu - 1).astype(int)
+    indexy = np.empty(pocet_bodu, dtype=int)
+    indexy[0], indexy[-1] = 0, n - 1
+    a = 0
+    for i in range(pocet_bodu - 2):
+        od, do = hranice[i], hranice[i + 1]
+        # Průměr následujícího koše (u posledního koše poslední bod)
+        dalsi_od, dalsi_do = (hranice[i + 1], hranice[i + 2]) if i + 2 < len(hranice) else (n - 1, n)
+        prumer_x = x[dalsi_od:dalsi_do].mean()
+        prumer_y = y[dalsi_od:dalsi_do].mean()
+        plochy = np.abs((x[a] - prumer_x) * (y[od:do] - y[a]) - (x[a] - x[od:do]) * (prumer_y - y[a]))
+        a = od + int(plochy.argmax())
+        indexy[i + 1] = a
+    return indexy
+
+def _zmensi(y, x=None):
+    """
+    Křivka zmenšená na NASTAVENI_VYSTUPU["max_bodu"] bodů. Vrací (x, y) jako pole;
+    bez zadaného x jsou osou x dny 0..n-1. Chybějící hodnoty (NaN) se vynechají.
+    """
+    y = np.asarray(y, dtype=float)
+    x = np.arange(len(y)) if x is None else np.asarray(x)
+    platne = np.isfinite(y)
+    if not platne.all():
+        x, y = x[platne], y[platne]
+    indexy = lttb(y, NASTAVENI_VYSTUPU["max_bodu"], x)
+    return x[indexy], y[indexy]
+
 def _vytvor_cestu(nazev_souboru, prefix):
-    """Pomocná funkce pro vytvoření cesty k souboru a složce."""
+    """Pomocná funkce pro vytvoření cesty k souboru a složce (přípona podle nastaveného formátu)."""
     cesta = os.path.join("vystupy", prefix, *nazev_souboru.split("/")) if prefix else nazev_souboru
+    cesta = os.path.splitext(cesta)[0] + "." + NASTAVENI_VYSTUPU["format"]
     os.makedirs(os.path.dirname(cesta), exist_ok=True)
     return cesta
 
+def _uloz_graf(cesta):
+    """Uloží aktuální graf s nastaveným rozlišením a zavře ho. Vrací cestu k souboru."""
+    plt.savefig(cesta, dpi=NASTAVENI_VYSTUPU["dpi"])
+    plt.close()
+    return cesta
+
 def vykresli_ceny_aktiv(portfolio, nazev_souboru="grafy/vyvoj_ceny_aktiv.png", prefix=''):
     if not portfolio:
         print("Portfolio je prázdné")
         return
-    pocet_dni = len(portfolio[0]['ceny'])
-    dny = list(range(pocet_dni))
     cesta = _vytvor_cestu(nazev_souboru, prefix)
 
     plt.figure(figsize=(12, 6))
-    for aktivum in portfolio:
-        plt.plot(dny, aktivum['ceny'], label=aktivum['nazev'])
+    for j, nazev in enumerate(portfolio.nazvy.tolist()):
+        plt.plot(*_zmensi(portfolio.ceny[:, j]), label=nazev)
     plt.title('Vývoj cen jednotlivých aktiv')
     plt.xlabel('Den')
     plt.ylabel('Cena (Kč)')
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
 
 def vykresli_vyvoj_portfolia(hodnoty_portfolia, nazev_souboru="grafy/vyvoj_portfolia.png", prefix=''):
     if not hodnoty_portfolia:
         print("Není co vykreslit.")
         return
-    dny = list(range(len(hodnoty_portfolia)))
     cesta = _vytvor_cestu(nazev_souboru, prefix)
 
     plt.figure(figsize=(10, 5))
-    plt.plot(dny, hodnoty_portfolia, color='darkgreen', linewidth=2)
+    plt.plot(*_zmensi(hodnoty_portfolia), color='darkgreen', linewidth=2)
     plt.title('Vývoj celkové hodnoty portfolia')
     plt.xlabel('Den')
     plt.ylabel('Hodnota portfolia (Kč)')
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
     
 def vykresli_vyvoj_vah(portfolio, nazev_souboru="grafy/vyvoj_vah.png", prefix=''):
     """
     Vykreslí vývoj skutečných vah jednotlivých aktiv v portfoliu.
-    Používá historická množství po každém dni.
+    Množství po každém dni se rozvinou ze záznamu rebalancování (HistorieMnozstvi).
 
-    portfolio -- seznam aktiv, každé aktivum má:
-        'nazev', 'ceny' (seznam cen po dnech), 'historie_mnozstvi' (seznam slovníků po dnech)
+    portfolio -- portfolio.Portfolio s vyplněnými poli 'ceny' (dny x aktiva)
+        a 'historie_mnozstvi' (portfolio.HistorieMnozstvi)
     """
-    if not portfolio or not portfolio[0].get("ceny"):
+    if not portfolio or portfolio.ceny is None:
         print("Portfolio neobsahuje historická data.")
         return
 
-    pocet_dni = len(portfolio[0]['ceny'])
-    nazvy_aktiv = [a['nazev'] for a in portfolio]
-    vyvoj_vah = {nazev: [] for nazev in nazvy_aktiv}
-
     # Kontrola existence historie_mnozstvi
-    if not portfolio[0].get("historie_mnozstvi"):
+    if portfolio.historie_mnozstvi is None:
         print("Portfolio neobsahuje historii množství. Graf nebude přesný.")
         return
 
-    for den in range(pocet_dni):
-        celkova_hodnota = sum(
-            aktivum['ceny'][den] * aktivum['historie_mnozstvi'][den]
-            for aktivum in portfolio
-        )
-        for aktivum in portfolio:
-            mnozstvi_dne = aktivum['historie_mnozstvi'][den]
-            vaha = (aktivum['ceny'][den] * mnozstvi_dne) / celkova_hodnota if celkova_hodnota > 0 else 0
-            vyvoj_vah[aktivum['nazev']].append(vaha)
+    nazvy_aktiv = portfolio.nazvy.tolist()
+    hodnoty_aktiv = portfolio.ceny * portfolio.historie_mnozstvi.jako_pole(len(portfolio.ceny))
+    celkova_hodnota = hodnoty_aktiv.sum(axis=1, keepdims=True)
+    vahy = np.divide(hodnoty_aktiv, celkova_hodnota,
+                     out=np.zeros_like(hodnoty_aktiv), where=celkova_hodnota > 0)
+    vyvoj_vah = {nazev: vahy[:, j] for j, nazev in enumerate(nazvy_aktiv)}
 
     # Vytvoření cesty k souboru
-    cesta = os.path.join("vystupy", prefix, *nazev_souboru.split("/")) if prefix else nazev_souboru
-    os.makedirs(os.path.dirname(cesta), exist_ok=True)
+    cesta = _vytvor_cestu(nazev_souboru, prefix)
 
     # Vykreslení grafu
     plt.figure(figsize=(12, 6))
     for nazev in nazvy_aktiv:
-        plt.plot(vyvoj_vah[nazev], label=nazev)
+        plt.plot(*_zmensi(vyvoj_vah[nazev]), label=nazev)
 
     plt.title("Vývoj skutečných vah aktiv v portfoliu")
     plt.xlabel("Den")
@@ -96,8 +152,7 @@ def vykresli_vyvoj_vah(portfolio, nazev_souboru="grafy/vyvoj_vah.png", prefix=''
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
 
 def vykresli_drawdown(vyvoj, nazev_souboru="grafy/drawdown.png", prefix=''):
     if not vyvoj:
@@ -110,14 +165,13 @@ def vykresli_drawdown(vyvoj, nazev_souboru="grafy/drawdown.png", prefix=''):
         drawdowns.append((hodnota - max_so_far) / max_so_far * 100)
     cesta = _vytvor_cestu(nazev_souboru, prefix)
     plt.figure(figsize=(12, 6))
-    plt.plot(drawdowns, color='crimson')
+    plt.plot(*_zmensi(drawdowns), color='crimson')
     plt.title("Drawdown portfolia")
     plt.xlabel("Den")
     plt.ylabel("Pokles od maxima (%)")
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
 
 def vykresli_histogram_vynosu(vyvoj, nazev_souboru="grafy/histogram_vynosu.png", prefix=''):
     if len(vyvoj)<2:
@@ -132,27 +186,21 @@ def vykresli_histogram_vynosu(vyvoj, nazev_souboru="grafy/histogram_vynosu.png",
     plt.ylabel("Frekvence")
     plt.grid(True)
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
 
 def vykresli_heatmapu_korelaci(portfolio, nazev_souboru="grafy/heatmapa_korelaci.png", prefix=''):
-    data = {}
-    for a in portfolio:
-        ceny = a['ceny']
-        if len(ceny)<2: continue
-        data[a['nazev']] = [(ceny[i]-ceny[i-1])/ceny[i-1] for i in range(1,len(ceny))]
-    if not data:
+    if not portfolio or portfolio.ceny is None or len(portfolio.ceny) < 2:
         print("Není co korelovat.")
         return
-    df = pd.DataFrame(data)
+    ceny = portfolio.ceny
+    df = pd.DataFrame(np.diff(ceny, axis=0) / ceny[:-1], columns=portfolio.nazvy.tolist())
     korelace = df.corr()
     cesta = _vytvor_cestu(nazev_souboru, prefix)
     plt.figure(figsize=(8, 6))
     sns.heatmap(korelace, annot=True, cmap='coolwarm', fmt='.2f', square=True)
     plt.title("Korelace denních výnosů aktiv")
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
 
 def vykresli_realnou_hodnotu_portfolia(vyvoj, inflacni_sazba=0.02, nazev_souboru="grafy/realna_hodnota.png", prefix=''):
     if not vyvoj:
@@ -161,14 +209,13 @@ def vykresli_realnou_hodnotu_portfolia(vyvoj, inflacni_sazba=0.02, nazev_souboru
     realna_hodnota = [vyvoj[i]/((1+inflacni_sazba)**(i/252)) for i in range(len(vyvoj))]
     cesta = _vytvor_cestu(nazev_souboru, prefix)
     plt.figure(figsize=(10,4))
-    plt.plot(realna_hodnota, label="Reálná hodnota portfolia", color="green")
+    plt.plot(*_zmensi(realna_hodnota), label="Reálná hodnota portfolia", color="green")
     plt.title("Vývoj reálné hodnoty portfolia (zohledněna inflace)")
     plt.xlabel("Den")
     plt.ylabel("Hodnota (v dnešních Kč)")
     plt.legend()
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
 
 def vykresli_rolling_volatilitu(vyvoj, okno=63, nazev_souboru="grafy/rolling_volatilita.png", prefix=''):
     if len(vyvoj)<2:
@@ -179,14 +226,14 @@ def vykresli_rolling_volatilitu(vyvoj, okno=63, nazev_souboru="grafy/rolling_vol
     rolling_vol = denni_vynosy.rolling(window=okno).std()*(252**0.5)
     cesta = _vytvor_cestu(nazev_souboru, prefix)
     plt.figure(figsize=(10,4))
-    plt.plot(rolling_vol, label=f"{okno}-denní klouzavá roční volatilita", color="orange")
+    plt.plot(*_zmensi(rolling_vol.to_numpy(), rolling_vol.index.to_numpy()),
+             label=f"{okno}-denní klouzavá roční volatilita", color="orange")
     plt.title("Rolling volatilita portfolia")
     plt.xlabel("Den")
     plt.ylabel("Volatilita")
     plt.legend()
     plt.tight_layout()
-    plt.savefig(cesta, dpi=300)
-    plt.close()
+    return _uloz_graf(cesta)
 
 def vykresli_vyvoj_vice_portfolii(vysledky, prefix=''):
     if not vysledky:
@@ -194,17 +241,15 @@ def vykresli_vyvoj_vice_portfolii(vysledky, prefix=''):
         return
     plt.figure(figsize=(12,6))
     for nazev, hodnoty in vysledky.items():
-        plt.plot(range(len(hodnoty)), hodnoty, label=nazev)
+        plt.plot(*_zmensi(hodnoty), label=nazev)
     plt.title("Srovnání vývoje více portfolií")
     plt.xlabel("Den")
     plt.ylabel("Hodnota portfolia (Kč)")
     plt.legend()
     plt.grid(True)
     plt.tight_layout()
-    cesta = os.path.join("vystupy", "porovnani")
-    os.makedirs(cesta, exist_ok=True)
-    plt.savefig(os.path.join(cesta, "vyvoj_vice_portfolii.png"), dpi=300)
-    plt.close()
+    cesta = _vytvor_cestu(os.path.join("vystupy", "porovnani", "vyvoj_vice_portfolii.png"), '')
+    return _uloz_graf(cesta)
 
 def vykresli_vyvoj_vice_portfolii_interaktivne(vysledky, vystup='vystupy/porovnani/vyvoj_portfolii_interaktivne.html'):
     if not vysledky:
@@ -212,7 +257,9 @@ def vykresli_vyvoj_vice_portfolii_interaktivne(vysledky, vystup='vystupy/porovna
         return
     fig = go.Figure()
     for nazev, hodnoty in vysledky.items():
-        fig.add_trace(go.Scatter(x=list(range(len(hodnoty))), y=hodnoty, mode='lines', name=nazev))
+        # WebGL stopa se zmenšeným počtem bodů – HTML zůstane malé i pro dlouhé horizonty
+        x, y = _zmensi(hodnoty)
+        fig.add_trace(go.Scattergl(x=x, y=y, mode='lines', name=nazev))
     fig.update_layout(
         title='Vývoj hodnoty více portfolií',
         xaxis_title='Den',
@@ -223,3 +270,86 @@ def vykresli_vyvoj_vice_portfolii_interaktivne(vysledky, vystup='vystupy/porovna
     os.makedirs(os.path.dirname(vystup), exist_ok=True)
     fig.write_html(vystup)
     print(f"Interaktivní graf uložen do '{vystup}'")
+    return vystup
+
+# ========================
+# MONTE CARLO – VĚJÍŘOVÉ GRAFY
+# ========================
+
+def _pasma_vejire(percentily):
+    """Dvojice (dolní, horní) indexů percentilů symetrických kolem mediánu, od nejširšího pásma."""
+    poradi = np.argsort(percentily)
+    return [(poradi[i], poradi[-1 - i]) for i in range(len(poradi) // 2)]
+
+def _osa_vejire(vejir, prvni_den):
+    """Společné indexy dní pro všechny percentily – LTTB podle prostřední (mediánové) křivky."""
+    dny = np.arange(prvni_den, prvni_den + vejir.shape[1])
+    indexy = lttb(vejir[len(vejir) // 2], NASTAVENI_VYSTUPU["max_bodu"], dny)
+    return dny[indexy], vejir[:, indexy]
+
+def vykresli_vejir_scenaru(vejir, percentily, prvni_den=1, nazev_souboru="grafy/vejir_scenaru.png", prefix=''):
+    """
+    Vějířový graf Monte Carlo scénářů – pásma mezi percentily hodnoty portfolia v každém dni
+    místo tisíců jednotlivých křivek.
+
+    vejir -- pole (len(percentily), pocet_dni), např. stat.souhrn_scenaru(...)["vejir"]
+    """
+    vejir = np.asarray(vejir, dtype=float)
+    if vejir.ndim != 2 or vejir.shape[1] == 0:
+        print("Není co vykreslit.")
+        return
+    dny, vejir = _osa_vejire(vejir, prvni_den)
+    poradi = np.argsort(percentily)
+    cesta = _vytvor_cestu(nazev_souboru, prefix)
+
+    plt.figure(figsize=(12, 6))
+    pasma = _pasma_vejire(percentily)
+    for k, (dolni, horni) in enumerate(pasma):
+        plt.fill_between(dny, vejir[dolni], vejir[horni], color='steelblue',
+                         alpha=0.2 + 0.5 * k / max(len(pasma), 1), linewidth=0, label=f"{percentily[dolni]}.–{percentily[horni]}. percentil")
+    if len(poradi) % 2:
+        median = poradi[len(poradi) // 2]
+        plt.plot(dny, vejir[median], color='navy', linewidth=1.5, label=f"{percentily[median]}. percentil")
+    plt.title("Monte Carlo – rozdělení vývoje hodnoty portfolia")
+    plt.xlabel("Den")
+    plt.ylabel("Hodnota portfolia (Kč)")
+    plt.legend(loc='upper left')
+    plt.grid(True)
+    plt.tight_layout()
+    return _uloz_graf(cesta)
+
+def vykresli_vejir_scenaru_interaktivne(vejir, percentily, prvni_den=1,
+                                        nazev_souboru="grafy/vejir_scenaru_interaktivne.html", prefix=''):
+    """Interaktivní (WebGL) varianta vykresli_vejir_scenaru uložená jako HTML."""
+    vejir = np.asarray(vejir, dtype=float)
+    if vejir.ndim != 2 or vejir.shape[1] == 0:
+        print("Není co vykreslit.")
+        return
+    dny, vejir = _osa_vejire(vejir, prvni_den)
+    poradi = np.argsort(percentily)
+    vystup = os.path.join("vystupy", prefix, *nazev_souboru.split("/")) if prefix else nazev_souboru
+
+    fig = go.Figure()
+    pasma = _pasma_vejire(percentily)
+    for k, (dolni, horni) in enumerate(pasma):
+        popis = f"{percentily[dolni]}.–{percentily[horni]}. percentil"
+        fig.add_trace(go.Scattergl(x=dny, y=vejir[dolni], mode='lines', line=dict(width=0),
+                                   showlegend=False, hoverinfo='skip', legendgroup=popis))
+        fig.add_trace(go.Scattergl(x=dny, y=vejir[horni], mode='lines', line=dict(width=0), fill='tonexty',
+                                   fillcolor=f"rgba(70,130,180,{0.2 + 0.5 * k / max(len(pasma), 1):.2f})",
+                                   name=popis, legendgroup=popis))
+    if len(poradi) % 2:
+        median = poradi[len(poradi) // 2]
+        fig.add_trace(go.Scattergl(x=dny, y=vejir[median], mode='lines', line=dict(color='navy'),
+                                   name=f"{percentily[median]}. percentil"))
+    fig.update_layout(
+        title='Monte Carlo – rozdělení vývoje hodnoty portfolia',
+        xaxis_title='Den',
+        yaxis_title='Hodnota portfolia (Kč)',
+        hovermode='x unified',
+        template='plotly_white'
+    )
+    os.makedirs(os.path.dirname(vystup), exist_ok=True)
+    fig.write_html(vystup)
+    print(f"Interaktivní graf uložen do '{vystup}'")
+    return vystup
@@ -0,0 +1,110 @@
+# historicka_data.py
+
+import os
+import numpy as np
+
+from uloziste import UlozisteScenaru, hash_obsahu
+
+VERZE_PREVODU = 1  # změna převodu CSV zneplatní uložené binární kopie
+
+# ========================
+# NAČTENÍ HISTORICKÝCH CEN
+# ========================
+
+def _nacti_csv(cesta):
+    """
+    Načte CSV s historickými cenami najednou (parser pandas v C).
+    Formát: první sloupec datum, další sloupce ceny jednotlivých tickerů (hlavička = názvy).
+    Oddělovač (',' nebo ';') se rozpozná automaticky, prázdné buňky jsou chybějící ceny.
+    """
+    import pandas as pd
+    with open(cesta, encoding="utf-8") as f:
+        hlavicka = f.readline()
+    oddelovac = ";" if hlavicka.count(";") > hlavicka.count(",") else ","
+    tabulka = pd.read_csv(cesta, sep=oddelovac, index_col=0, dtype={0: str}, engine="c")
+    tabulka = tabulka.apply(pd.to_numeric, errors="coerce")
+    return {
+        "datumy": np.asarray(tabulka.index.astype(str)),
+        "nazvy": [str(n).strip() for n in tabulka.columns],
+        "ceny": tabulka.to_numpy(dtype=float),
+    }
+
+def nacti_historicke_ceny(cesta, slozka_cache="cache_historie"):
+    """
+    Načte historické denní ceny z CSV. Při prvním čtení se převedou do binární kopie
+    (matice cen .npy a metadata .json v `slozka_cache`), další čtení ji otevřou přes mmap.
+    Kopie je svázaná s cestou, velikostí a časem změny CSV – po úpravě souboru se převede znovu.
+    slozka_cache=None binární kopii nepoužívá.
+
+    Vrací slovník {"datumy": pole textů, "nazvy": seznam tickerů, "ceny": pole (dny x tickery)}
+    s NaN na místě chybějících cen.
+    """
+    if slozka_cache is None:
+        return _nacti_csv(cesta)
+
+    info = os.stat(cesta)
+    klic = hash_obsahu(VERZE_PREVODU, os.path.abspath(cesta), info.st_size, info.st_mtime_ns)
+    uloziste = UlozisteScenaru(slozka_cache)
+    ulozene = uloziste.nacti(klic)
+    if ulozene is not None:
+        ceny, metadata = ulozene
+        return {"datumy": np.asarray(metadata["datumy"]), "nazvy": metadata["nazvy"], "ceny": ceny}
+
+    data = _nacti_csv(cesta)
+    data["ceny"] = uloziste.uloz(klic, data["ceny"], {
+        "zdroj": os.path.abspath(cesta),
+        "datumy": data["datumy"].tolist(),
+        "nazvy": data["nazvy"],
+    })
+    return data
+
+def vyber_aktiva(data, nazvy):
+    """
+    Vybere sloupce tickerů `nazvy` (v tomto pořadí) a připraví je pro simulaci:
+    chybějící ceny se doplní poslední známou cenou a řádky před dnem, od kterého mají
+    všechna vybraná aktiva cenu, se vynechají. Vrací (datumy, ceny).
+    """
+    nazvy = list(nazvy)
+    index = {nazev: j for j, nazev in enumerate(data["nazvy"])}
+    chybejici = [n for n in nazvy if n not in index]
+    if chybejici:
+        raise ValueError(f"Historická data neobsahují aktiva: {', '.join(chybejici)}")
+
+    ceny = np.array(data["ceny"][:, [index[n] for n in nazvy]], dtype=float)
+    platne = np.isfinite(ceny) & (ceny > 0)
+
+    # Doplnění poslední známou cenou – index posledního platného řádku v každém sloupci
+    radky = np.where(platne, np.arange(len(ceny))[:, None], 0)
+    np.maximum.accumulate(radky, axis=0, out=radky)
+    ceny = np.take_along_axis(ceny, radky, axis=0)
+
+    # Začátek: první den, kdy mají cenu všechna aktiva
+    if len(ceny) == 0 or not platne.any(axis=0).all():
+        raise ValueError("Některé aktivum nemá v historických datech žádnou platnou cenu.")
+    zacatek = int(platne.argmax(axis=0).max())
+    if zacatek > 0:
+        print(f"Historická data začínají až dnem {data['datumy'][zacatek]} (první den se všemi aktivy).")
+    return np.asarray(data["datumy"])[zacatek:], ceny[zacatek:]
+
+# ========================
+# BOOTSTRAP
+# ========================
+
+def denni_vynosy(ceny):
+    """Relativní denní změny cen (dny - 1) x aktiva."""
+    return ceny[1:] / ceny[:-1] - 1
+
+def priprav_bootstrap(portfolio, ceny, delka_bloku=20, stacionarni=True):
+    """
+    Uloží do portfolia historické výnosy pro model "bootstrap" (modely.BootstrapModel).
+    ceny -- historické ceny (dny x aktiva) ve stejném pořadí aktiv jako portfolio
+    delka_bloku -- (průměrná) délka bloku v dnech
+    stacionarni -- True = stacionární bootstrap (náhodná délka bloků), False = pevné bloky
+    """
+    if len(ceny) < 2:
+        raise ValueError("Pro bootstrap jsou potřeba alespoň dva dny historických cen.")
+    portfolio.bootstrap = {
+        "vynosy": denni_vynosy(np.asarray(ceny, dtype=float)),
+        "delka_bloku": int(delka_bloku),
+        "stacionarni": bool(stacionarni),
+    }
@@ -0,0 +1,127 @@
+# korelace.py
+
+import csv
+import numpy as np
+
+# ========================
+# NAČTENÍ MATICE
+# ========================
+
+def nacti_matici(cesta, nazvy):
+    """
+    Načte čtvercovou korelační nebo kovarianční matici z CSV souboru.
+    První řádek i první sloupec obsahují názvy aktiv, pořadí může být libovolné.
+    Vrací matici seřazenou podle `nazvy`.
+    """
+    with open(cesta, newline='', encoding="utf-8") as csvfile:
+        radky = [(cislo, radek) for cislo, radek in enumerate(csv.reader(csvfile), start=1) if radek]
+    if not radky:
+        raise ValueError(f"Matice v '{cesta}' je prázdná.")
+
+    hlavicka = [n.strip() for n in radky[0][1][1:]]
+    hodnoty = {}
+    for cislo, radek in radky[1:]:
+        if len(radek) != len(hlavicka) + 1:
+            raise ValueError(f"Matice v '{cesta}', řádek {cislo} ({radek[0].strip()}): "
+                             f"{len(radek) - 1} hodnot místo {len(hlavicka)}.")
+        try:
+            hodnoty[radek[0].strip()] = [float(x) for x in radek[1:]]
+        except ValueError:
+            raise ValueError(f"Matice v '{cesta}', řádek {cislo} ({radek[0].strip()}): neplatné číslo.") from None
+
+    chybejici = [n for n in nazvy if n not in hlavicka or n not in hodnoty]
+    if chybejici:
+        raise ValueError(f"Matice v '{cesta}' neobsahuje aktiva: {', '.join(chybejici)}")
+
+    sloupce = [hlavicka.index(n) for n in nazvy]
+    return np.array([[hodnoty[n][j] for j in sloupce] for n in nazvy])
+
+# ========================
+# VALIDACE A OPRAVA
+# ========================
+
+def priprav_korelacni_matici(matice, tolerance=1e-8):
+    """
+    Zkontroluje matici a převede ji na korelační.
+    Má-li matice na diagonále jiné hodnoty než 1, bere se jako kovariance ročních výnosů.
+    Vrací (korelacni_matice, rocni_volatility nebo None).
+    Není-li matice pozitivně definitní, nahradí ji nejbližší pozitivně definitní korelační maticí.
+    """
+    matice = np.asarray(matice, dtype=float)
+    if matice.ndim != 2 or matice.shape[0] != matice.shape[1]:
+        raise ValueError(f"Matice musí být čtvercová (tvar {matice.shape}).")
+    if not np.isfinite(matice).all():
+        raise ValueError("Matice obsahuje neplatné hodnoty (NaN nebo nekonečno).")
+    if np.abs(matice - matice.T).max() > tolerance * max(1.0, np.abs(matice).max()):
+        raise ValueError("Matice není symetrická.")
+    matice = (matice + matice.T) / 2
+
+    diagonala = np.diag(matice)
+    if (diagonala <= 0).any():
+        raise ValueError("Diagonála matice musí být kladná.")
+
+    volatility = None
+    if np.abs(diagonala - 1).max() > tolerance:
+        volatility = np.sqrt(diagonala)
+        matice = matice / np.outer(volatility, volatility)
+    if np.abs(matice).max() > 1 + tolerance:
+        raise ValueError("Korelace musí ležet v intervalu <-1, 1>.")
+
+    if not je_pozitivne_definitni(matice):
+        print("Pozor: korelační matice není pozitivně definitní – použije se nejbližší platná matice.")
+        matice = nejblizsi_korelacni_matice(matice)
+
+    return matice, volatility
+
+def je_pozitivne_definitni(matice):
+    """Vrátí True, pokud lze matici rozložit Choleského rozkladem."""
+    try:
+        np.linalg.cholesky(matice)
+        return True
+    except np.linalg.LinAlgError:
+        return False
+
+def nejblizsi_korelacni_matice(matice, max_iteraci=100, min_vlastni_cislo=1e-8):
+    """
+    Nejbližší pozitivně definitní korelační matice (Highamova metoda střídavých projekcí):
+    střídá projekci na pozitivně semidefinitní matice a na matice s jednotkovou diagonálou.
+    """
+    y = np.array(matice, dtype=float)
+    oprava = np.zeros_like(y)
+    for _ in range(max_iteraci):
+        r = y - oprava
+        vlastni_cisla, vektory = np.linalg.eigh(r)
+        x = (vektory * np.maximum(vlastni_cisla, 0)) @ vektory.T
+        oprava = x - r
+        y_nove = x.copy()
+        np.fill_diagonal(y_nove, 1.0)
+        if np.abs(y_nove - y).max() < 1e-10:
+            y = y_nove
+            break
+        y = y_nove
+
+    # Zajištění striktní pozitivní definitnosti (Choleského rozklad musí projít)
+    vlastni_cisla, vektory = np.linalg.eigh(y)
+    y = (vektory * np.maximum(vlastni_cisla, min_vlastni_cislo)) @ vektory.T
+    d = np.sqrt(np.diag(y))
+    y = y / np.outer(d, d)
+    return (y + y.T) / 2
+
+# ========================
+# ROZKLAD S MEZIPAMĚTÍ
+# ========================
+
+_CHOLESKY_CACHE = {}
+MAX_CHOLESKY_CACHE = 32
+
+def cholesky(matice):
+    """Choleského rozklad korelační matice; rozklad se pro stejnou matici počítá jen jednou."""
+    matice = np.ascontiguousarray(matice, dtype=float)
+    klic = (matice.shape, matice.tobytes())
+    rozklad = _CHOLESKY_CACHE.get(klic)
+    if rozklad is None:
+        if len(_CHOLESKY_CACHE) >= MAX_CHOLESKY_CACHE:
+            _CHOLESKY_CACHE.pop(next(iter(_CHOLESKY_CACHE)))
+        rozklad = np.linalg.cholesky(matice)
+        _CHOLESKY_CACHE[klic] = rozklad
+    return rozklad
@@ -1,25 +1,39 @@
 # main.py
 
-def main():
+def main(soubor_konfigurace="konfigurace.csv", vstupni_soubory=None, vykreslit=True,
+         exportovat=True, prepsat=None):
+    """
+    Simulace všech vstupních portfolií podle konfigurace.
+    vstupni_soubory -- CSV soubory portfolií (výchozí jsou oba ukázkové soubory)
+    vykreslit / exportovat -- vypnutí grafů, resp. CSV/binárních exportů
+    prepsat -- slovník hodnot, které přepíší hodnoty z konfiguračního souboru
+    Grafická knihovna se importuje až v procesu, který graf opravdu vykresluje.
+    """
     # === Import modulů a funkcí ===
-    from portfolio import nacti_portfolio, vypocitej_zakladni_mnozstvi
+    from portfolio import nacti_portfolio, vypocitej_zakladni_mnozstvi, sjednot_portfolia
     from konfigurace import nacti_konfiguraci
     import simulace as sim
     from rebalancovani import uloz_rebalancovani_do_txt
     import statistiky as stat
     import soubory as f
-    import grafy as g
+    from vykreslovani import Vykreslovani, vymaz_manifest
+    from mezipamet import MezipametBehu
+    import redukce_rozptylu as rr
+    import mereni
 
     import os
+    import numpy as np
 
     # === 1. Načtení vstupních souborů ===
-    vstupni_soubory = [
-        "portfolio_konzervativni.csv",
-        "portfolio_rizikove.csv"
-    ]
+    if vstupni_soubory is None:
+        vstupni_soubory = [
+            "portfolio_konzervativni.csv",
+            "portfolio_rizikove.csv"
+        ]
 
     # === 2. Načtení konfigurace ===
-    konfig = nacti_konfiguraci()
+    konfig = nacti_konfiguraci(soubor_konfigurace)
+    konfig.update(prepsat or {})
     pocatecni_hodnota = int(konfig.get("pocatecni_hodnota", 100000))
     pocet_dni = int(konfig.get("pocet_dni", 1000))
     denni_volatilita = float(konfig.get("denni_volatilita", 0.02))
@@ -30,75 +44,561 @@ def main():
     inflacni_sazba = float(konfig.get("inflacni_sazba", 0.02))
     model = konfig.get("model", "typovy")
     sdilena_simulace = str(konfig.get("sdilena_simulace", "true")).lower() == "true"
+    pocet_scenaru = int(konfig.get("pocet_scenaru", 1))
+    pocet_procesu = int(konfig.get("pocet_procesu", 1))
+    proudova_simulace = str(konfig.get("proudova_simulace", "false")).lower() == "true"
+    velikost_bloku = int(konfig.get("velikost_bloku", sim.VELIKOST_BLOKU))
+    format_vystupu = str(konfig.get("format_vystupu", "csv")).lower()
+    seed = konfig.get("seed")
+    seed = int(seed) if isinstance(seed, float) else None  # číselný seed = opakovatelný běh
+    rng = sim.vytvor_generator(seed)
+    kontrolni_promenna = str(konfig.get("kontrolni_promenna", "false")).lower() == "true"
+    try:
+        redukce = rr.over_metodu(konfig.get("redukce_rozptylu", "zadna"))
+    except ValueError as e:
+        print(f"Chyba: {e}")
+        return
+    pozadovana_redukce = str(konfig.get("redukce_rozptylu") or "zadna").lower()
 
-    vysledky = {}
-    ceny_sdilene = None
-    prvni_nazvy = set()
+    # Adaptivní Monte Carlo – scénáře po dávkách, dokud intervaly spolehlivosti metrik nejsou
+    # užší než tolerance (pocet_scenaru pak jen omezuje scénáře uchované pro vějíř a export)
+    adaptivni_mc = str(konfig.get("adaptivni_mc", "false")).lower() == "true"
+    adaptivni_metriky = [m.strip() for m in str(konfig.get("adaptivni_metriky", "konecna_hodnota")).split(";")
+                         if m.strip()]
+    adaptivni_tolerance = float(konfig.get("adaptivni_tolerance", 0.01))
+    max_cas_mc = float(konfig.get("adaptivni_max_cas_s", 0)) or None
+    try:
+        for metrika in adaptivni_metriky:
+            stat.rozloz_metriku(metrika)
+    except ValueError as e:
+        print(f"Chyba: {e}")
+        return
 
-    # === 3. Simulace portfolií ===
-    for i, soubor in enumerate(vstupni_soubory):
-        print(f"\n=== Simulace portfolia: {soubor} ===")
-        portfolio = nacti_portfolio(soubor)
+    def monte_carlo(vesmir_mc, portfolia_mc, sloupce_mc):
+        """
+        Monte Carlo portfolií nad společným vesmírem – s pevným počtem scénářů, nebo adaptivně.
+        Vrací (výsledky, klíč výsledků v mezipaměti běhu); adaptivní běh s časovým rozpočtem
+        není opakovatelný, a proto se neukládá (klíč None).
+        """
+        spolecne = (vesmir_mc, portfolia_mc, sloupce_mc, [p.cilove_vahy() for p in portfolia_mc], pocet_dni)
+        strategie = (rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek)
+        nastaveni_adaptivni = None
+        if adaptivni_mc:
+            nastaveni_adaptivni = dict(
+                metriky=adaptivni_metriky, tolerance=adaptivni_tolerance,
+                spolehlivost=float(konfig.get("adaptivni_spolehlivost", 0.95)),
+                max_scenaru=int(konfig.get("adaptivni_max_scenaru", 100000)), max_cas=max_cas_mc,
+                uchovat_scenaru=pocet_scenaru
+            )
+        klic = None
+        if not (adaptivni_mc and max_cas_mc):
+            klic = mezipamet.klic("monte_carlo", *spolecne, strategie, pocet_scenaru, model, denni_volatilita,
+                                  seed, redukce, nastaveni_adaptivni)
+
+        def vypocet():
+            if adaptivni_mc:
+                return sim.simuluj_portfolia_mc_adaptivne(
+                    *spolecne, *strategie, **nastaveni_adaptivni, model=model, denni_volatilita=denni_volatilita,
+                    rng=seed, pocet_procesu=pocet_procesu, redukce=redukce
+                )
+            return sim.simuluj_portfolia_mc(
+                *spolecne, pocet_scenaru, *strategie, model=model, denni_volatilita=denni_volatilita,
+                rng=seed, pocet_procesu=pocet_procesu, uloziste=uloziste, redukce=redukce
+            )
+        return mezipamet.ziskej(klic, vypocet), klic
+
+    # Měření výkonu (časy etap, čítače, volitelně cProfile a tracemalloc) – viz mereni.py
+    if str(konfig.get("mereni", "false")).lower() == "true":
+        mereni.zapni(
+            profilovat=str(konfig.get("mereni_profil", "false")).lower() == "true",
+            sledovat_pamet=str(konfig.get("mereni_pamet", "false")).lower() == "true"
+        )
+
+    # Úložiště vygenerovaných scénářů na disku (opakované běhy se stejným seedem je nemusí generovat)
+    uloziste = None
+    if str(konfig.get("cache_scenaru", "false")).lower() == "true":
+        from uloziste import UlozisteScenaru
+        uloziste = UlozisteScenaru(
+            str(konfig.get("cache_slozka", "cache_scenaru")),
+            max_velikost=int(konfig.get("cache_max_mb", 2048)) * 1024 ** 2
+        )
+
+    # Mezipaměť běhu – výsledky etap (ceny, simulace, Monte Carlo, statistiky, exporty) podle otisku
+    # jejich vstupů, opakovaný běh se stejnými vstupy je nepočítá znovu. Běh bez seedu není opakovatelný.
+    slozka_mezipameti = str(konfig.get("cache_behu_slozka", "cache_behu"))
+    if str(konfig.get("cache_behu_vymazat", "false")).lower() == "true":
+        if os.path.isdir(slozka_mezipameti):
+            MezipametBehu(slozka_mezipameti).vymaz()
+        vymaz_manifest()
+        print("Mezipaměť běhu i otisky vykreslených grafů byly vymazány.")
+    mezipamet = MezipametBehu(
+        slozka_mezipameti, max_velikost=int(konfig.get("cache_behu_max_mb", 1024)) * 1024 ** 2,
+        aktivni=str(konfig.get("cache_behu", "false")).lower() == "true" and seed is not None
+    )
+
+    # Historická data – backtest nad skutečnými cenami a/nebo bootstrap historických výnosů
+    historicky_backtest = str(konfig.get("historicky_backtest", "false")).lower() == "true"
+    data_historie = None
+    if konfig.get("historicka_data"):
+        import historicka_data as hd
+        with mereni.etapa("nacteni"):
+            data_historie = hd.nacti_historicke_ceny(
+                str(konfig["historicka_data"]), str(konfig.get("cache_historie", "cache_historie"))
+            )
+    elif historicky_backtest or model == "bootstrap":
+        print("Pozor: backtest i model 'bootstrap' vyžadují historická data (parametr historicka_data).")
+        historicky_backtest = False
+
+    # Průzkum parametrů – mřížky hodnot; prázdná mřížka = hodnota z konfigurace
+    pruzkum = str(konfig.get("pruzkum", "false")).lower() == "true"
+    if pruzkum:
+        import pruzkum as pr
+        mrizka_period = pr.nacti_mrizku(konfig.get("pruzkum_periody"), int) or [rebalancovaci_perioda]
+        mrizka_tolerance = pr.nacti_mrizku(konfig.get("pruzkum_tolerance")) or [tolerance_vahy]
+        mrizka_poplatku = pr.nacti_mrizku(konfig.get("pruzkum_poplatky")) or [transakcni_poplatek]
+        mrizka_zpusobu = pr.nacti_mrizku(konfig.get("pruzkum_zpusoby"), str) or [zpusob_rebalancovani]
+
+    # Grafy se vykreslují v procesech na pozadí (bez obrazovky)
+    kresleni = None
+    if vykreslit:
+        kresleni = Vykreslovani(
+            pocet_procesu=int(konfig.get("pocet_procesu_grafu", 0)),
+            dpi=int(konfig.get("dpi_grafu", 300)),
+            format=str(konfig.get("format_grafu", "png")),
+            preskakovat_nezmenene=str(konfig.get("preskakovat_nezmenene_grafy", "true")).lower() == "true",
+            max_bodu=int(konfig.get("max_bodu_grafu", 2000))
+        )
+
+    # === 3. Načtení všech portfolií ===
+    nactena = []
+    for soubor in vstupni_soubory:
+        with mereni.etapa("nacteni"):
+            portfolio = nacti_portfolio(soubor)
+            if portfolio:
+                vypocitej_zakladni_mnozstvi(portfolio, pocatecni_hodnota)
         if not portfolio:
             print(f"Chyba: {soubor} nebylo načteno.")
             continue
 
-        vypocitej_zakladni_mnozstvi(portfolio, pocatecni_hodnota)
-        cilove_vahy = {a['nazev']: a['vaha'] for a in portfolio}
+        # Historické ceny aktiv portfolia (tickery = názvy aktiv ve vstupním CSV)
+        ceny_historie = datumy_historie = None
+        if data_historie is not None:
+            try:
+                datumy_historie, ceny_historie = hd.vyber_aktiva(data_historie, portfolio.nazvy.tolist())
+                if model == "bootstrap":
+                    hd.priprav_bootstrap(
+                        portfolio, ceny_historie, int(konfig.get("bootstrap_delka_bloku", 20)),
+                        str(konfig.get("bootstrap_typ", "stacionarni")).lower() == "stacionarni"
+                    )
+            except ValueError as e:
+                print(f"Chyba ({soubor}): {e}")
+                continue
+            if historicky_backtest:
+                # Nákup za skutečné ceny prvního dne historie
+                portfolio.pocatecni_ceny = ceny_historie[0].copy()
+                vypocitej_zakladni_mnozstvi(portfolio, pocatecni_hodnota)
+        nactena.append((soubor, portfolio, datumy_historie, ceny_historie))
 
-        # Generování sdílených cen pouze pro první portfolio
-        if sdilena_simulace and ceny_sdilene is None:
-            ceny_sdilene = sim.generuj_sdilene_ceny(
-                portfolio, pocet_dni, model=model, denni_volatilita=denni_volatilita
-            )
-            prvni_nazvy = set(ceny_sdilene.keys())
-
-        # Použití sdílené simulace jen pokud portfolia mají stejná aktiva
-        aktualni_nazvy = set(a['nazev'] for a in portfolio)
-        if sdilena_simulace and ceny_sdilene is not None and aktualni_nazvy == prvni_nazvy:
-            vyvoj_portfolia, historie_rebalancovani = sim.simuluj_portfolio_sdilene(
-                portfolio, cilove_vahy, ceny_sdilene,
-                rebalancovaci_perioda, zpusob_rebalancovani,
-                tolerance_vahy, transakcni_poplatek
-            )
-        else:
-            if sdilena_simulace and ceny_sdilene is not None:
-                print("Pozor: portfolia mají odlišná aktiva – sdílená simulace nebude použita.")
-            vyvoj_portfolia, historie_rebalancovani = sim.simuluj_portfolio(
-                portfolio, cilove_vahy, pocet_dni, rebalancovaci_perioda,
-                zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
-                model=model, denni_volatilita=denni_volatilita
+    # Společný vesmír aktiv – sdílené ceny (i Monte Carlo scénáře) se generují jednou pro sjednocení
+    # aktiv všech portfolií a každé portfolio dostane sloupce svých aktiv
+    vesmir = None
+    ceny_vesmiru = klic_cen = None
+    vysledky_mc = [None] * len(nactena)
+    klice_mc = [None] * len(nactena)
+    if sdilena_simulace and nactena and not (pruzkum or proudova_simulace or historicky_backtest):
+        portfolia = [p for _, p, _, _ in nactena]
+        vesmir, sloupce_portfolii = sjednot_portfolia(portfolia)
+        if len(vesmir) > min(len(p) for p in portfolia):
+            print(f"Sdílené ceny pro {len(vesmir)} aktiv všech portfolií: {', '.join(vesmir.nazvy.tolist())}")
+        if model == "bootstrap":
+            hd.priprav_bootstrap(
+                vesmir, hd.vyber_aktiva(data_historie, vesmir.nazvy.tolist())[1],
+                int(konfig.get("bootstrap_delka_bloku", 20)),
+                str(konfig.get("bootstrap_typ", "stacionarni")).lower() == "stacionarni"
             )
+        # Generátor rng se po sdílených cenách už nepoužije, ceny lze vzít z mezipaměti
+        klic_cen = mezipamet.klic("ceny", vesmir, pocet_dni, model, denni_volatilita, seed)
+        with mereni.etapa("generovani_cen"):
+            ceny_vesmiru = mezipamet.ziskej(klic_cen, lambda: np.asarray(sim.generuj_sdilenou_matici(
+                vesmir, pocet_dni, model=model, denni_volatilita=denni_volatilita, rng=rng,
+                uloziste=uloziste
+            )))
+        if pocet_scenaru > 1:
+            with mereni.etapa("monte_carlo"):
+                vysledky_mc, klic_mc = monte_carlo(vesmir, [p.kopie() for p in portfolia], sloupce_portfolii)
+            klice_mc = [mezipamet.odvozeny_klic(klic_mc, "portfolio", i) for i in range(len(portfolia))]
 
-        # Uložení výsledků
+    vysledky = {}
+
+    # === 4. Simulace portfolií ===
+    for i, (soubor, portfolio, datumy_historie, ceny_historie) in enumerate(nactena):
+        print(f"\n=== Simulace portfolia: {soubor} ===")
+        cilove_vahy = portfolio.cilove_vahy()
         nazev = os.path.splitext(os.path.basename(soubor))[0]
+        if historicky_backtest:
+            print(f"Backtest: {datumy_historie[0]} – {datumy_historie[-1]} ({len(ceny_historie) - 1} dní)")
+
+        # Průzkum parametrů – všechny kombinace nad stejnými scénáři, jen tabulka výsledků
+        if pruzkum:
+            with mereni.etapa("pruzkum"):
+                tabulka = pr.pruzkum_parametru(
+                    portfolio, cilove_vahy, pocet_dni, max(pocet_scenaru, 1),
+                    mrizka_period, mrizka_tolerance, mrizka_poplatku, mrizka_zpusobu,
+                    model=model, denni_volatilita=denni_volatilita,
+                    rng=seed, pocet_procesu=pocet_procesu, uloziste=uloziste, redukce=redukce
+                )
+            pr.vypis_pruzkum(tabulka)
+            if exportovat:
+                with mereni.etapa("export"):
+                    f.uloz_pruzkum_do_csv(tabulka, prefix=nazev)
+            continue
+
+        # Proudová simulace – výsledky po blocích dnů s omezenou pamětí (bez grafů)
+        if proudova_simulace:
+            with mereni.etapa("proudova_simulace"):
+                statistika = stat.PrubeznaStatistika()
+                celkove_poplatky = 0.0
+                with f.ProudovyExport(portfolio.nazvy.tolist(), prefix=nazev) as export:
+                    for blok in sim.simuluj_portfolio_proud(
+                        portfolio, cilove_vahy, pocet_dni, rebalancovaci_perioda,
+                        zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+                        model=model, denni_volatilita=denni_volatilita, rng=rng,
+                        velikost_bloku=velikost_bloku
+                    ):
+                        statistika.pridej(blok["hodnoty"])
+                        export.pridej(blok)
+                        celkove_poplatky += sum(z['poplatky_celkem'] for z in blok["historie"])
+                statistiky = statistika.vysledek()
+            if statistiky is not None:
+                stat.vypis_metriky(statistiky)
+                with mereni.etapa("export"):
+                    f.uloz_statistiky_do_csv(statistiky, prefix=nazev)
+            print(f"\n$$$ Celkové transakční poplatky: {celkove_poplatky:.2f} Kč")
+            continue
+
+        # Klíč simulace: ceny (historie, nebo klíč sdílených cen), portfolio před simulací a strategie.
+        # Samostatně generované ceny závisí na stavu sdíleného generátoru, ty se neukládají.
+        strategie = (rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek)
+        klic_simulace = None
+        if historicky_backtest:
+            klic_simulace = mezipamet.klic("simulace", ceny_historie, portfolio, strategie)
+        elif ceny_vesmiru is not None:
+            klic_simulace = mezipamet.odvozeny_klic(klic_cen, "simulace", portfolio, sloupce_portfolii[i],
+                                                    strategie)
+
+        with mereni.etapa("simulace"):
+            ulozeno = mezipamet.nacti_vysledek(klic_simulace)
+            if ulozeno is not None:
+                # Portfolio po simulaci (ceny, množství a jejich historie) i vývoj hodnoty
+                vyvoj_portfolia, historie_rebalancovani, portfolio = ulozeno
+            else:
+                if historicky_backtest:
+                    vyvoj_portfolia, historie_rebalancovani = sim.simuluj_portfolio_nad_cenami(
+                        portfolio, cilove_vahy, ceny_historie,
+                        rebalancovaci_perioda, zpusob_rebalancovani,
+                        tolerance_vahy, transakcni_poplatek
+                    )
+                elif ceny_vesmiru is not None:
+                    vyvoj_portfolia, historie_rebalancovani = sim.simuluj_portfolio_nad_cenami(
+                        portfolio, cilove_vahy,
+                        sim.ceny_portfolia(ceny_vesmiru, vesmir, portfolio, sloupce_portfolii[i]),
+                        rebalancovaci_perioda, zpusob_rebalancovani,
+                        tolerance_vahy, transakcni_poplatek
+                    )
+                else:
+                    vyvoj_portfolia, historie_rebalancovani = sim.simuluj_portfolio(
+                        portfolio, cilove_vahy, pocet_dni, rebalancovaci_perioda,
+                        zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+                        model=model, denni_volatilita=denni_volatilita, rng=rng
+                    )
+                mezipamet.uloz_vysledek(klic_simulace, (vyvoj_portfolia, historie_rebalancovani, portfolio))
+
+        # Uložení výsledků
         vysledky[nazev] = vyvoj_portfolia
 
-        # Statistiky
-        stat.vypis_statistiku(vyvoj_portfolia)
+        # Statistiky – spočítají se jednou pro výpis i export
+        with mereni.etapa("statistiky"):
+            statistiky = mezipamet.ziskej(mezipamet.odvozeny_klic(klic_simulace, "statistiky"),
+                                          lambda: stat.spocitej_statistiky(vyvoj_portfolia))
+        if statistiky is not None:
+            stat.vypis_metriky(statistiky)
+        else:
+            print("Nedostatek dat pro statistiku.")
         celkove_poplatky = sum(z['poplatky_celkem'] for z in historie_rebalancovani)
         print(f"\n$$$ Celkové transakční poplatky: {celkove_poplatky:.2f} Kč")
 
-        # Exporty
-        f.uloz_transakce_do_csv(historie_rebalancovani, prefix=nazev)
-        f.uloz_vyvoj_portfolia_do_csv(vyvoj_portfolia, prefix=nazev)
-        f.uloz_ceny_aktiv_do_csv(portfolio, prefix=nazev)
-        f.uloz_statistiky_do_csv(vyvoj_portfolia, prefix=nazev)
-        uloz_rebalancovani_do_txt(historie_rebalancovani, prefix=nazev)
-
-        # Grafy
-        g.vykresli_ceny_aktiv(portfolio, prefix=nazev)
-        g.vykresli_vyvoj_portfolia(vyvoj_portfolia, prefix=nazev)
-        g.vykresli_vyvoj_vah(portfolio, prefix=nazev)
-        g.vykresli_drawdown(vyvoj_portfolia, prefix=nazev)
-        g.vykresli_histogram_vynosu(vyvoj_portfolia, prefix=nazev)
-        g.vykresli_heatmapu_korelaci(portfolio, prefix=nazev)
-        g.vykresli_realnou_hodnotu_portfolia(vyvoj_portfolia, inflacni_sazba, prefix=nazev)
-        g.vykresli_rolling_volatilitu(vyvoj_portfolia, okno=63, prefix=nazev)
-
-    # === 4. Porovnání všech portfolií ===
-    g.vykresli_vyvoj_vice_portfolii(vysledky)
-    g.vykresli_vyvoj_vice_portfolii_interaktivne(vysledky)
+        # Monte Carlo – rozdělení výsledků přes mnoho scénářů
+        vysledek_mc, klic_mc = vysledky_mc[i], klice_mc[i]
+        if pocet_scenaru > 1:
+            if vysledek_mc is None:
+                with mereni.etapa("monte_carlo"):
+                    portfolio_mc = portfolio.kopie()
+                    vypocitej_zakladni_mnozstvi(portfolio_mc, pocatecni_hodnota)
+                    vysledky_portfolia, klic_mc = monte_carlo(portfolio_mc, [portfolio_mc],
+                                                              [np.arange(len(portfolio_mc))])
+                    vysledek_mc = vysledky_portfolia[0]
+            with mereni.etapa("statistiky"):
+                souhrn_mc = mezipamet.ziskej(mezipamet.odvozeny_klic(klic_mc, "souhrn_scenaru"),
+                                             lambda: stat.souhrn_scenaru(vysledek_mc["hodnoty"]))
+            stat.vypis_souhrn_scenaru(souhrn_mc)
+            # Dosažená redukce rozptylu odhadů průměrů (antitetické páry, Sobol, kontrolní proměnná)
+            if pozadovana_redukce != "zadna" or kontrolni_promenna:
+                rr.vypis_redukci(rr.vyhodnot_redukci(souhrn_mc, vysledek_mc, redukce, kontrolni_promenna,
+                                                     pozadovana_redukce))
+            if adaptivni_mc:
+                stat.vypis_adaptivni_souhrn(vysledek_mc["souhrn"], adaptivni_metriky, adaptivni_tolerance,
+                                            vysledek_mc["prubeh"])
+            # Vějířový graf percentilů místo jednotlivých scénářů
+            if kresleni is not None:
+                with mereni.etapa("grafy"):
+                    kresleni.pridej("vykresli_vejir_scenaru", souhrn_mc["vejir"], souhrn_mc["percentily"],
+                                    prefix=nazev)
+                    kresleni.pridej("vykresli_vejir_scenaru_interaktivne", souhrn_mc["vejir"],
+                                    souhrn_mc["percentily"], prefix=nazev)
+
+        # Exporty – CSV pro čtení člověkem, binární sloupcový formát pro další analýzu
+        # (nezměněné soubory z minulého běhu se stejnými vstupy se nepřepisují)
+        if exportovat:
+            scenare_v_exportu = format_vystupu != "csv" and vysledek_mc is not None
+            klic_exportu = None
+            if klic_mc is not None or not scenare_v_exportu:
+                klic_exportu = mezipamet.odvozeny_klic(klic_simulace, "export", nazev, format_vystupu,
+                                                       klic_mc if scenare_v_exportu else None)
+            with mereni.etapa("export"):
+                if not mezipamet.aktualni_soubory(klic_exportu):
+                    with mereni.sleduj_zapsane_soubory() as zapsane:
+                        if format_vystupu == "csv":
+                            f.uloz_transakce_do_csv(historie_rebalancovani, prefix=nazev)
+                            f.uloz_vyvoj_portfolia_do_csv(vyvoj_portfolia, prefix=nazev)
+                            f.uloz_ceny_aktiv_do_csv(portfolio, prefix=nazev)
+                        else:
+                            f.uloz_vysledky_binarne(
+                                nazev, format_vystupu, portfolio=portfolio, vyvoj=vyvoj_portfolia,
+                                historie=historie_rebalancovani,
+                                hodnoty_scenaru=vysledek_mc["hodnoty"] if vysledek_mc is not None else None
+                            )
+                        f.uloz_statistiky_do_csv(statistiky, prefix=nazev)
+                        uloz_rebalancovani_do_txt(historie_rebalancovani, prefix=nazev)
+                    mezipamet.zaznamenej_soubory(klic_exportu, zapsane)
+
+        # Grafy – vykreslují se na pozadí, simulace dalšího portfolia na ně nečeká
+        if kresleni is None:
+            continue
+        with mereni.etapa("grafy"):
+            kresleni.pridej("vykresli_ceny_aktiv", portfolio, prefix=nazev)
+            kresleni.pridej("vykresli_vyvoj_portfolia", vyvoj_portfolia, prefix=nazev)
+            kresleni.pridej("vykresli_vyvoj_vah", portfolio, prefix=nazev)
+            kresleni.pridej("vykresli_drawdown", vyvoj_portfolia, prefix=nazev)
+            kresleni.pridej("vykresli_histogram_vynosu", vyvoj_portfolia, prefix=nazev)
+            kresleni.pridej("vykresli_heatmapu_korelaci", portfolio, prefix=nazev)
+            kresleni.pridej("vykresli_realnou_hodnotu_portfolia", vyvoj_portfolia, inflacni_sazba, prefix=nazev)
+            kresleni.pridej("vykresli_rolling_volatilitu", vyvoj_portfolia, okno=63, prefix=nazev)
+
+    # === 5. Porovnání všech portfolií ===
+    if kresleni is not None:
+        with mereni.etapa("grafy"):
+            if not (proudova_simulace or pruzkum):
+                kresleni.pridej("vykresli_vyvoj_vice_portfolii", vysledky)
+                kresleni.pridej("vykresli_vyvoj_vice_portfolii_interaktivne", vysledky)
+            kresleni.dokonci()
+
+    mezipamet.vypis_souhrn()
+
+    # === 6. Měření výkonu ===
+    zaznam_mereni = mereni.vypni()
+    if zaznam_mereni is not None:
+        zaznam_mereni.vypis_souhrn()
+        zaznam_mereni.uloz()
+
+def porovnej(soubor_konfigurace="konfigurace.csv", vstupni_soubory=None, exportovat=True, prepsat=None):
+    """
+    Dávkové porovnání mnoha portfolií bez grafů. Vstupní CSV portfolií (a volitelně široké CSV
+    vektorů vah z parametru porovnani_vahy) se převedou na matici vah nad společným vesmírem aktiv
+    a všechna portfolia se vyhodnotí najednou na stejných cenových scénářích (porovnani.py).
+    Výsledkem je tabulka seřazená podle porovnani_razeni (výpis a CSV ve vystupy/porovnani).
+    """
+    from konfigurace import nacti_konfiguraci
+    import porovnani as po
+    import simulace as sim
+    import redukce_rozptylu as rr
+    import soubory as f
+    import mereni
+
+    import numpy as np
+
+    if vstupni_soubory is None:
+        vstupni_soubory = [
+            "portfolio_konzervativni.csv",
+            "portfolio_rizikove.csv"
+        ]
+
+    konfig = nacti_konfiguraci(soubor_konfigurace)
+    konfig.update(prepsat or {})
+    pocatecni_hodnota = int(konfig.get("pocatecni_hodnota", 100000))
+    pocet_dni = int(konfig.get("pocet_dni", 1000))
+    model = konfig.get("model", "typovy")
+    seed = konfig.get("seed")
+    seed = int(seed) if isinstance(seed, float) else None
+    razeni = str(konfig.get("porovnani_razeni", "sharpe_ratio"))
+    try:
+        redukce = rr.over_metodu(konfig.get("redukce_rozptylu", "zadna"))
+    except ValueError as e:
+        print(f"Chyba: {e}")
+        return
+    historicky_backtest = str(konfig.get("historicky_backtest", "false")).lower() == "true"
+
+    if str(konfig.get("mereni", "false")).lower() == "true":
+        mereni.zapni(
+            profilovat=str(konfig.get("mereni_profil", "false")).lower() == "true",
+            sledovat_pamet=str(konfig.get("mereni_pamet", "false")).lower() == "true"
+        )
+
+    uloziste = None
+    if str(konfig.get("cache_scenaru", "false")).lower() == "true":
+        from uloziste import UlozisteScenaru
+        uloziste = UlozisteScenaru(
+            str(konfig.get("cache_slozka", "cache_scenaru")),
+            max_velikost=int(konfig.get("cache_max_mb", 2048)) * 1024 ** 2
+        )
+
+    # Matice vah: vstupní portfolia + řádky širokého CSV nad stejným vesmírem aktiv
+    with mereni.etapa("nacteni"):
+        vesmir, nazvy, vahy = po.nacti_portfolia_vah(vstupni_soubory)
+    if vesmir is None:
+        print("Chyba: žádné portfolio nebylo načteno.")
+        return
+    soubor_vah = konfig.get("porovnani_vahy")
+    if soubor_vah:
+        try:
+            dalsi_nazvy, dalsi_vahy = po.nacti_matici_vah(str(soubor_vah), vesmir)
+            nazvy, vahy = nazvy + dalsi_nazvy, np.vstack((vahy, dalsi_vahy))
+        except FileNotFoundError:
+            print(f"Soubor '{soubor_vah}' nebyl nalezen.")
+        except ValueError as e:
+            print(f"Chyba v datech: {e}")
+    print(f"\n=== Porovnání {len(nazvy)} portfolií nad {len(vesmir)} aktivy ===")
+
+    # Historická data – backtest nad skutečnými cenami nebo bootstrap pro aktiva vesmíru
+    ceny_historie = None
+    if konfig.get("historicka_data"):
+        import historicka_data as hd
+        with mereni.etapa("nacteni"):
+            data_historie = hd.nacti_historicke_ceny(
+                str(konfig["historicka_data"]), str(konfig.get("cache_historie", "cache_historie"))
+            )
+        try:
+            datumy_historie, ceny_historie = hd.vyber_aktiva(data_historie, vesmir.nazvy.tolist())
+        except ValueError as e:
+            print(f"Chyba: {e}")
+            return
+        if model == "bootstrap":
+            hd.priprav_bootstrap(
+                vesmir, ceny_historie, int(konfig.get("bootstrap_delka_bloku", 20)),
+                str(konfig.get("bootstrap_typ", "stacionarni")).lower() == "stacionarni"
+            )
+        if historicky_backtest:
+            vesmir.pocatecni_ceny = ceny_historie[0].copy()
+            print(f"Backtest: {datumy_historie[0]} – {datumy_historie[-1]} ({len(ceny_historie) - 1} dní)")
+    elif historicky_backtest or model == "bootstrap":
+        print("Pozor: backtest i model 'bootstrap' vyžadují historická data (parametr historicka_data).")
+        historicky_backtest = False
+
+    with mereni.etapa("simulace"):
+        tabulka = po.porovnej_portfolia(
+            vesmir, nazvy, vahy, pocet_dni, max(int(konfig.get("pocet_scenaru", 1)), 1),
+            int(konfig.get("rebalancovaci_perioda", 90)), konfig.get("zpusob_rebalancovani", "periodicky"),
+            float(konfig.get("tolerance_vahy", 0.05)), float(konfig.get("transakcni_poplatek", 0.005)),
+            pocatecni_hodnota=pocatecni_hodnota, model=model,
+            denni_volatilita=float(konfig.get("denni_volatilita", 0.02)), rng=seed,
+            pocet_procesu=int(konfig.get("pocet_procesu", 1)), uloziste=uloziste,
+            ceny=ceny_historie[None] if historicky_backtest else None, redukce=redukce
+        )
+    try:
+        serazena = po.serad_tabulku(tabulka, razeni)
+    except ValueError as e:
+        print(f"Chyba: {e}")
+        serazena = po.serad_tabulku(tabulka)
+    po.vypis_porovnani(serazena, vesmir.nazvy.tolist(), int(konfig.get("porovnani_pocet", 20)), razeni)
+    if exportovat:
+        with mereni.etapa("export"):
+            f.uloz_porovnani_do_csv(serazena, vesmir.nazvy.tolist())
+
+    zaznam_mereni = mereni.vypni()
+    if zaznam_mereni is not None:
+        zaznam_mereni.vypis_souhrn()
+        zaznam_mereni.uloz()
+
+def report(prefixy=None, soubor_konfigurace="konfigurace.csv", vykreslit=True, exportovat=True):
+    """
+    Znovu vytvoří statistiky a grafy z uložených výsledků (CSV nebo binární výstup) bez simulace.
+    prefixy -- názvy portfolií (složky ve vystupy/); výchozí jsou všechna uložená portfolia
+    """
+    from konfigurace import nacti_konfiguraci
+    from portfolio import Portfolio
+    import statistiky as stat
+    import soubory as f
+
+    import os
+    import numpy as np
+
+    konfig = nacti_konfiguraci(soubor_konfigurace)
+    inflacni_sazba = float(konfig.get("inflacni_sazba", 0.02))
+    if not prefixy:
+        prefixy = sorted(
+            nazev for nazev in os.listdir("vystupy")
+            if nazev != "porovnani" and os.path.isdir(os.path.join("vystupy", nazev, "statistiky"))
+        ) if os.path.isdir("vystupy") else []
+
+    kresleni = None
+    if vykreslit:
+        from vykreslovani import Vykreslovani
+        kresleni = Vykreslovani(
+            pocet_procesu=int(konfig.get("pocet_procesu_grafu", 0)),
+            dpi=int(konfig.get("dpi_grafu", 300)),
+            format=str(konfig.get("format_grafu", "png")),
+            preskakovat_nezmenene=str(konfig.get("preskakovat_nezmenene_grafy", "true")).lower() == "true",
+            max_bodu=int(konfig.get("max_bodu_grafu", 2000))
+        )
+
+    vysledky = {}
+    for nazev in prefixy:
+        print(f"\n=== Report portfolia: {nazev} ===")
+        try:
+            data = f.nacti_vysledky(nazev)
+        except (FileNotFoundError, OSError, ValueError) as e:
+            print(f"Chyba: výsledky portfolia '{nazev}' nelze načíst ({e}).")
+            continue
+
+        vyvoj_portfolia = data["vyvoj"].tolist()
+        vysledky[nazev] = vyvoj_portfolia
+        statistiky = stat.spocitej_statistiky(data["vyvoj"])
+        if statistiky is None:
+            print("Nedostatek dat pro statistiku.")
+            continue
+        stat.vypis_metriky(statistiky)
+        if exportovat:
+            f.uloz_statistiky_do_csv(statistiky, prefix=nazev)
+
+        if kresleni is None:
+            continue
+        # Pro grafy cen stačí názvy a ceny; historie množství se neukládá, graf vah se proto nekreslí
+        pocet_aktiv = len(data["nazvy"])
+        portfolio = Portfolio(data["nazvy"], ["akcie"] * pocet_aktiv, data["ceny"][0],
+                              [0.0] * pocet_aktiv, [0.0] * pocet_aktiv)
+        portfolio.ceny = np.asarray(data["ceny"])
+        kresleni.pridej("vykresli_ceny_aktiv", portfolio, prefix=nazev)
+        kresleni.pridej("vykresli_vyvoj_portfolia", vyvoj_portfolia, prefix=nazev)
+        kresleni.pridej("vykresli_drawdown", vyvoj_portfolia, prefix=nazev)
+        kresleni.pridej("vykresli_histogram_vynosu", vyvoj_portfolia, prefix=nazev)
+        kresleni.pridej("vykresli_heatmapu_korelaci", portfolio, prefix=nazev)
+        kresleni.pridej("vykresli_realnou_hodnotu_portfolia", vyvoj_portfolia, inflacni_sazba, prefix=nazev)
+        kresleni.pridej("vykresli_rolling_volatilitu", vyvoj_portfolia, okno=63, prefix=nazev)
+
+    if kresleni is not None:
+        if vysledky:
+            kresleni.pridej("vykresli_vyvoj_vice_portfolii", vysledky)
+            kresleni.pridej("vykresli_vyvoj_vice_portfolii_interaktivne", vysledky)
+        kresleni.dokonci()
 
 
 if __name__ == "__main__":
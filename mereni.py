@@ -0,0 +1,228 @@
+# mereni.py
+
+import contextlib
+import json
+import os
+import platform
+import sys
+import time
+
+# Měření výkonu běhu: časy etap, čítače a volitelně cProfile / tracemalloc.
+# Bez zapnutí (zapni()) je etapa() sdílený prázdný kontext a pricti() jen porovnání s None,
+# takže instrumentace v simulaci, exportech a grafech běh prakticky nezpomalí.
+
+SLOZKA_MERENI = os.path.join("vystupy", "mereni")
+
+# Etapy, ve kterých se simulují dny – z jejich času se počítá počet simulovaných dní za sekundu
+ETAPY_SIMULACE = ("generovani_cen", "simulace", "proudova_simulace", "monte_carlo", "pruzkum")
+
+_aktivni = None
+_sledovane = None  # seznam cest zapsaných souborů během sleduj_zapsane_soubory()
+_BEZ_MERENI = contextlib.nullcontext()
+
+# ========================
+# ROZHRANÍ PRO OSTATNÍ MODULY
+# ========================
+
+def zapni(profilovat=False, sledovat_pamet=False):
+    """Zapne měření pro tento proces a vrátí objekt Mereni."""
+    global _aktivni
+    _aktivni = Mereni(profilovat, sledovat_pamet)
+    return _aktivni
+
+def vypni():
+    """Ukončí měření a vrátí jeho objekt Mereni (nebo None, pokud měření neběželo)."""
+    global _aktivni
+    mereni, _aktivni = _aktivni, None
+    if mereni is not None:
+        mereni.ukonci()
+    return mereni
+
+def aktivni():
+    """Právě běžící měření, nebo None."""
+    return _aktivni
+
+def etapa(nazev):
+    """Kontext měřící jednu etapu běhu: `with mereni.etapa("export"): ...`."""
+    if _aktivni is None:
+        return _BEZ_MERENI
+    return _aktivni.etapa(nazev)
+
+def pricti(citac, hodnota=1):
+    """Přičte hodnotu k čítači (např. simulovane_dny, rebalancovani, kontroly_odchylky)."""
+    if _aktivni is not None:
+        _aktivni.citace[citac] = _aktivni.citace.get(citac, 0) + hodnota
+
+def zapsany_soubor(cesta):
+    """Započítá zapsaný soubor a jeho velikost do čítačů zapsane_soubory a zapsane_bajty."""
+    if _sledovane is not None and cesta:
+        _sledovane.append(cesta)
+    if _aktivni is not None and cesta and os.path.exists(cesta):
+        pricti("zapsane_soubory")
+        pricti("zapsane_bajty", os.path.getsize(cesta))
+
+@contextlib.contextmanager
+def sleduj_zapsane_soubory():
+    """
+    Kontext, který sbírá cesty souborů ohlášených přes zapsany_soubor() (i bez zapnutého měření):
+    `with mereni.sleduj_zapsane_soubory() as zapsane: ...` – např. pro mezipaměť exportů.
+    """
+    global _sledovane
+    vnejsi, _sledovane = _sledovane, []
+    zapsane = _sledovane
+    try:
+        yield zapsane
+    finally:
+        _sledovane = vnejsi
+        if vnejsi is not None:
+            vnejsi.extend(zapsane)
+
+# ========================
+# MĚŘENÍ
+# ========================
+
+class Mereni:
+    """
+    Záznam měření jednoho běhu.
+
+    etapy -- {nazev: {"pocet", "cas_s", "max_pamet_b"}} souhrn opakovaných etap
+    udalosti -- každý průchod etapou (začátek od startu měření a trvání) v pořadí běhu
+    citace -- {nazev: hodnota}
+    Vnořená etapa se eviduje jako "vnejsi/vnitrni"; cProfile a tracemalloc měří jen nejvnější etapy.
+    """
+
+    def __init__(self, profilovat=False, sledovat_pamet=False):
+        self.profilovat = profilovat
+        self.sledovat_pamet = sledovat_pamet
+        self.etapy = {}
+        self.udalosti = []
+        self.citace = {}
+        self.profily = {}
+        self._zasobnik = []
+        self._spustil_tracemalloc = False
+        if sledovat_pamet:
+            import tracemalloc
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+                self._spustil_tracemalloc = True
+        self.zacatek = time.perf_counter()
+        self.celkovy_cas = None
+
+    @contextlib.contextmanager
+    def etapa(self, nazev):
+        vnejsi = not self._zasobnik
+        self._zasobnik.append(nazev)
+        klic = "/".join(self._zasobnik)
+
+        profil = None
+        if self.profilovat and vnejsi:
+            import cProfile
+            profil = self.profily.setdefault(klic, cProfile.Profile())
+            profil.enable()
+        if self.sledovat_pamet and vnejsi:
+            import tracemalloc
+            tracemalloc.reset_peak()
+            pamet_pred = tracemalloc.get_traced_memory()[0]
+
+        zacatek = time.perf_counter()
+        try:
+            yield
+        finally:
+            trvani = time.perf_counter() - zacatek
+            if profil is not None:
+                profil.disable()
+            zaznam = self.etapy.setdefault(klic, {"pocet": 0, "cas_s": 0.0, "max_pamet_b": None})
+            zaznam["pocet"] += 1
+            zaznam["cas_s"] += trvani
+            udalost = {"etapa": klic, "zacatek_s": zacatek - self.zacatek, "trvani_s": trvani}
+            if self.sledovat_pamet and vnejsi:
+                import tracemalloc
+                spicka = tracemalloc.get_traced_memory()[1] - pamet_pred
+                zaznam["max_pamet_b"] = max(zaznam["max_pamet_b"] or 0, spicka)
+                udalost["pamet_b"] = spicka
+            self.udalosti.append(udalost)
+            self._zasobnik.pop()
+
+    def ukonci(self):
+        """Zaznamená celkový čas a zastaví tracemalloc, pokud ho měření spustilo."""
+        if self.celkovy_cas is None:
+            self.celkovy_cas = time.perf_counter() - self.zacatek
+        if self._spustil_tracemalloc:
+            import tracemalloc
+            tracemalloc.stop()
+            self._spustil_tracemalloc = False
+
+    def odvozene(self):
+        """Odvozené ukazatele – simulované dny za sekundu v simulačních etapách."""
+        cas_simulace = sum(z["cas_s"] for nazev, z in self.etapy.items()
+                           if nazev.split("/")[0] in ETAPY_SIMULACE and "/" not in nazev)
+        dny = self.citace.get("simulovane_dny", 0)
+        return {
+            "cas_simulace_s": cas_simulace,
+            "simulovane_dny_za_s": dny / cas_simulace if cas_simulace > 0 else None,
+        }
+
+    def _nejnarocnejsi_funkce(self, profil, pocet=20):
+        """Nejnáročnější funkce (podle kumulativního času) z cProfile jako seznam slovníků."""
+        import pstats
+        statistiky = pstats.Stats(profil)
+        radky = []
+        for (soubor, radek, funkce), (_, ncalls, tottime, cumtime, _) in statistiky.stats.items():
+            radky.append({
+                "funkce": f"{os.path.basename(soubor)}:{radek}({funkce})",
+                "volani": ncalls, "vlastni_cas_s": tottime, "kumulativni_cas_s": cumtime
+            })
+        radky.sort(key=lambda r: r["kumulativni_cas_s"], reverse=True)
+        return radky[:pocet]
+
+    def vysledek(self):
+        """Celý záznam měření jako slovník (obsah JSON stopy)."""
+        return {
+            "prostredi": {
+                "cas": time.strftime("%Y-%m-%d %H:%M:%S"),
+                "python": platform.python_version(),
+                "platforma": platform.platform(),
+                "pocet_jader": os.cpu_count(),
+                "argumenty": sys.argv,
+            },
+            "celkovy_cas_s": self.celkovy_cas if self.celkovy_cas is not None
+            else time.perf_counter() - self.zacatek,
+            "etapy": self.etapy,
+            "citace": self.citace,
+            "odvozene": self.odvozene(),
+            "udalosti": self.udalosti,
+            "profil": {nazev: self._nejnarocnejsi_funkce(p) for nazev, p in self.profily.items()},
+        }
+
+    def uloz(self, cesta=None):
+        """
+        Uloží JSON stopu měření (výchozí vystupy/mereni/mereni_<čas>.json). S cProfile se vedle
+        uloží i úplné profily etap (<stopa>_<etapa>.prof pro pstats / snakeviz). Vrací cestu ke stopě.
+        """
+        if cesta is None:
+            cesta = os.path.join(SLOZKA_MERENI, f"mereni_{time.strftime('%Y%m%d_%H%M%S')}.json")
+        os.makedirs(os.path.dirname(cesta) or ".", exist_ok=True)
+        with open(cesta, "w", encoding="utf-8") as f:
+            json.dump(self.vysledek(), f, indent=2, ensure_ascii=False)
+        for nazev, profil in self.profily.items():
+            profil.dump_stats(f"{os.path.splitext(cesta)[0]}_{nazev.replace('/', '_')}.prof")
+        print(f"Měření uloženo do '{cesta}'")
+        return cesta
+
+    def vypis_souhrn(self):
+        """Vypíše tabulku časů etap, čítače a odvozené ukazatele."""
+        celkem = self.celkovy_cas if self.celkovy_cas is not None else time.perf_counter() - self.zacatek
+        print(f"\n--- Měření výkonu: celkem {celkem:.3f} s ---")
+        print(f"{'Etapa':<28}{'Počet':>7}{'Čas (s)':>11}{'Podíl (%)':>11}{'Paměť (MB)':>12}")
+        for nazev, z in sorted(self.etapy.items(), key=lambda p: p[1]["cas_s"], reverse=True):
+            pamet = f"{z['max_pamet_b'] / 1024 ** 2:.1f}" if z["max_pamet_b"] is not None else "-"
+            podil = z["cas_s"] / celkem * 100 if celkem > 0 else 0.0
+            print(f"{nazev:<28}{z['pocet']:>7}{z['cas_s']:>11.3f}{podil:>11.1f}{pamet:>12}")
+
+        if self.citace:
+            print(f"\n{'Čítač':<28}{'Hodnota':>18}")
+            for nazev, hodnota in sorted(self.citace.items()):
+                print(f"{nazev:<28}{hodnota:>18,}".replace(",", " "))
+        rychlost = self.odvozene()["simulovane_dny_za_s"]
+        if rychlost is not None:
+            print(f"{'simulovane_dny_za_s':<28}{rychlost:>18,.0f}".replace(",", " "))
@@ -0,0 +1,172 @@
+# mezipamet.py
+
+import hashlib
+import json
+import os
+import pickle
+import time
+import numpy as np
+
+import mereni
+from uloziste import UlozisteScenaru, hash_obsahu
+
+VERZE_MEZIPAMETI = 1  # změna formátu položek zneplatní celou mezipaměť běhu
+
+# ========================
+# VERZE KÓDU
+# ========================
+
+def verze_kodu(slozka=None):
+    """
+    Otisk zdrojových kódů programu (všechny *.py ve složce programu). Je součástí každého klíče,
+    takže po úpravě kódu se žádný dříve uložený výsledek nepoužije.
+    """
+    slozka = slozka or os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for soubor in sorted(os.listdir(slozka)):
+        if soubor.endswith(".py"):
+            h.update(soubor.encode())
+            with open(os.path.join(slozka, soubor), "rb") as f:
+                h.update(f.read())
+    return h.hexdigest()
+
+def _otisk_souboru(cesta):
+    """(velikost, čas změny v ns) souboru, nebo None, pokud soubor neexistuje."""
+    try:
+        info = os.stat(cesta)
+    except OSError:
+        return None
+    return [info.st_size, info.st_mtime_ns]
+
+# ========================
+# MEZIPAMĚŤ BĚHU
+# ========================
+
+class MezipametBehu(UlozisteScenaru):
+    """
+    Mezipaměť výsledků etap celého běhu (sdílené ceny, simulace portfolia s historií rebalancování,
+    Monte Carlo, statistiky, exporty). Položka je výsledek etapy uložený přes pickle (<klic>.pkl)
+    s metadaty <klic>.json. Klíč je hash právě těch vstupů, na kterých etapa závisí (výřez konfigurace,
+    obsah portfolia, seed), verze numpy a verze zdrojových kódů; etapa zpracovávající výsledek jiné
+    etapy má klíč odvozený z jejího klíče (odvozeny_klic).
+
+    Velikost i mazání nejdéle nepoužitých položek (LRU) přebírá z UlozisteScenaru.
+    aktivni=False (--no-cache, běh bez seedu) vrací místo klíčů None – nic se nenačítá ani neukládá.
+    Výsledek None se neukládá.
+    """
+
+    PRIPONA_DAT = ".pkl"
+
+    def __init__(self, slozka="cache_behu", max_velikost=1024 ** 3, aktivni=True):
+        self.aktivni = aktivni
+        self.zasahy = 0
+        self.vypocty = 0
+        if aktivni:
+            super().__init__(slozka, max_velikost)
+            self.verze_kodu = verze_kodu()
+
+    # === Klíče ===
+
+    def klic(self, etapa, *vstupy):
+        """Klíč výsledku etapy ze všech jejích vstupů; None u neaktivní mezipaměti."""
+        if not self.aktivni:
+            return None
+        return hash_obsahu(VERZE_MEZIPAMETI, np.__version__, self.verze_kodu, etapa, list(vstupy))
+
+    def odvozeny_klic(self, klic_zdroje, etapa, *vstupy):
+        """Klíč etapy, která zpracovává výsledek etapy s klíčem klic_zdroje; None, pokud se zdroj neukládá."""
+        if klic_zdroje is None:
+            return None
+        return hash_obsahu(klic_zdroje, etapa, list(vstupy))
+
+    # === Výsledky etap ===
+
+    def _nacti_objekt(self, klic):
+        if klic is None:
+            return None
+        cesta_dat, cesta_meta = self._cesty(klic)
+        if not (os.path.exists(cesta_dat) and os.path.exists(cesta_meta)):
+            return None
+        try:
+            with open(cesta_meta, encoding="utf-8") as f:
+                metadata = json.load(f)
+            if metadata.get("verze") != VERZE_MEZIPAMETI or metadata.get("klic") != klic:
+                raise ValueError("nesouhlasí verze nebo klíč")
+            if os.path.getsize(cesta_dat) != metadata["velikost"]:
+                raise ValueError("neúplný soubor")
+            with open(cesta_dat, "rb") as f:
+                vysledek = pickle.load(f)
+        except (OSError, ValueError, KeyError, EOFError, pickle.UnpicklingError) as e:
+            print(f"Pozor: uložený výsledek '{klic[:12]}' je poškozený ({e}) – spočítá se znovu.")
+            self.smaz(klic)
+            return None
+
+        # Poslední použití pro LRU
+        os.utime(cesta_meta)
+        return vysledek
+
+    def nacti_vysledek(self, klic):
+        """Uložený výsledek etapy, nebo None, pokud pod klíčem nic není."""
+        vysledek = self._nacti_objekt(klic)
+        if vysledek is not None:
+            self.zasahy += 1
+            mereni.pricti("mezipamet_zasahy")
+        elif klic is not None:
+            self.vypocty += 1
+            mereni.pricti("mezipamet_vypocty")
+        return vysledek
+
+    def uloz_vysledek(self, klic, vysledek):
+        """Uloží výsledek etapy pod klíč (položky větší než celý limit se neukládají) a vrátí ho."""
+        if klic is None or vysledek is None:
+            return vysledek
+        data = pickle.dumps(vysledek, protocol=pickle.HIGHEST_PROTOCOL)
+        if len(data) > self.max_velikost:
+            return vysledek
+        self._uvolni_misto(len(data))
+
+        cesta_dat, cesta_meta = self._cesty(klic)
+        cesta = self.cesta_docasna(klic)
+        with open(cesta, "wb") as f:
+            f.write(data)
+        os.replace(cesta, cesta_dat)
+        with open(cesta_meta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump({"verze": VERZE_MEZIPAMETI, "klic": klic, "velikost": len(data),
+                       "vytvoreno": time.time()}, f)
+        os.replace(cesta_meta + ".tmp", cesta_meta)
+        return vysledek
+
+    def ziskej(self, klic, vypocet):
+        """Výsledek etapy z mezipaměti, nebo vypocet() – ten se pod klíčem uloží."""
+        vysledek = self.nacti_vysledek(klic)
+        if vysledek is None:
+            vysledek = self.uloz_vysledek(klic, vypocet())
+        return vysledek
+
+    # === Zapsané soubory (exporty) ===
+
+    def aktualni_soubory(self, klic):
+        """
+        True, pokud soubory zaznamenané pod klíčem (zaznamenej_soubory) stále existují a od zápisu
+        se nezměnily (velikost a čas změny) – zápis lze přeskočit.
+        """
+        zaznam = self._nacti_objekt(klic)
+        aktualni = bool(zaznam) and all(_otisk_souboru(cesta) == otisk for cesta, otisk in zaznam)
+        if aktualni:
+            self.zasahy += 1
+            mereni.pricti("mezipamet_zasahy")
+        elif klic is not None:
+            self.vypocty += 1
+            mereni.pricti("mezipamet_vypocty")
+        return aktualni
+
+    def zaznamenej_soubory(self, klic, cesty):
+        """Zaznamená soubory zapsané etapou s klíčem `klic` (viz mereni.sleduj_zapsane_soubory)."""
+        otisky = [(cesta, _otisk_souboru(cesta)) for cesta in dict.fromkeys(cesty)]
+        self.uloz_vysledek(klic, [(cesta, otisk) for cesta, otisk in otisky if otisk is not None] or None)
+
+    def vypis_souhrn(self):
+        """Jednořádkový souhrn – vypíše se jen tehdy, když se něco vzalo z mezipaměti."""
+        if self.zasahy:
+            print(f"\nMezipaměť běhu: {self.zasahy} výsledků etap z mezipaměti, "
+                  f"{self.vypocty} spočítáno znovu.")
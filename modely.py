@@ -0,0 +1,293 @@
+# modely.py
+
+import numpy as np
+from konfigurace import PARAMETRY_TYPU_AKTIVA, preved_na_denni
+from korelace import cholesky
+
+# ========================
+# REGISTR MODELŮ
+# ========================
+
+MODELY = {}
+
+def registruj_model(trida):
+    """Dekorátor: zaregistruje model pod jeho názvem (atribut `nazev`)."""
+    MODELY[trida.nazev] = trida()
+    return trida
+
+def ziskej_model(nazev):
+    """Vrátí instanci modelu podle názvu z konfigurace."""
+    try:
+        return MODELY[nazev]
+    except KeyError:
+        raise ValueError(f"Neznámý model vývoje cen: {nazev} (dostupné: {', '.join(MODELY)})")
+
+def priprav_parametry(portfolio, denni_volatilita=0.02):
+    """
+    Jednou předpočítá parametry všech aktiv portfolia (portfolio.Portfolio) do polí,
+    aby je modely nemusely dohledávat v PARAMETRY_TYPU_AKTIVA pro každý den a aktivum.
+    """
+    vychozi = PARAMETRY_TYPU_AKTIVA["akcie"]
+    parametry_typu = [PARAMETRY_TYPU_AKTIVA.get(typ, vychozi) for typ in portfolio.typy.tolist()]
+    rocni_vynosy = np.array([p["ocekavany_vynos"] for p in parametry_typu])
+    rocni_vol = np.array([p["volatilita"] for p in parametry_typu])
+    # Volatilita z kovarianční matice má přednost před volatilitou typu
+    if portfolio.volatility is not None:
+        rocni_vol = np.asarray(portfolio.volatility, dtype=float)
+    denni_vynos, denni_vol = preved_na_denni(rocni_vynosy, rocni_vol)
+
+    return {
+        "pocet_aktiv": len(portfolio),
+        "denni_vynos": denni_vynos,
+        "denni_vol": denni_vol,
+        "korelace": portfolio.korelace,
+        "korelacni_matice": _korelacni_matice(portfolio),
+        "denni_volatilita": denni_volatilita,
+        "bootstrap": portfolio.bootstrap,
+    }
+
+def _korelacni_matice(portfolio):
+    """
+    Korelační matice aktiv: plná matice z portfolia, pokud byla načtena,
+    jinak matice odvozená z korelací s indexem (jednofaktorový model).
+    """
+    if portfolio.korelacni_matice is not None:
+        return portfolio.korelacni_matice
+    matice = np.outer(portfolio.korelace, portfolio.korelace)
+    np.fill_diagonal(matice, 1.0)
+    return matice
+
+class Model:
+    """
+    Základ modelu vývoje cen. Model generuje celý blok denních relativních změn
+    tvaru (pocet_scenaru, pocet_dni, pocet_aktiv) najednou.
+
+    nezavisly_na_ceste -- True, pokud jsou změny jednotlivých dnů nezávislé (stačí
+    jedno volání pro celý horizont). Modely se stavem (volatilita, režim) mají False
+    a engine je volá po blocích dnů, mezi kterými předává `stav`.
+    """
+    nazev = None
+    nezavisly_na_ceste = True
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        """Vrátí (zmeny, stav) – pole relativních změn cen a stav pro navazující blok."""
+        raise NotImplementedError
+
+    def ocekavany_denni_vynos(self, parametry):
+        """
+        Analyticky známá střední hodnota denní relativní změny každého aktiva (nezávislá na dni),
+        nebo None, pokud ji model nemá. Slouží jako kontrolní proměnná (redukce_rozptylu.py).
+        """
+        return parametry["denni_vynos"]
+
+# ========================
+# PŮVODNÍ MODELY
+# ========================
+
+@registruj_model
+class NahodnyModel(Model):
+    """Náhodný model: změna +- uniform(denni_volatilita)."""
+    nazev = "nahodny"
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        vol = parametry["denni_volatilita"]
+        tvar = (pocet_scenaru, pocet_dni, parametry["pocet_aktiv"])
+        return rng.uniform(-vol, vol, size=tvar), stav
+
+    def ocekavany_denni_vynos(self, parametry):
+        return np.zeros(parametry["pocet_aktiv"])
+
+@registruj_model
+class TypovyModel(Model):
+    """Typový model: normální změny podle oček. výnosu a volatility typu aktiva."""
+    nazev = "typovy"
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        tvar = (pocet_scenaru, pocet_dni, parametry["pocet_aktiv"])
+        zmeny = rng.standard_normal(tvar)
+        zmeny *= parametry["denni_vol"]
+        zmeny += parametry["denni_vynos"]
+        return zmeny, stav
+
+@registruj_model
+class KorelacniModel(Model):
+    """Korelační model: kombinace změny indexu a náhodné složky."""
+    nazev = "korelacni"
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        vol = parametry["denni_volatilita"]
+        korelace = parametry["korelace"]
+        zmena_indexu = rng.uniform(-vol, vol, size=(pocet_scenaru, pocet_dni, 1))
+        nahodna_slozka = rng.uniform(-vol, vol, size=(pocet_scenaru, pocet_dni, parametry["pocet_aktiv"]))
+        return korelace * zmena_indexu + (1 - korelace) * nahodna_slozka, stav
+
+    def ocekavany_denni_vynos(self, parametry):
+        return np.zeros(parametry["pocet_aktiv"])
+
+# ========================
+# ROZŠÍŘENÉ MODELY
+# ========================
+
+@registruj_model
+class KovariancniModel(Model):
+    """
+    Normální změny s plnou korelační maticí aktiv: nezávislé šoky všech dnů a scénářů
+    se zkorelují jedním násobením Choleského faktorem (rozklad je v mezipaměti).
+    """
+    nazev = "kovariancni"
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        pocet_aktiv = parametry["pocet_aktiv"]
+        faktor = cholesky(parametry["korelacni_matice"])
+        # Šoky se losují po scénářích, aby je šlo párovat (redukce_rozptylu.ZdrojSoku)
+        soky = rng.standard_normal((pocet_scenaru, pocet_dni, pocet_aktiv)).reshape(-1, pocet_aktiv)
+        zmeny = (soky @ faktor.T).reshape(pocet_scenaru, pocet_dni, pocet_aktiv)
+        zmeny *= parametry["denni_vol"]
+        zmeny += parametry["denni_vynos"]
+        return zmeny, stav
+
+@registruj_model
+class StudentTModel(Model):
+    """Typový model s tlustými chvosty: Studentovo t rozdělení škálované na jednotkový rozptyl."""
+    nazev = "student_t"
+    stupne_volnosti = 4.0
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        nu = self.stupne_volnosti
+        tvar = (pocet_scenaru, pocet_dni, parametry["pocet_aktiv"])
+        zmeny = rng.standard_t(nu, size=tvar)
+        zmeny *= parametry["denni_vol"] * np.sqrt((nu - 2) / nu)
+        zmeny += parametry["denni_vynos"]
+        return zmeny, stav
+
+@registruj_model
+class SkokovyModel(Model):
+    """
+    Mertonův model se skoky: normální změny plus Poissonovy skoky (crash/rally).
+    Drift je kompenzován, takže očekávaný výnos odpovídá typu aktiva.
+    """
+    nazev = "skoky"
+    rocni_intenzita = 0.5      # průměrný počet skoků za rok
+    stredni_skok = -0.04
+    volatilita_skoku = 0.06
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        tvar = (pocet_scenaru, pocet_dni, parametry["pocet_aktiv"])
+        intenzita = self.rocni_intenzita / 252
+        # Skoky jen u aktiv s nenulovou volatilitou (hotovost neskáče)
+        ma_skoky = parametry["denni_vol"] > 0
+
+        zmeny = rng.standard_normal(tvar)
+        zmeny *= parametry["denni_vol"]
+        zmeny += parametry["denni_vynos"] - ma_skoky * intenzita * self.stredni_skok
+        pocet_skoku = rng.poisson(intenzita, size=tvar)
+        velikost = (pocet_skoku * self.stredni_skok
+                    + np.sqrt(pocet_skoku) * self.volatilita_skoku * rng.standard_normal(tvar))
+        zmeny += ma_skoky * velikost
+        return zmeny, stav
+
+@registruj_model
+class GarchModel(Model):
+    """
+    GARCH(1,1): denní rozptyl každého aktiva se vyvíjí podle posledních šoků.
+    Dlouhodobá volatilita odpovídá typu aktiva.
+    """
+    nazev = "garch"
+    nezavisly_na_ceste = False
+    alfa = 0.08
+    beta = 0.90
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        pocet_aktiv = parametry["pocet_aktiv"]
+        dlouhodoby_rozptyl = parametry["denni_vol"] ** 2
+        omega = dlouhodoby_rozptyl * (1 - self.alfa - self.beta)
+        if stav is None:
+            rozptyl = np.broadcast_to(dlouhodoby_rozptyl, (pocet_scenaru, pocet_aktiv)).copy()
+            sok = np.zeros((pocet_scenaru, pocet_aktiv))
+        else:
+            rozptyl, sok = stav
+
+        zmeny = rng.standard_normal((pocet_scenaru, pocet_dni, pocet_aktiv))
+        for den in range(pocet_dni):
+            rozptyl = omega + self.alfa * sok ** 2 + self.beta * rozptyl
+            sok = zmeny[:, den] * np.sqrt(rozptyl)
+            zmeny[:, den] = sok
+        zmeny += parametry["denni_vynos"]
+        return zmeny, (rozptyl, sok)
+
+@registruj_model
+class RezimovyModel(Model):
+    """
+    Dvoustavový model s přepínáním režimů (klid / krize) společným pro celý trh.
+    V krizi je volatilita vyšší a očekávaný výnos nižší; režim se řídí Markovovým řetězcem.
+    """
+    nazev = "rezimy"
+    nezavisly_na_ceste = False
+    setrvani_klid = 0.995
+    setrvani_krize = 0.95
+    nasobek_vol_krize = 2.5
+    posun_vynosu_krize = -0.10  # v násobcích denní volatility
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        krize = np.zeros(pocet_scenaru, dtype=bool) if stav is None else stav
+        nahodne = rng.random((pocet_scenaru, pocet_dni))
+        rezim = np.empty((pocet_scenaru, pocet_dni), dtype=bool)
+        for den in range(pocet_dni):
+            setrvani = np.where(krize, self.setrvani_krize, self.setrvani_klid)
+            krize = krize ^ (nahodne[:, den] >= setrvani)
+            rezim[:, den] = krize
+
+        vol = parametry["denni_vol"]
+        vol_dne = np.where(rezim[..., None], vol * self.nasobek_vol_krize, vol)
+        vynos_dne = parametry["denni_vynos"] + rezim[..., None] * self.posun_vynosu_krize * vol
+        zmeny = rng.standard_normal((pocet_scenaru, pocet_dni, parametry["pocet_aktiv"]))
+        zmeny *= vol_dne
+        zmeny += vynos_dne
+        return zmeny, krize
+
+    def ocekavany_denni_vynos(self, parametry):
+        return None  # závisí na režimu, ve kterém se trh právě nachází
+
+# ========================
+# HISTORICKÝ BOOTSTRAP
+# ========================
+
+@registruj_model
+class BootstrapModel(Model):
+    """
+    Bootstrap historických výnosů: scénáře se skládají z bloků skutečných denních výnosů
+    (všechna aktiva ve stejném dni najednou, takže zůstanou tlusté chvosty i vzájemná závislost).
+    Stacionární bootstrap (Politis–Romano) začíná nový blok v každém dni s pravděpodobností
+    1 / delka_bloku, blokový bootstrap každých delka_bloku dní; blok pokračuje cyklicky.
+    Indexy dní se počítají pro celý horizont najednou a výnosy se vyberou jedním indexováním.
+
+    Vyžaduje parametry["bootstrap"] = {"vynosy", "delka_bloku", "stacionarni"}
+    (viz historicka_data.priprav_bootstrap).
+    """
+    nazev = "bootstrap"
+
+    def generuj(self, parametry, pocet_scenaru, pocet_dni, rng, stav=None):
+        data = parametry["bootstrap"]
+        if data is None:
+            raise ValueError("Model 'bootstrap' vyžaduje historická data (parametr historicka_data v konfiguraci).")
+        vynosy = data["vynosy"]
+        pocet_vynosu = len(vynosy)
+        delka_bloku = max(int(data["delka_bloku"]), 1)
+
+        dny = np.arange(pocet_dni)
+        if data["stacionarni"]:
+            novy_blok = rng.random((pocet_scenaru, pocet_dni)) < 1.0 / delka_bloku
+        else:
+            novy_blok = np.broadcast_to(dny % delka_bloku == 0, (pocet_scenaru, pocet_dni)).copy()
+        novy_blok[:, 0] = True
+        zacatky = rng.integers(0, pocet_vynosu, (pocet_scenaru, pocet_dni))
+
+        # Den začátku aktuálního bloku a posun od něj -> index historického dne
+        zacatek_bloku = np.maximum.accumulate(np.where(novy_blok, dny, 0), axis=1)
+        indexy = np.take_along_axis(zacatky, zacatek_bloku, axis=1)
+        indexy += dny - zacatek_bloku
+        indexy %= pocet_vynosu
+        return vynosy[indexy], stav
+
+    def ocekavany_denni_vynos(self, parametry):
+        return None
@@ -0,0 +1,206 @@
+# porovnani.py
+
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import mereni
+import simulace as sim
+from portfolio import nacti_portfolio, sjednot_portfolia
+from pruzkum import METRIKY_SCENARE, metriky_scenaru, souhrn_metrik
+
+PAMET_HODNOT_MB = 256  # strop pro hodnoty portfolií počítané najednou nad jednou dávkou scénářů
+
+# Metriky, u kterých je lepší nižší hodnota (ostatní se řadí sestupně)
+NIZSI_JE_LEPSI = ("poplatky", "pocet_rebalancovani")
+
+# ========================
+# MATICE VAH
+# ========================
+
+def nacti_portfolia_vah(soubory):
+    """
+    Načte vstupní CSV portfolií a sestaví z nich matici vah nad společným vesmírem aktiv
+    (portfolio.sjednot_portfolia). Aktiva, která portfolio nedrží, mají váhu 0.
+    Nenačtená portfolia se přeskočí. Vrací (vesmir, nazvy_portfolii, vahy (portfolia x aktiva)).
+    """
+    portfolia, nazvy = [], []
+    for soubor in soubory:
+        portfolio = nacti_portfolio(soubor)
+        if not portfolio:
+            print(f"Chyba: {soubor} nebylo načteno.")
+            continue
+        portfolia.append(portfolio)
+        nazvy.append(os.path.splitext(os.path.basename(soubor))[0])
+    if not portfolia:
+        return None, [], np.empty((0, 0))
+
+    vesmir, indexy = sjednot_portfolia(portfolia)
+    vahy = np.zeros((len(portfolia), len(vesmir)))
+    for i, (portfolio, sloupce) in enumerate(zip(portfolia, indexy)):
+        vahy[i, sloupce] = portfolio.vahy
+    return vesmir, nazvy, vahy
+
+def nacti_matici_vah(cesta, vesmir):
+    """
+    Načte široké CSV vektorů vah: první sloupec je název portfolia, další sloupce aktiva
+    (hlavička = názvy aktiv vesmíru, chybějící aktivo má váhu 0). Součet vah v řádku musí být 1.
+    Vrací (nazvy_portfolii, vahy (portfolia x aktiva vesmíru)).
+    """
+    sloupce = {nazev: j for j, nazev in enumerate(vesmir.nazvy.tolist())}
+    with open(cesta, newline='', encoding="utf-8") as csvfile:
+        radky = [radek for radek in csv.reader(csvfile) if radek]
+    if not radky:
+        return [], np.empty((0, len(vesmir)))
+
+    hlavicka = [n.strip() for n in radky[0][1:]]
+    neznama = [n for n in hlavicka if n not in sloupce]
+    if neznama:
+        raise ValueError(f"Aktiva z '{cesta}' nejsou ve vstupních portfoliích: {', '.join(neznama)}")
+
+    cilove = [sloupce[n] for n in hlavicka]
+    nazvy = [radek[0].strip() for radek in radky[1:]]
+    vahy = np.zeros((len(nazvy), len(vesmir)))
+    vahy[:, cilove] = [[float(x or 0.0) for x in radek[1:]] for radek in radky[1:]]
+
+    soucty = vahy.sum(axis=1)
+    spatne = np.flatnonzero(np.abs(soucty - 1.0) > 0.001)
+    if len(spatne):
+        i = spatne[0]
+        raise ValueError(f"Součet vah portfolia '{nazvy[i]}' není 1.0 (aktualně {soucty[i]:.4f})")
+    return nazvy, vahy
+
+def pocatecni_mnozstvi(vesmir, vahy, pocatecni_hodnota):
+    """Počáteční množství (portfolia x aktiva) za počáteční ceny vesmíru."""
+    return vahy / vahy.sum(axis=1, keepdims=True) * pocatecni_hodnota / vesmir.pocatecni_ceny
+
+# ========================
+# VYHODNOCENÍ
+# ========================
+
+def _vyhodnot_nad_cenami(ceny, vahy, mnozstvi, rebalancovaci_perioda, zpusob_rebalancovani,
+                         tolerance_vahy, transakcni_poplatek):
+    """
+    Vyhodnotí všechna portfolia nad tenzorem cen (scénáře x dny x aktiva).
+    Portfolia se berou po skupinách tak, aby hodnoty jedné skupiny nepřesáhly PAMET_HODNOT_MB.
+    Vrací pole (portfolia x scénáře x len(METRIKY_SCENARE)).
+    """
+    pocet_scenaru, pocet_radku, _ = ceny.shape
+    vysledky = np.empty((len(vahy), pocet_scenaru, len(METRIKY_SCENARE)))
+    skupina = max(1, PAMET_HODNOT_MB * 1024 ** 2 // (8 * pocet_scenaru * pocet_radku))
+
+    for od in range(0, len(vahy), skupina):
+        do = min(od + skupina, len(vahy))
+        hodnoty, poplatky, pocet_rebalancovani = sim.vyhodnot_portfolia(
+            ceny, mnozstvi[od:do], vahy[od:do], rebalancovaci_perioda,
+            zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek
+        )
+        vysledky[od:do] = metriky_scenaru(hodnoty, poplatky, pocet_rebalancovani)
+    return vysledky
+
+def _vyhodnot_davku(vesmir, vahy, mnozstvi, pocet_dni, pocet_scenaru, rebalancovaci_perioda,
+                    zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek, model, denni_volatilita,
+                    seed_davky, soubor_cen=None, od=0, zapis=False, redukce="zadna"):
+    """Vygeneruje (nebo z úložiště načte) jednu dávku scénářů a vyhodnotí na ní všechna portfolia."""
+    ceny = sim.ceny_davky(vesmir, pocet_dni, pocet_scenaru, model, denni_volatilita, seed_davky,
+                          soubor_cen, od, zapis, redukce)
+    return _vyhodnot_nad_cenami(ceny, vahy, mnozstvi, rebalancovaci_perioda, zpusob_rebalancovani,
+                                tolerance_vahy, transakcni_poplatek)
+
+def porovnej_portfolia(vesmir, nazvy, vahy, pocet_dni, pocet_scenaru, rebalancovaci_perioda,
+                       zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek, pocatecni_hodnota=100000,
+                       model="typovy", denni_volatilita=0.02, rng=None, velikost_davky=100,
+                       pocet_procesu=1, uloziste=None, ceny=None, redukce="zadna"):
+    """
+    Vyhodnotí mnoho portfolií (řádky matice vah nad aktivy vesmíru) stejnou rebalancovací
+    strategií na stejných cenových scénářích.
+
+    Scénáře se generují po dávkách pro aktiva vesmíru (stejně jako v pruzkum_parametru) a každá
+    dávka se vygeneruje jen jednou – všechna portfolia se nad ní vyhodnotí vektorově najednou
+    (hodnoty portfolia x scénáře x dny). Výsledek tak nezávisí na počtu ani pořadí portfolií.
+    ceny -- pevný tenzor cen (scénáře x dny x aktiva), např. historické ceny pro backtest;
+    pak se nic negeneruje.
+    redukce -- metoda redukce rozptylu šoků (redukce_rozptylu.METODY)
+
+    Vrací tabulku – seznam slovníků (jeden řádek na portfolio v pořadí vstupu) s názvem,
+    vahami a průměry metrik přes scénáře (viz pruzkum.souhrn_metrik).
+    """
+    vahy = np.asarray(vahy, dtype=float)
+    mnozstvi = pocatecni_mnozstvi(vesmir, vahy, pocatecni_hodnota)
+
+    if ceny is not None:
+        pocet_dni, pocet_scenaru = ceny.shape[1] - 1, len(ceny)
+        vysledky = _vyhodnot_nad_cenami(ceny, vahy, mnozstvi, rebalancovaci_perioda,
+                                        zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek)
+    else:
+        davky, proudy = sim.rozdel_na_davky(pocet_scenaru, velikost_davky, rng, redukce)
+        pocet_scenaru = davky[-1][1]
+        pocet_procesu = pocet_procesu or os.cpu_count() or 1
+        pocet_procesu = min(pocet_procesu, len(davky))
+
+        klic, soubor_cen, zapis = sim.priprav_uloziste_davek(
+            uloziste, vesmir, pocet_dni, pocet_scenaru, model, denni_volatilita, davky, proudy, redukce
+        )
+
+        argumenty = [
+            (vesmir, vahy, mnozstvi, pocet_dni, do - od, rebalancovaci_perioda, zpusob_rebalancovani,
+             tolerance_vahy, transakcni_poplatek, model, denni_volatilita, proud, soubor_cen, od, zapis,
+             redukce)
+            for (od, do), proud in zip(davky, proudy)
+        ]
+
+        vysledky = np.empty((len(vahy), pocet_scenaru, len(METRIKY_SCENARE)))
+        if pocet_procesu > 1:
+            with ProcessPoolExecutor(max_workers=pocet_procesu) as executor:
+                for (od, do), vysledek in zip(davky, executor.map(_vyhodnot_davku, *zip(*argumenty))):
+                    vysledky[:, od:do] = vysledek
+        else:
+            for (od, do), arg in zip(davky, argumenty):
+                vysledky[:, od:do] = _vyhodnot_davku(*arg)
+
+        if zapis:
+            uloziste.dokonci(klic, soubor_cen)
+
+    mereni.pricti("simulovane_dny", pocet_dni * pocet_scenaru * len(vahy))
+    mereni.pricti("rebalancovani", int(vysledky[:, :, METRIKY_SCENARE.index("pocet_rebalancovani")].sum()))
+
+    return [
+        {"portfolio": nazev, "vahy": vahy[i], **souhrn_metrik(vysledky[i])}
+        for i, nazev in enumerate(nazvy)
+    ]
+
+# ========================
+# ŘAZENÍ A VÝPIS
+# ========================
+
+def serad_tabulku(tabulka, razeni="sharpe_ratio"):
+    """
+    Seřadí řádky tabulky od nejlepšího podle metriky `razeni` (poplatky a počet rebalancování
+    vzestupně, ostatní sestupně; NaN na konec) a doplní do nich pořadí.
+    """
+    if tabulka and razeni not in tabulka[0]:
+        raise ValueError(f"Neznámá metrika řazení: {razeni}")
+    znamenko = 1 if razeni in NIZSI_JE_LEPSI else -1
+    serazena = sorted(
+        tabulka,
+        key=lambda r: float("inf") if np.isnan(r[razeni]) else znamenko * r[razeni]
+    )
+    for poradi, radek in enumerate(serazena, start=1):
+        radek["poradi"] = poradi
+    return serazena
+
+def vypis_porovnani(serazena, nazvy_aktiv, pocet=20, razeni="sharpe_ratio"):
+    """Vypíše `pocet` nejlepších portfolií seřazené tabulky (serad_tabulku) včetně vah."""
+    if not serazena:
+        print("Porovnání neobsahuje žádná portfolia.")
+        return
+
+    print(f"\n--- Porovnání portfolií: {len(serazena)} portfolií, nejlepší podle '{razeni}' ---")
+    print(f"{'#':>4}  {'Portfolio':<24}{'Konečná (Kč)':>16}{'5. perc. (Kč)':>15}{'CAGR (%)':>10}"
+          f"{'Sharpe':>9}{'Max DD (%)':>11}{'Poplatky (Kč)':>15}{'Rebal.':>8}  Váhy")
+    for r in serazena[:pocet]:
+        vahy = ", ".join(f"{n} {v:.0%}" for n, v in zip(nazvy_aktiv, r["vahy"].tolist()) if v)
+        print(f"{r['poradi']:>4}  {r['portfolio'][:23]:<24}{r['konecna_hodnota']:>16.2f}"
+              f"{r['konecna_hodnota_p5']:>15.2f}{r['cagr']*100:>10.4f}{r['sharpe_ratio']:>9.4f}"
+              f"{r['max_drawdown']*100:>11.2f}{r['poplatky']:>15.2f}{r['pocet_rebalancovani']:>8.1f}  {vahy}")
@@ -2,6 +2,181 @@
 
 import csv
 import os
+import numpy as np
+from konfigurace import PARAMETRY_TYPU_AKTIVA
+from korelace import (nacti_matici, priprav_korelacni_matici, je_pozitivne_definitni,
+                      nejblizsi_korelacni_matice)
+
+# ========================
+# DATOVÝ MODEL PORTFOLIA
+# ========================
+
+class Portfolio:
+    """
+    Portfolio uložené jako paralelní pole (struct-of-arrays): index j ve všech
+    polích odpovídá j-tému aktivu. Ceny jsou 2-D pole (pocet_dni + 1) x pocet_aktiv.
+
+    Pro starší kód, který pracuje se seznamem slovníků, vrací portfolio[j]
+    (a iterace přes portfolio) pohled AktivumPohled se slovníkovým rozhraním.
+    """
+    __slots__ = (
+        "nazvy", "typy", "pocatecni_ceny", "vahy", "korelace", "mnozstvi",
+        "ceny", "historie_mnozstvi", "korelacni_matice", "volatility", "bootstrap"
+    )
+
+    def __init__(self, nazvy, typy, pocatecni_ceny, vahy, korelace,
+                 korelacni_matice=None, volatility=None):
+        self.nazvy = np.asarray(nazvy, dtype=str)
+        self.typy = np.asarray(typy, dtype=str)
+        self.pocatecni_ceny = np.asarray(pocatecni_ceny, dtype=float)
+        self.vahy = np.asarray(vahy, dtype=float)
+        self.korelace = np.asarray(korelace, dtype=float)
+        self.mnozstvi = np.zeros(len(self.nazvy))
+        self.ceny = None                # (pocet_dni + 1, pocet_aktiv) po simulaci
+        self.historie_mnozstvi = None   # HistorieMnozstvi – množství po rebalancováních
+        self.korelacni_matice = korelacni_matice
+        self.volatility = volatility    # roční volatility z kovarianční matice (nebo None)
+        self.bootstrap = None           # historické výnosy pro model "bootstrap" (viz historicka_data.py)
+
+    @classmethod
+    def z_aktiv(cls, aktiva):
+        """Vytvoří portfolio ze seznamu slovníků aktiv (původní formát)."""
+        portfolio = cls(
+            [a['nazev'] for a in aktiva],
+            [a.get('typ', 'akcie') for a in aktiva],
+            [a['cena'] for a in aktiva],
+            [a.get('vaha', 0.0) for a in aktiva],
+            [a.get('korelace', 0.5) for a in aktiva],
+        )
+        if all('mnozstvi' in a for a in aktiva):
+            portfolio.mnozstvi = np.array([a['mnozstvi'] for a in aktiva], dtype=float)
+        return portfolio
+
+    def kopie(self):
+        """Nezávislá kopie portfolia (bez cen a historie množství)."""
+        nove = Portfolio(self.nazvy, self.typy, self.pocatecni_ceny.copy(), self.vahy.copy(),
+                         self.korelace.copy(), self.korelacni_matice, self.volatility)
+        nove.mnozstvi = self.mnozstvi.copy()
+        nove.bootstrap = self.bootstrap
+        return nove
+
+    def alokuj_ceny(self, pocet_dni):
+        """Předalokuje pole cen pro pocet_dni dnů; řádek 0 obsahuje počáteční ceny."""
+        self.ceny = np.empty((pocet_dni + 1, len(self.nazvy)))
+        self.ceny[0] = self.pocatecni_ceny
+        return self.ceny
+
+    def cilove_vahy(self):
+        """Cílové váhy jako slovník {nazev: vaha}."""
+        return dict(zip(self.nazvy.tolist(), self.vahy.tolist()))
+
+    def __len__(self):
+        return len(self.nazvy)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [AktivumPohled(self, j) for j in range(len(self))[index]]
+        return AktivumPohled(self, range(len(self))[index])
+
+    def __iter__(self):
+        return (AktivumPohled(self, j) for j in range(len(self)))
+
+
+class HistorieMnozstvi:
+    """
+    Historie množství jako záznam událostí: dny změn a množství platná od daného dne.
+    Množství se mění jen při rebalancování, takže se neukládá řádek za každý den –
+    hustá matice (dny x aktiva) se rozvine až na vyžádání (jako_pole, indexace, np.asarray).
+
+    dny -- rostoucí pole dnů změn (první je den 0 s počátečními množstvími)
+    mnozstvi -- pole (pocet_udalosti, pocet_aktiv); řádek i platí ode dne dny[i]
+    """
+    __slots__ = ("dny", "mnozstvi")
+
+    def __init__(self, pocatecni_mnozstvi, den=0):
+        self.dny = np.array([den], dtype=np.int64)
+        self.mnozstvi = np.array(pocatecni_mnozstvi, dtype=float)[None, :]
+
+    def pridej(self, dny, mnozstvi):
+        """Připojí změny množství (dny musí navazovat vzestupně); změna ve stejný den přepíše poslední záznam."""
+        dny = np.asarray(dny, dtype=np.int64).reshape(-1)
+        mnozstvi = np.asarray(mnozstvi, dtype=float).reshape(len(dny), -1)
+        if len(dny) and dny[0] == self.dny[-1]:
+            self.dny, self.mnozstvi = self.dny[:-1], self.mnozstvi[:-1]
+        self.dny = np.concatenate([self.dny, dny])
+        self.mnozstvi = np.concatenate([self.mnozstvi, mnozstvi])
+
+    def jako_pole(self, pocet_dni=None):
+        """
+        Hustá matice (pocet_dni x aktiva) množství držených na konci každého dne.
+        Výchozí délka končí posledním rebalancováním (jako původní historie po dnech).
+        """
+        if pocet_dni is None:
+            pocet_dni = len(self)
+        radky = np.searchsorted(self.dny, np.arange(pocet_dni), side="right") - 1
+        return self.mnozstvi[np.maximum(radky, 0)]
+
+    def __len__(self):
+        return int(self.dny[-1]) + 1
+
+    def __getitem__(self, index):
+        return self.jako_pole()[index]
+
+    def __array__(self, dtype=None, copy=None):
+        pole = self.jako_pole()
+        return pole if dtype is None else pole.astype(dtype)
+
+
+class AktivumPohled:
+    """Slovníkový pohled na jedno aktivum portfolia (kompatibilita s původním seznamem slovníků)."""
+    __slots__ = ("_portfolio", "_index")
+
+    _POLE = {
+        'nazev': 'nazvy', 'typ': 'typy', 'cena': 'pocatecni_ceny', 'vaha': 'vahy',
+        'korelace': 'korelace', 'mnozstvi': 'mnozstvi',
+    }
+
+    def __init__(self, portfolio, index):
+        self._portfolio = portfolio
+        self._index = index
+
+    def __getitem__(self, klic):
+        p, j = self._portfolio, self._index
+        if klic in self._POLE:
+            hodnota = getattr(p, self._POLE[klic])[j]
+            return hodnota.item()
+        if klic == 'ceny' and p.ceny is not None:
+            return p.ceny[:, j]
+        if klic == 'historie_mnozstvi' and p.historie_mnozstvi is not None:
+            return p.historie_mnozstvi[:, j]
+        if klic == 'volatilita' and p.volatility is not None:
+            return float(p.volatility[j])
+        raise KeyError(klic)
+
+    def __setitem__(self, klic, hodnota):
+        if klic not in self._POLE or klic in ('nazev', 'typ'):
+            raise KeyError(f"Pole '{klic}' nelze přes pohled měnit.")
+        getattr(self._portfolio, self._POLE[klic])[self._index] = hodnota
+
+    def __contains__(self, klic):
+        try:
+            self[klic]
+            return True
+        except KeyError:
+            return False
+
+    def get(self, klic, vychozi=None):
+        try:
+            return self[klic]
+        except KeyError:
+            return vychozi
+
+    def keys(self):
+        return [k for k in list(self._POLE) + ['ceny', 'historie_mnozstvi', 'volatilita'] if k in self]
+
+# ========================
+# NAČTENÍ PORTFOLIA
+# ========================
 
 def nacti_portfolio(soubor='portfolio_input.csv'):
     """Funkce načte vstupní parametry portfolia
@@ -10,28 +185,32 @@ def nacti_portfolio(soubor='portfolio_input.csv'):
     # Vždy vzhledem ke složce tohoto souboru
     base_dir = os.path.dirname(os.path.abspath(__file__))
     cesta = os.path.join(base_dir, soubor)
-    portfolio = []
-    
+    nazvy, ceny, vahy, typy, korelace = [], [], [], [], []
+
     try:
         with open(cesta, newline='', encoding="utf-8") as csvfile:
             reader = csv.DictReader(csvfile)
             for row in reader:
-                aktivum = {
-                    'nazev': row['Asset'],
-                    'cena': float(row['InitialPrice']),
-                    'vaha': float(row['InitialWeight']),
-                    'typ': row['AssetType'],
-                    'korelace': float(row.get('CorrelationWithIndex', 0.0)) # výchozí hodnota je 0.0
-                }
-                portfolio.append(aktivum)
+                nazvy.append(row['Asset'])
+                ceny.append(float(row['InitialPrice']))
+                vahy.append(float(row['InitialWeight']))
+                typy.append(row['AssetType'])
+                korelace.append(float(row.get('CorrelationWithIndex', 0.0)))  # výchozí hodnota je 0.0
 
         # Oveření, že váhy dávají přibližně 1.0
-        soucet_vah = sum(a['vaha'] for a in portfolio)
+        soucet_vah = sum(vahy)
         if abs(soucet_vah - 1.0) > 0.001:
             raise ValueError(f"Součet vah není 1.0 (aktualně {soucet_vah:.4f})")
-        
+
+        portfolio = Portfolio(nazvy, typy, ceny, vahy, korelace)
+
+        # Volitelná korelační/kovarianční matice ve vedlejším souboru <portfolio>_korelace.csv
+        cesta_matice = os.path.splitext(cesta)[0] + "_korelace.csv"
+        if os.path.exists(cesta_matice):
+            pripoj_korelacni_matici(portfolio, cesta_matice)
+
         return portfolio
-    
+
     except FileNotFoundError:
         print(f"Soubor '{soubor}' nebyl nalezen.")
         return []
@@ -41,42 +220,108 @@ def nacti_portfolio(soubor='portfolio_input.csv'):
     except ValueError as e:
         print(f"Chyba v datech: {e}")
         return []
-    
+
+
+def pripoj_korelacni_matici(portfolio, cesta_matice):
+    """Načte matici korelací (nebo kovariancí ročních výnosů) a uloží ji do portfolia.
+    U kovarianční matice uloží i roční volatility aktiv."""
+    matice, volatility = priprav_korelacni_matici(nacti_matici(cesta_matice, portfolio.nazvy.tolist()))
+    portfolio.korelacni_matice = matice
+    portfolio.volatility = volatility
+
+
+# ========================
+# SPOLEČNÝ VESMÍR AKTIV
+# ========================
+
+TOLERANCE_SHODY_MATIC = 1e-6  # větší rozdíl korelace stejné dvojice ve dvou maticích vyvolá varování
+
+def sjednot_portfolia(portfolia):
+    """
+    Sjednotí aktiva více portfolií do jednoho portfolia (vesmíru) v pořadí prvního výskytu.
+    Parametry aktiva (typ, počáteční cena, korelace s indexem, volatilita) se berou z prvního
+    portfolia, které ho drží. Korelace dvojice aktiv se bere nejdřív ze zadaných matic portfolií
+    (pořadí portfolií; nesouhlasí-li dvě matice, vypíše se varování a platí první), teprve pak
+    z jednofaktorového odhadu portfolia, které drží obě aktiva, ostatní dvojice z korelací s indexem.
+    Váhy vesmíru jsou nulové.
+
+    Vrací (vesmir, indexy) – indexy[i] je pole sloupců vesmíru s aktivy i-tého portfolia.
+    """
+    poradi = {}
+    for portfolio in portfolia:
+        for nazev in portfolio.nazvy.tolist():
+            poradi.setdefault(nazev, len(poradi))
+    indexy = [np.array([poradi[n] for n in p.nazvy.tolist()], dtype=np.intp) for p in portfolia]
+
+    pocet = len(poradi)
+    typy = np.empty(pocet, dtype=object)
+    ceny = np.empty(pocet)
+    korelace = np.empty(pocet)
+    volatility = np.full(pocet, np.nan)
+    prirazeno = np.zeros(pocet, dtype=bool)
+    for portfolio, sloupce in zip(portfolia, indexy):
+        nove = ~prirazeno[sloupce]
+        typy[sloupce[nove]] = portfolio.typy[nove]
+        ceny[sloupce[nove]] = portfolio.pocatecni_ceny[nove]
+        korelace[sloupce[nove]] = portfolio.korelace[nove]
+        if portfolio.volatility is not None:
+            volatility[sloupce[nove]] = np.asarray(portfolio.volatility)[nove]
+        prirazeno[sloupce] = True
+
+    # Zadané matice mají přednost před jednofaktorovými odhady (i z dřívějších portfolií)
+    matice = np.full((pocet, pocet), np.nan)
+    for portfolio, sloupce in zip(portfolia, indexy):
+        if portfolio.korelacni_matice is None:
+            continue
+        blok = np.ix_(sloupce, sloupce)
+        zadana = np.asarray(portfolio.korelacni_matice)
+        if (np.abs(matice[blok] - zadana) > TOLERANCE_SHODY_MATIC).any():
+            print("Pozor: korelační matice portfolií se pro některé dvojice aktiv liší – platí matice "
+                  "portfolia uvedeného dřív.")
+        matice[blok] = np.where(np.isnan(matice[blok]), zadana, matice[blok])
+    for portfolio, sloupce in zip(portfolia, indexy):
+        if portfolio.korelacni_matice is not None:
+            continue
+        odhad = np.outer(portfolio.korelace, portfolio.korelace)
+        np.fill_diagonal(odhad, 1.0)
+        blok = np.ix_(sloupce, sloupce)
+        matice[blok] = np.where(np.isnan(matice[blok]), odhad, matice[blok])
+
+    # Dvojice, které žádné portfolio nedrží společně – jednofaktorový odhad
+    matice = np.where(np.isnan(matice), np.outer(korelace, korelace), matice)
+    if not je_pozitivne_definitni(matice):
+        print("Pozor: sjednocená korelační matice není pozitivně definitní – použije se nejbližší platná matice.")
+        matice = nejblizsi_korelacni_matice(matice)
+
+    # Volatilita z matice jen u části aktiv – ostatní dostanou volatilitu svého typu
+    if np.isnan(volatility).all():
+        volatility = None
+    else:
+        vychozi = PARAMETRY_TYPU_AKTIVA["akcie"]
+        chybi = np.flatnonzero(np.isnan(volatility))
+        volatility[chybi] = [PARAMETRY_TYPU_AKTIVA.get(typy[j], vychozi)["volatilita"] for j in chybi]
+
+    vesmir = Portfolio(list(poradi), typy.astype(str), ceny, np.zeros(pocet), korelace,
+                       korelacni_matice=matice, volatility=volatility)
+    return vesmir, indexy
+
 
 # Výpočet množství jednotek každého aktiva
 def vypocitej_zakladni_mnozstvi(portfolio, pocatecni_hodnota=1000):
     """Funkce na základě počáteční hodnoty portfolia a váhy
     každého aktiva spočítá, kolik jednotek každého aktiva držíme na začátku."""
-    suma_vah = sum(aktivum['vaha'] for aktivum in portfolio)
-    castky = []
-    
-    # Normálně rozdělí mezi všechna aktiva kromě posledního
-    for aktivum in portfolio[:-1]:
-        cilova_castka = (aktivum['vaha'] / suma_vah) * pocatecni_hodnota
-        castky.append(cilova_castka)
-        aktivum['mnozstvi'] = cilova_castka / aktivum['cena']
-        aktivum['historie_mnozstvi'] = [aktivum['mnozstvi']]
-
-    # Poslední aktivum dostane zbytek
-    zbytek = pocatecni_hodnota - sum(castky)
-    posledni = portfolio[-1]
-    posledni['mnozstvi'] = zbytek / posledni['cena']
-    posledni['historie_mnozstvi'] = [posledni['mnozstvi']]
+    suma_vah = sum(portfolio.vahy.tolist())
+
+    # Normálně rozdělí mezi všechna aktiva kromě posledního, poslední dostane zbytek
+    castky = np.empty(len(portfolio))
+    castky[:-1] = (portfolio.vahy[:-1] / suma_vah) * pocatecni_hodnota
+    castky[-1] = pocatecni_hodnota - sum(castky[:-1].tolist())
+
+    portfolio.mnozstvi = castky / portfolio.pocatecni_ceny
+    portfolio.historie_mnozstvi = HistorieMnozstvi(portfolio.mnozstvi)
 
 # Výpočet hodnoty portfolia v čase
 
 def vypocitej_vyvoj_portfolia(portfolio):
     """Funkce každý den spočítá celkovou hodnotu portfolia."""
-
-    pocet_dni = len(portfolio[0]['ceny'])
-    vyvoj = []
-
-    for den in range(pocet_dni):
-        hodnota = 0
-        for aktivum in portfolio:
-            cena = aktivum['ceny'][den]
-            mnozstvi = aktivum['mnozstvi']
-            hodnota += cena * mnozstvi
-        vyvoj.append(hodnota)
-
-    return vyvoj
\ No newline at end of file
+    return (portfolio.ceny @ portfolio.mnozstvi).tolist()
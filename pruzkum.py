@@ -0,0 +1,185 @@
+# pruzkum.py
+
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import mereni
+import simulace as sim
+from statistiky import spocitej_statistiky
+
+# Sloupce výsledků jedné kombinace pro každý scénář
+METRIKY_SCENARE = ("konecna_hodnota", "cagr", "sharpe_ratio", "max_drawdown", "poplatky", "pocet_rebalancovani")
+
+# ========================
+# MŘÍŽKA PARAMETRŮ
+# ========================
+
+def nacti_mrizku(hodnota, prevod=float):
+    """
+    Převede hodnotu z konfigurace na seznam hodnot mřížky.
+    Hodnoty mohou být oddělené mezerou nebo středníkem ("21 63 126", "0.01;0.05"),
+    jedno číslo dává mřížku o jedné hodnotě. Prázdná hodnota vrací prázdný seznam.
+    """
+    if hodnota is None or hodnota == "":
+        return []
+    if isinstance(hodnota, float):
+        return [prevod(hodnota)]
+    casti = str(hodnota).replace(";", " ").split()
+    if prevod in (int, float):
+        return [prevod(float(c)) for c in casti]
+    return [prevod(c) for c in casti]
+
+def _klic_vypoctu(zpusob, perioda, tolerance, poplatek):
+    """
+    Klíč výpočtu kombinace – parametry, které strategii neovlivní, jsou None.
+    Kombinace se stejným klíčem dávají stejný výsledek a počítají se jen jednou.
+    """
+    periodicky = zpusob in ("periodicky", "kombinovane")
+    podle_odchylky = zpusob in ("podle_odchylky", "kombinovane")
+    if not (periodicky or podle_odchylky):
+        return (zpusob, None, None, None)
+    return (
+        zpusob,
+        perioda if periodicky else None,
+        tolerance if podle_odchylky else None,
+        poplatek
+    )
+
+def kombinace_parametru(periody, tolerance, poplatky, zpusoby):
+    """Všechny kombinace parametrů mřížky jako seznam (zpusob, perioda, tolerance, poplatek)."""
+    return list(itertools.product(zpusoby, periody, tolerance, poplatky))
+
+# ========================
+# VYHODNOCENÍ
+# ========================
+
+def metriky_scenaru(hodnoty, poplatky, pocet_rebalancovani):
+    """
+    Metriky METRIKY_SCENARE pro každý scénář. hodnoty -- pole (... x pocet_dni) hodnot ve dnech
+    1..pocet_dni. Vrací pole (... x len(METRIKY_SCENARE)).
+    Statistiky se počítají stejně jako u Monte Carla (statistiky.souhrn_scenaru) – ze dnů 1..pocet_dni.
+    """
+    statistiky = spocitej_statistiky(hodnoty)
+    return np.stack((
+        statistiky.konec, statistiky.cagr, statistiky.sharpe_ratio,
+        statistiky.max_drawdown, poplatky, pocet_rebalancovani
+    ), axis=-1)
+
+def souhrn_metrik(metriky):
+    """Průměry metrik přes scénáře (pole scénáře x METRIKY_SCENARE) jako slovník pro řádek tabulky."""
+    return {
+        "konecna_hodnota": float(metriky[:, 0].mean()),
+        "konecna_hodnota_p5": float(np.percentile(metriky[:, 0], 5)),
+        "cagr": float(metriky[:, 1].mean()),
+        "sharpe_ratio": float(np.nanmean(metriky[:, 2])) if not np.isnan(metriky[:, 2]).all() else float("nan"),
+        "max_drawdown": float(metriky[:, 3].mean()),
+        "poplatky": float(metriky[:, 4].mean()),
+        "pocet_rebalancovani": float(metriky[:, 5].mean()),
+    }
+
+def _vyhodnot_davku(portfolio, cilove_vahy, pocet_dni, pocet_scenaru, model, denni_volatilita,
+                    seed_davky, klice, soubor_cen=None, od=0, zapis=False, redukce="zadna"):
+    """
+    Vygeneruje jednu dávku cenových scénářů a vyhodnotí na ní všechny kombinace `klice`.
+    Vrací pole (pocet_klicu, pocet_scenaru, len(METRIKY_SCENARE)).
+    """
+    ceny = sim.ceny_davky(portfolio, pocet_dni, pocet_scenaru, model, denni_volatilita, seed_davky,
+                          soubor_cen, od, zapis, redukce)
+    vysledky = np.empty((len(klice), pocet_scenaru, len(METRIKY_SCENARE)))
+
+    for k, (zpusob, perioda, tolerance, poplatek) in enumerate(klice):
+        hodnoty, poplatky, pocet_rebalancovani = sim.vyhodnot_scenare(
+            portfolio, cilove_vahy, ceny, perioda, zpusob, tolerance, poplatek or 0.0
+        )
+        vysledky[k] = metriky_scenaru(hodnoty, poplatky, pocet_rebalancovani)
+
+    return vysledky
+
+def pruzkum_parametru(portfolio, cilove_vahy, pocet_dni, pocet_scenaru, periody, tolerance, poplatky,
+                      zpusoby, model="typovy", denni_volatilita=0.02, rng=None, velikost_davky=100,
+                      pocet_procesu=1, uloziste=None, redukce="zadna"):
+    """
+    Vyhodnotí všechny kombinace rebalancovací periody, tolerance vah, poplatku a způsobu
+    rebalancování na stejných cenových scénářích.
+
+    Scénáře se generují po dávkách (stejně jako v simuluj_portfolio_mc) a každá dávka se vygeneruje
+    jen jednou – všechny kombinace se vyhodnotí nad stejným tenzorem cen. Dávky se rozdělí mezi
+    `pocet_procesu` procesů (0 = všechna jádra); výsledek na počtu procesů nezávisí.
+    Kombinace, které se liší jen parametrem bez vlivu na strategii (např. tolerance u periodického
+    rebalancování), se počítají jen jednou. S úložištěm scénářů se ceny čtou z disku (viz simuluj_portfolio_mc).
+    redukce -- metoda redukce rozptylu šoků (redukce_rozptylu.METODY)
+
+    Vrací tabulku – seznam slovníků (jeden řádek na kombinaci v pořadí mřížky) s parametry a
+    průměry metrik přes scénáře: konečná hodnota (průměr a 5. percentil), CAGR, Sharpe ratio,
+    max drawdown, poplatky celkem a počet rebalancování.
+    """
+    kombinace = kombinace_parametru(periody, tolerance, poplatky, zpusoby)
+    klice = list(dict.fromkeys(_klic_vypoctu(*k) for k in kombinace))
+    index_klice = {klic: i for i, klic in enumerate(klice)}
+
+    davky, proudy = sim.rozdel_na_davky(pocet_scenaru, velikost_davky, rng, redukce)
+    pocet_scenaru = davky[-1][1]
+    pocet_procesu = pocet_procesu or os.cpu_count() or 1
+    pocet_procesu = min(pocet_procesu, len(davky))
+
+    klic, soubor_cen, zapis = sim.priprav_uloziste_davek(
+        uloziste, portfolio, pocet_dni, pocet_scenaru, model, denni_volatilita, davky, proudy, redukce
+    )
+
+    argumenty = [
+        (portfolio, cilove_vahy, pocet_dni, do - od, model, denni_volatilita, proud, klice,
+         soubor_cen, od, zapis, redukce)
+        for (od, do), proud in zip(davky, proudy)
+    ]
+
+    vysledky = np.empty((len(klice), pocet_scenaru, len(METRIKY_SCENARE)))
+    if pocet_procesu > 1:
+        with ProcessPoolExecutor(max_workers=pocet_procesu) as executor:
+            for (od, do), vysledek in zip(davky, executor.map(_vyhodnot_davku, *zip(*argumenty))):
+                vysledky[:, od:do] = vysledek
+    else:
+        for (od, do), arg in zip(davky, argumenty):
+            vysledky[:, od:do] = _vyhodnot_davku(*arg)
+
+    if zapis:
+        uloziste.dokonci(klic, soubor_cen)
+    mereni.pricti("simulovane_dny", pocet_dni * pocet_scenaru * len(klice))
+    mereni.pricti("rebalancovani", int(vysledky[:, :, METRIKY_SCENARE.index("pocet_rebalancovani")].sum()))
+
+    tabulka = []
+    for zpusob, perioda, tol, poplatek in kombinace:
+        metriky = vysledky[index_klice[_klic_vypoctu(zpusob, perioda, tol, poplatek)]]
+        tabulka.append({
+            "zpusob": zpusob,
+            "perioda": perioda,
+            "tolerance": tol,
+            "poplatek": poplatek,
+            **souhrn_metrik(metriky),
+        })
+    return tabulka
+
+# ========================
+# VÝPIS
+# ========================
+
+def vypis_pruzkum(tabulka, pocet=10, razeni="sharpe_ratio"):
+    """Vypíše `pocet` nejlepších kombinací seřazených sestupně podle metriky `razeni`."""
+    if not tabulka:
+        print("Průzkum parametrů neobsahuje žádné kombinace.")
+        return
+
+    serazena = sorted(
+        tabulka,
+        key=lambda r: float("-inf") if np.isnan(r[razeni]) else r[razeni],
+        reverse=True
+    )
+    print(f"\n--- Průzkum parametrů: {len(tabulka)} kombinací, nejlepší podle '{razeni}' ---")
+    print(f"{'Způsob':<16}{'Perioda':>8}{'Tolerance':>10}{'Poplatek':>10}"
+          f"{'Konečná (Kč)':>16}{'CAGR (%)':>10}{'Sharpe':>9}{'Max DD (%)':>11}"
+          f"{'Poplatky (Kč)':>15}{'Rebal.':>8}")
+    for r in serazena[:pocet]:
+        print(f"{r['zpusob']:<16}{r['perioda']:>8}{r['tolerance']:>10.3f}{r['poplatek']:>10.4f}"
+              f"{r['konecna_hodnota']:>16.2f}{r['cagr']*100:>10.4f}{r['sharpe_ratio']:>9.4f}"
+              f"{r['max_drawdown']*100:>11.2f}{r['poplatky']:>15.2f}{r['pocet_rebalancovani']:>8.1f}")
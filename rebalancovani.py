@@ -1,71 +1,259 @@
 # rebalancovani.py
 
 import os
+import numpy as np
+import mereni
+from portfolio import HistorieMnozstvi
 
 # Rebalancování portfolia
 
 def rebalancuj_portfolio(portfolio, den, cilove_vahy, historie, poplatek_sazba=0.005):
     """Funkce rebalancuje portfolio v daný den a změny zaznamenává do seznamu 'historie'."""
+    nazvy = portfolio.nazvy.tolist()
+    vahy = np.array([cilove_vahy[nazev] for nazev in nazvy])
+    puvodni_mnozstvi = portfolio.mnozstvi
 
-    # Spočítá celkovou hodnotu portfolia
-    celkova_hodnota = sum(aktivum['ceny'][den] * aktivum['mnozstvi'] for aktivum in portfolio)
+    celkova_hodnota, poplatky, nova_mnozstvi = _rebalancuj_vektor(
+        portfolio.ceny[den], puvodni_mnozstvi, vahy, poplatek_sazba
+    )
+    historie.append(_zaznam_rebalancovani(den, nazvy, puvodni_mnozstvi, nova_mnozstvi, poplatky, celkova_hodnota))
+    zapis_udalosti_mnozstvi(portfolio, [(den, puvodni_mnozstvi, nova_mnozstvi)])
+    mereni.pricti("rebalancovani")
 
-    zaznam = {
+
+def je_odchylka_prilis_velka(portfolio, cilove_vahy, tolerance=0.05, den=-1):
+    """Vrátí True, pokud je nějaká váha aktiva mimo toleranci vůči cíli (v daný den, výchozí je poslední)."""
+    hodnoty = portfolio.mnozstvi * portfolio.ceny[den]
+    aktualni_vahy = hodnoty / _soucet_aktiv(hodnoty)
+    vahy = np.array([cilove_vahy[nazev] for nazev in portfolio.nazvy.tolist()])
+    mereni.pricti("kontroly_odchylky")
+    return bool((np.abs(aktualni_vahy - vahy) > tolerance).any())
+
+
+def zapis_udalosti_mnozstvi(portfolio, udalosti):
+    """
+    Zapíše rebalancování (den, puvodni_mnozstvi, nova_mnozstvi) do portfolia:
+    nastaví aktuální množství a připojí změny do historie množství (portfolio.HistorieMnozstvi).
+    """
+    if not udalosti:
+        return
+    if portfolio.historie_mnozstvi is None:
+        portfolio.historie_mnozstvi = HistorieMnozstvi(udalosti[0][1])
+    portfolio.historie_mnozstvi.pridej([u[0] for u in udalosti], [u[2] for u in udalosti])
+    portfolio.mnozstvi = np.array(udalosti[-1][2], dtype=float)
+
+# ========================
+# MATICOVÝ REBALANCOVACÍ ENGINE
+# ========================
+
+BLOK_DNI_MIN = 16   # první blok dnů po rebalancování (odchylka často přijde brzy)
+BLOK_DNI_MAX = 512  # blok se při hledání odchylky zdvojnásobuje až do této délky
+
+def _soucet_aktiv(matice):
+    """Sečte poslední osu postupně zleva – stejné pořadí sčítání jako vestavěné sum()."""
+    vysledek = matice[..., 0].copy()
+    for j in range(1, matice.shape[-1]):
+        vysledek += matice[..., j]
+    return vysledek
+
+def _rebalancuj_vektor(ceny_dne, mnozstvi, vahy, poplatek_sazba):
+    """
+    Vektorová obdoba rebalancuj_portfolio pro jeden den. Vrací (celková hodnota, poplatky, nová množství).
+    Ceny, množství a váhy mohou mít i tvar (scénáře x aktiva) – pak se rebalancuje každý řádek zvlášť.
+    """
+    celkova_hodnota = _soucet_aktiv(ceny_dne * mnozstvi)
+    cilova_castka = celkova_hodnota[..., None] * vahy
+    rozdil_castky = cilova_castka - mnozstvi * ceny_dne
+    poplatky = np.abs(rozdil_castky) * poplatek_sazba
+    skutecna_castka = np.where(rozdil_castky > 0, cilova_castka - poplatky, cilova_castka + poplatky)
+    return celkova_hodnota, poplatky, skutecna_castka / ceny_dne
+
+def _zaznam_rebalancovani(den, nazvy, puvodni_mnozstvi, nova_mnozstvi, poplatky, celkova_hodnota):
+    """Záznam jednoho rebalancování do seznamu 'historie'."""
+    return {
         'den': den,
-        'transakce': [],
-        'poplatky_celkem': 0.0,
-        'hodnota_portfolia': celkova_hodnota
+        'transakce': [
+            {
+                'aktivum': nazev,
+                'puvodni': puvodni,
+                'nove': nove,
+                'rozdil': nove - puvodni,
+                'poplatek': poplatek
+            }
+            for nazev, puvodni, nove, poplatek in zip(
+                nazvy, puvodni_mnozstvi.tolist(), nova_mnozstvi.tolist(), poplatky.tolist()
+            )
+        ],
+        'poplatky_celkem': float(_soucet_aktiv(poplatky)),
+        'hodnota_portfolia': float(celkova_hodnota)
     }
 
-    # Pro každé aktivum spočítá nové množství
-    for aktivum in portfolio:
-        nazev = aktivum['nazev']
-        cilova_vaha = cilove_vahy[nazev]
-        cilova_castka = celkova_hodnota * cilova_vaha
-        aktualni_cena = aktivum['ceny'][den]
-
-        puvodni_mnozstvi = aktivum['mnozstvi']
-        aktualni_hodnota = puvodni_mnozstvi * aktualni_cena
-
-        # Výpočet rozdílu (nákup/prodej)
-        rozdil_castky = cilova_castka - aktualni_hodnota
-        poplatek = abs(rozdil_castky) * poplatek_sazba
-        zaznam['poplatky_celkem'] += poplatek
-
-        # Částka dostupná pro nákup/prodej po odečtení poplatku
-        skutecna_castka = cilova_castka - poplatek if rozdil_castky > 0 else cilova_castka + poplatek
-        nove_mnozstvi = skutecna_castka / aktualni_cena
-
-        aktivum['mnozstvi'] = nove_mnozstvi
-
-        # Uložení historie množství
-        if "historie_mnozstvi" not in aktivum:
-            aktivum["historie_mnozstvi"] = []
-        # Doplníme historii až do aktuálního dne (pokud ještě chybí)
-        while len(aktivum["historie_mnozstvi"]) < den:
-            aktivum["historie_mnozstvi"].append(puvodni_mnozstvi)
-        aktivum["historie_mnozstvi"].append(nove_mnozstvi)
-
-        zaznam['transakce'].append({
-            'aktivum': nazev,
-            'puvodni': puvodni_mnozstvi,
-            'nove': nove_mnozstvi,
-            'rozdil': nove_mnozstvi - puvodni_mnozstvi,
-            'poplatek': poplatek
-        })
-
-    historie.append(zaznam)
-
-
-def je_odchylka_prilis_velka(portfolio, cilove_vahy, tolerance=0.05):
-    """Vrátí True, pokud je nějaká váha aktiva mimo toleranci vůči cíli."""
-    celkova_hodnota = sum(a['mnozstvi'] * a['ceny'][-1] for a in portfolio)
-    for aktivum in portfolio:
-        aktualni_vaha = (aktivum['mnozstvi'] * aktivum['ceny'][-1]) / celkova_hodnota
-        cilova_vaha = cilove_vahy[aktivum['nazev']]
-        if abs(aktualni_vaha - cilova_vaha) > tolerance:
-            return True
-    return False
+def simuluj_rebalancovani(ceny, mnozstvi, vahy, nazvy, rebalancovaci_perioda,
+                          zpusob_rebalancovani, tolerance_vahy, poplatek_sazba, posun_dni=0):
+    """
+    Projde matici cen (pocet_dni + 1) x pocet_aktiv s vektorem množství a provádí rebalancování.
+    Mezi dvěma rebalancováními se hodnota a odchylky vah počítají pro celé úseky dnů najednou
+    a simulace skočí rovnou na další den rebalancování (násobek periody nebo první překročení tolerance).
+
+    Vrací (vyvoj, historie, udalosti):
+        vyvoj -- pole hodnot portfolia ve dnech 1..pocet_dni
+        historie -- záznamy rebalancování ve stejném tvaru jako rebalancuj_portfolio
+        udalosti -- seznam (den, puvodni_mnozstvi, nova_mnozstvi) pro každé rebalancování
+
+    posun_dni -- číslo dne před prvním řádkem matice; umožňuje zpracovat simulaci po blocích
+    (řádek i pak odpovídá dni posun_dni + i a dny v historii jsou uvedeny v celkovém číslování).
+    """
+    pocet_dni = ceny.shape[0] - 1
+    mnozstvi = np.array(mnozstvi, dtype=float)
+    vahy = np.asarray(vahy, dtype=float)
+    periodicky = zpusob_rebalancovani in ("periodicky", "kombinovane")
+    podle_odchylky = zpusob_rebalancovani in ("podle_odchylky", "kombinovane")
+
+    vyvoj = np.empty(pocet_dni)
+    historie = []
+    udalosti = []
+
+    den = 1
+    while den <= pocet_dni:
+        # Konec úseku: nejbližší násobek periody (včetně) nebo konec simulace
+        konec = pocet_dni
+        den_udalosti = None
+        if periodicky:
+            dalsi_perioda = -(-(den + posun_dni) // rebalancovaci_perioda) * rebalancovaci_perioda - posun_dni
+            if dalsi_perioda <= pocet_dni:
+                konec = dalsi_perioda
+                den_udalosti = dalsi_perioda
+
+        # Hodnoty (a případně odchylky vah) po blocích až do konce úseku
+        od = den
+        blok = BLOK_DNI_MIN
+        while od <= konec:
+            do = min(od + blok - 1, konec) if podle_odchylky else konec
+            blok_cen = ceny[od:do + 1]
+            hodnoty = _soucet_aktiv(blok_cen * mnozstvi)
+            if podle_odchylky:
+                aktualni_vahy = (mnozstvi * blok_cen) / hodnoty[:, None]
+                mimo = (np.abs(aktualni_vahy - vahy) > tolerance_vahy).any(axis=1)
+                if mimo.any():
+                    prvni = int(mimo.argmax())
+                    mereni.pricti("kontroly_odchylky", prvni + 1)
+                    vyvoj[od - 1:od - 1 + prvni] = hodnoty[:prvni]
+                    den_udalosti = od + prvni
+                    break
+                mereni.pricti("kontroly_odchylky", len(mimo))
+            vyvoj[od - 1:do] = hodnoty
+            od = do + 1
+            blok = min(2 * blok, BLOK_DNI_MAX)
+
+        if den_udalosti is None:
+            den = konec + 1
+            continue
+
+        # Rebalancování v den události
+        ceny_dne = ceny[den_udalosti]
+        celkova_hodnota, poplatky, nova_mnozstvi = _rebalancuj_vektor(ceny_dne, mnozstvi, vahy, poplatek_sazba)
+        historie.append(_zaznam_rebalancovani(
+            den_udalosti + posun_dni, nazvy, mnozstvi, nova_mnozstvi, poplatky, celkova_hodnota
+        ))
+        udalosti.append((den_udalosti + posun_dni, mnozstvi, nova_mnozstvi))
+
+        mnozstvi = nova_mnozstvi
+        vyvoj[den_udalosti - 1] = _soucet_aktiv(ceny_dne * mnozstvi)
+        den = den_udalosti + 1
+
+    return vyvoj, historie, udalosti
+
+# ========================
+# DÁVKOVÝ ENGINE PRO VÍCE SCÉNÁŘŮ
+# ========================
+
+def simuluj_rebalancovani_scenaru(ceny, mnozstvi, vahy, rebalancovaci_perioda,
+                                  zpusob_rebalancovani, tolerance_vahy, poplatek_sazba):
+    """
+    Rebalancování všech scénářů najednou nad tenzorem cen (scénáře x (pocet_dni + 1) x aktiva).
+    Simulace postupuje po dnech, množství jsou pole (scénáře x aktiva); scénáře, které v daný den
+    překročí toleranci vah (nebo jde o den periody), se vyberou maskou a rebalancují stejně jako
+    v rebalancuj_portfolio. Každý scénář dává stejné výsledky jako simuluj_rebalancovani nad jeho cenami.
+
+    mnozstvi -- počáteční množství (aktiva) pro všechny scénáře, nebo (scénáře x aktiva)
+    vahy -- cílové váhy (aktiva), nebo (scénáře x aktiva) – každý řádek může mít vlastní cíl
+
+    Vrací (hodnoty, poplatky, pocet_rebalancovani):
+        hodnoty -- pole (scénáře x pocet_dni) s hodnotou portfolia ve dnech 1..pocet_dni
+        poplatky -- celkové transakční poplatky každého scénáře
+        pocet_rebalancovani -- počet rebalancování každého scénáře
+    """
+    pocet_scenaru, _, pocet_aktiv = ceny.shape
+    mnozstvi = np.array(np.broadcast_to(mnozstvi, (pocet_scenaru, pocet_aktiv)), dtype=float)
+    vahy = np.broadcast_to(np.asarray(vahy, dtype=float), (pocet_scenaru, pocet_aktiv))
+    return _rebalancuj_po_dnech(ceny, mnozstvi, vahy, None, rebalancovaci_perioda,
+                                zpusob_rebalancovani, tolerance_vahy, poplatek_sazba)
+
+def simuluj_rebalancovani_portfolii(ceny, mnozstvi, vahy, rebalancovaci_perioda,
+                                   zpusob_rebalancovani, tolerance_vahy, poplatek_sazba):
+    """
+    Stejné rebalancování jako simuluj_rebalancovani_scenaru pro více portfolií nad stejným tenzorem cen.
+    mnozstvi a vahy mají tvar (portfolia x aktiva); každé portfolio se vyhodnotí na všech scénářích.
+    Ceny se mezi portfolii nekopírují – řádky simulace jen odkazují na svůj scénář.
+
+    Vrací (hodnoty, poplatky, pocet_rebalancovani) s tvary (portfolia x scénáře x pocet_dni),
+    (portfolia x scénáře) a (portfolia x scénáře).
+    """
+    pocet_scenaru, pocet_radku, _ = ceny.shape
+    pocet_portfolii = len(mnozstvi)
+    hodnoty, poplatky, pocet_rebalancovani = _rebalancuj_po_dnech(
+        ceny,
+        np.repeat(np.asarray(mnozstvi, dtype=float), pocet_scenaru, axis=0),
+        np.repeat(np.asarray(vahy, dtype=float), pocet_scenaru, axis=0),
+        np.tile(np.arange(pocet_scenaru), pocet_portfolii),
+        rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, poplatek_sazba
+    )
+    tvar = (pocet_portfolii, pocet_scenaru)
+    return (hodnoty.reshape(tvar + (pocet_radku - 1,)), poplatky.reshape(tvar),
+            pocet_rebalancovani.reshape(tvar))
+
+def _rebalancuj_po_dnech(ceny, mnozstvi, vahy, scenare, rebalancovaci_perioda,
+                         zpusob_rebalancovani, tolerance_vahy, poplatek_sazba):
+    """
+    Jádro dávkového rebalancování. mnozstvi a vahy mají tvar (řádky x aktiva),
+    scenare je index scénáře cen každého řádku (None = řádek i odpovídá scénáři i).
+    """
+    pocet_dni = ceny.shape[1] - 1
+    pocet_radku = len(mnozstvi)
+    periodicky = zpusob_rebalancovani in ("periodicky", "kombinovane")
+    podle_odchylky = zpusob_rebalancovani in ("podle_odchylky", "kombinovane")
+
+    hodnoty = np.empty((pocet_radku, pocet_dni))
+    poplatky = np.zeros(pocet_radku)
+    pocet_rebalancovani = np.zeros(pocet_radku, dtype=int)
+    vsechny = np.arange(pocet_radku)
+    zadne = vsechny[:0]
+
+    for den in range(1, pocet_dni + 1):
+        ceny_dne = ceny[:, den] if scenare is None else ceny[:, den][scenare]
+        hodnoty_aktiv = ceny_dne * mnozstvi
+        hodnota = _soucet_aktiv(hodnoty_aktiv)
+
+        if periodicky and den % rebalancovaci_perioda == 0:
+            radky = vsechny
+        elif podle_odchylky:
+            mimo = (np.abs(hodnoty_aktiv / hodnota[:, None] - vahy) > tolerance_vahy).any(axis=1)
+            radky = np.flatnonzero(mimo)
+        else:
+            radky = zadne
+
+        if len(radky):
+            ceny_radku = ceny_dne[radky]
+            _, poplatek, nova_mnozstvi = _rebalancuj_vektor(ceny_radku, mnozstvi[radky], vahy[radky], poplatek_sazba)
+            mnozstvi[radky] = nova_mnozstvi
+            poplatky[radky] += _soucet_aktiv(poplatek)
+            pocet_rebalancovani[radky] += 1
+            hodnota[radky] = _soucet_aktiv(ceny_radku * nova_mnozstvi)
+        hodnoty[:, den - 1] = hodnota
+
+    if podle_odchylky:
+        mereni.pricti("kontroly_odchylky", pocet_radku * pocet_dni)
+    return hodnoty, poplatky, pocet_rebalancovani
 
 def uloz_rebalancovani_do_txt(historie, prefix=""):
     """Uloží historii rebalancování do textového souboru ve výstupy/<prefix>/statistiky/."""
@@ -89,4 +277,5 @@ def uloz_rebalancovani_do_txt(historie, prefix=""):
                         f"(změna: {transakce['rozdil']:+.4f}, poplatek: {transakce['poplatek']:.2f} Kč)\n")
             f.write("-" * 45 + "\n")
     
+    mereni.zapsany_soubor(cesta)
     print(f"Rebalancování bylo uloženo do: {cesta}")
\ No newline at end of file
@@ -0,0 +1,267 @@
+# redukce_rozptylu.py
+
+import numpy as np
+
+# Metody redukce rozptylu Monte Carlo scénářů (parametr redukce_rozptylu v konfiguraci).
+# Kontrolní proměnná (parametr kontrolni_promenna) se kombinuje s kteroukoli z nich.
+METODY = ("zadna", "antiteticke", "sobol")
+
+MAX_DIMENZE_SOBOL = 21201  # nejvyšší dimenze Sobolovy posloupnosti ve scipy.stats.qmc
+EPSILON_SOBOL = 1e-12      # ořez bodů před inverzní distribuční funkcí (ndtri(0) = -inf)
+MIN_NEZAVISLYCH_ODHADU = 10  # nejméně nezávislých odhadů (páry, dávky Sobola) pro odhad rozptylu průměru
+
+# ========================
+# VÝBĚR METODY
+# ========================
+
+def _je_scipy_dostupne():
+    try:
+        import scipy.stats.qmc
+        import scipy.special
+        return True
+    except ImportError:
+        return False
+
+def over_metodu(metoda):
+    """
+    Ověří název metody z konfigurace a vrátí ho. Sobolova posloupnost potřebuje scipy –
+    bez něj se vypíše upozornění a použijí se pseudonáhodné šoky ("zadna").
+    """
+    metoda = str(metoda or "zadna").lower()
+    if metoda not in METODY:
+        raise ValueError(f"Neznámá metoda redukce rozptylu: {metoda} (dostupné: {', '.join(METODY)})")
+    if metoda == "sobol" and not _je_scipy_dostupne():
+        print("Knihovna scipy není nainstalována – Sobolova posloupnost se nepoužije, šoky budou pseudonáhodné.")
+        return "zadna"
+    return metoda
+
+def velikost_davky_sobol(pocet_scenaru, velikost_davky):
+    """
+    Velikost dávky scénářů pro Sobolovu posloupnost: mocnina dvou (jen tak jsou body scrambled
+    Sobolovy posloupnosti vyvážené), nejvýš `velikost_davky` a tak malá, aby `pocet_scenaru` dal
+    aspoň MIN_NEZAVISLYCH_ODHADU dávek – dávky jsou nezávislé repliky pro odhad rozptylu.
+    """
+    horni = max(min(velikost_davky, pocet_scenaru // MIN_NEZAVISLYCH_ODHADU), 1)
+    return 1 << (horni.bit_length() - 1)
+
+def zdroj_soku(rng, metoda="zadna"):
+    """Zdroj náhodných šoků pro modely: generátor beze změny, nebo ZdrojSoku se zvolenou metodou."""
+    if metoda in (None, "zadna"):
+        return rng
+    return ZdrojSoku(rng, metoda)
+
+# ========================
+# ZDROJ ŠOKŮ
+# ========================
+
+class ZdrojSoku:
+    """
+    Obal generátoru (np.random.Generator), který modely používají místo něj.
+    standard_normal, uniform a random vrací šoky zvolenou metodou, ostatní metody
+    (poisson, standard_t, integers...) předává generátoru beze změny.
+    První osa tvaru šoků jsou scénáře – metoda páruje, resp. rozprostírá, právě scénáře.
+
+    antiteticke -- scénáře jdou v párech (2k, 2k + 1) se zrcadlovými šoky z a -z (u a 1 - u)
+    sobol -- každý scénář je bod scrambled Sobolovy posloupnosti v dimenzi dny x aktiva,
+             normální šoky vzniknou inverzní distribuční funkcí; počet scénářů v dávce má být
+             mocnina dvou (velikost_davky_sobol), jinak scipy upozorní na nevyvážené body
+    """
+
+    def __init__(self, rng, metoda):
+        self.rng = rng
+        self.metoda = metoda
+
+    def __getattr__(self, nazev):
+        return getattr(self.rng, nazev)
+
+    def _zrcadlove(self, polovina, zrcadlo, pocet):
+        """Proloží šoky s jejich zrcadlovým obrazem po scénářích a ořízne na `pocet` scénářů."""
+        vysledek = np.empty((2 * len(polovina),) + polovina.shape[1:])
+        vysledek[0::2] = polovina
+        vysledek[1::2] = zrcadlo
+        return vysledek[:pocet]
+
+    def _sobol(self, tvar):
+        """Body scrambled Sobolovy posloupnosti v (0, 1) tvaru `tvar` (scénáře x ...)."""
+        from scipy.stats import qmc
+        pocet, dimenze = tvar[0], int(np.prod(tvar[1:]))
+        casti = []
+        # Nad nejvyšší podporovanou dimenzí se přidají další nezávisle scramblované posloupnosti
+        for od in range(0, dimenze, MAX_DIMENZE_SOBOL):
+            d = min(MAX_DIMENZE_SOBOL, dimenze - od)
+            seed = int(self.rng.integers(2 ** 63))
+            try:
+                posloupnost = qmc.Sobol(d, scramble=True, rng=seed)
+            except TypeError:  # scipy < 1.15
+                posloupnost = qmc.Sobol(d, scramble=True, seed=seed)
+            casti.append(posloupnost.random(pocet))
+        body = np.concatenate(casti, axis=1) if len(casti) > 1 else casti[0]
+        np.clip(body, EPSILON_SOBOL, 1 - EPSILON_SOBOL, out=body)
+        return body.reshape(tvar)
+
+    def _rovnomerne(self, tvar):
+        if self.metoda == "sobol":
+            return self._sobol(tvar)
+        u = self.rng.random(((tvar[0] + 1) // 2,) + tvar[1:])
+        return self._zrcadlove(u, 1 - u, tvar[0])
+
+    def random(self, size=None):
+        tvar = _tvar(size)
+        if tvar is None:
+            return self.rng.random(size)
+        return self._rovnomerne(tvar)
+
+    def uniform(self, low=0.0, high=1.0, size=None):
+        tvar = _tvar(size)
+        if tvar is None:
+            return self.rng.uniform(low, high, size)
+        return low + (high - low) * self._rovnomerne(tvar)
+
+    def standard_normal(self, size=None):
+        tvar = _tvar(size)
+        if tvar is None:
+            return self.rng.standard_normal(size)
+        if self.metoda == "sobol":
+            from scipy.special import ndtri
+            return ndtri(self._sobol(tvar))
+        z = self.rng.standard_normal(((tvar[0] + 1) // 2,) + tvar[1:])
+        return self._zrcadlove(z, -z, tvar[0])
+
+def _tvar(size):
+    """Tvar šoků jako n-tice, nebo None pro skalár (takový šok se nepáruje)."""
+    if size is None:
+        return None
+    tvar = tuple(np.atleast_1d(size).tolist())
+    return tvar if tvar and tvar[0] > 0 else None
+
+# ========================
+# DOSAŽENÁ REDUKCE ROZPTYLU
+# ========================
+
+def nezavisle_odhady(y, metoda, davky):
+    """
+    Nezávislé, stejně rozdělené odhady průměru hodnot `y` po scénářích při zvolené metodě:
+    antiteticke -- průměry párů (2k, 2k + 1) v rámci dávek
+    sobol -- průměry dávek (každá dávka je nezávisle scramblovaná posloupnost)
+    zadna -- samotné scénáře
+    """
+    if metoda == "antiteticke":
+        prvni = np.concatenate([np.arange(od, od + (do - od) // 2 * 2, 2) for od, do in davky])
+        return (y[prvni] + y[prvni + 1]) / 2
+    if metoda == "sobol":
+        return np.array([y[od:do].mean() for od, do in davky])
+    return y
+
+def rozptyl_odhadu(y, metoda, davky, ddof=1):
+    """
+    Odhad rozptylu průměru `y` z nezávislých odhadů (nezavisle_odhady), nebo None, je-li jich málo.
+    ddof=2 pro hodnoty upravené kontrolní proměnnou, jejíž β se odhadlo ze stejných odhadů.
+    """
+    odhady = nezavisle_odhady(y, metoda, davky)
+    if len(odhady) <= ddof:
+        return None
+    return odhady.var(ddof=ddof) / len(odhady)
+
+def vyhodnot_redukci(souhrn, vysledek_mc, metoda="zadna", kontrolni=False, pozadovana=None):
+    """
+    Dosažená redukce rozptylu odhadů průměrných metrik Monte Carla.
+    souhrn -- statistiky.souhrn_scenaru, vysledek_mc -- výsledek simulace.simuluj_portfolio_mc.
+
+    Redukce je poměr rozptylu prostého Monte Carla se stejným počtem scénářů (s² / n)
+    a rozptylu odhadu zvolenou metodou – kolikrát víc scénářů by prosté MC potřebovalo.
+    Kontrolní proměnná je konečná hodnota stejného portfolia bez rebalancování; její
+    střední hodnota plyne z očekávaných výnosů typů aktiv (PARAMETRY_TYPU_AKTIVA).
+    Odhad metriky se upraví o β (C - E[C]), β = cov(Y, C) / var(C).
+
+    Rozptyl metody se odhaduje z nezávislých odhadů (nezavisle_odhady) – u Sobola jsou to dávky;
+    při méně než MIN_NEZAVISLYCH_ODHADU odhadech se redukce neuvádí.
+    pozadovana -- metoda z konfigurace, pokud se místo ní použila jiná (Sobol bez scipy)
+    """
+    davky = vysledek_mc.get("davky") or [(0, souhrn["pocet_scenaru"])]
+    ocekavana = vysledek_mc.get("ocekavana_kontrolni_hodnota")
+    kontrolni_hodnota = vysledek_mc.get("kontrolni_hodnota")
+    pouzit_kontrolni = kontrolni and ocekavana is not None and kontrolni_hodnota is not None \
+        and np.var(kontrolni_hodnota) > 0
+
+    metriky = [
+        ("Konečná hodnota (Kč)", souhrn["konecna_hodnota"], 1),
+        ("CAGR (%)", souhrn["cagr"], 100),
+        ("Max drawdown (%)", souhrn["max_drawdown"], 100),
+        ("Poplatky (Kč)", vysledek_mc["poplatky"], 1),
+    ]
+    pocet_odhadu = len(nezavisle_odhady(np.asarray(souhrn["konecna_hodnota"]), metoda, davky))
+    radky = []
+    for popis, y, nasobek in metriky:
+        y = np.asarray(y, dtype=float) * nasobek
+        rozptyl_mc = y.var(ddof=1) / len(y) if len(y) > 1 else None
+        rozptyl_metody = rozptyl_odhadu(y, metoda, davky)
+        prumer, rozptyl, korelace = y.mean(), rozptyl_metody, None
+        if pouzit_kontrolni:
+            c = np.asarray(kontrolni_hodnota, dtype=float) - ocekavana
+            # β z těch nezávislých odhadů, ze kterých se počítá rozptyl (páry, dávky Sobola)
+            jednotky = metoda if len(nezavisle_odhady(y, metoda, davky)) >= 3 else "zadna"
+            kovariance = np.cov(nezavisle_odhady(y, jednotky, davky), nezavisle_odhady(c, jednotky, davky))
+            beta = kovariance[0, 1] / kovariance[1, 1] if kovariance[1, 1] > 0 else 0.0
+            if kovariance[0, 0] > 0:
+                korelace = kovariance[0, 1] / np.sqrt(kovariance[0, 0] * kovariance[1, 1])
+            upravene = y - beta * c
+            prumer = upravene.mean()
+            rozptyl = rozptyl_odhadu(upravene, metoda, davky, ddof=2 if jednotky == metoda else 1)
+        if pocet_odhadu < MIN_NEZAVISLYCH_ODHADU:
+            rozptyl_metody = rozptyl = None
+        radky.append({
+            "metrika": popis,
+            "prumer": prumer,
+            "smerodatna_chyba": np.sqrt(rozptyl) if rozptyl is not None else None,
+            "redukce_metody": _pomer(rozptyl_mc, rozptyl_metody),
+            "redukce": _pomer(rozptyl_mc, rozptyl),
+            "korelace_kontrolni": korelace,
+        })
+
+    return {
+        "metoda": metoda,
+        "pozadovana": pozadovana or metoda,
+        "pocet_odhadu": pocet_odhadu,
+        "kontrolni": pouzit_kontrolni,
+        "kontrolni_pozadovana": kontrolni,
+        "ocekavana_kontrolni_hodnota": ocekavana,
+        "pocet_scenaru": souhrn["pocet_scenaru"],
+        "radky": radky,
+    }
+
+def _pomer(citatel, jmenovatel):
+    if citatel is None or jmenovatel is None:
+        return None
+    if jmenovatel <= 0:
+        return float("inf") if citatel > 0 else None
+    return citatel / jmenovatel
+
+def vypis_redukci(redukce):
+    """Vypíše dosaženou redukci rozptylu (viz vyhodnot_redukci)."""
+    popisy = {"zadna": "bez redukce", "antiteticke": "antitetické páry", "sobol": "Sobolova posloupnost"}
+    nazev = popisy.get(redukce["metoda"], redukce["metoda"])
+    if redukce["kontrolni"]:
+        nazev += " + kontrolní proměnná"
+    print(f"\n--- Redukce rozptylu: {nazev} ({redukce['pocet_scenaru']} scénářů, "
+          f"{redukce['pocet_odhadu']} nezávislých odhadů) ---")
+    if redukce["pozadovana"] != redukce["metoda"]:
+        print(f"Požadovaná metoda '{popisy.get(redukce['pozadovana'], redukce['pozadovana'])}' nebyla použita "
+              f"(chybí knihovna scipy) – šoky jsou pseudonáhodné.")
+    if redukce["pocet_odhadu"] < MIN_NEZAVISLYCH_ODHADU:
+        print(f"Redukci nelze spolehlivě odhadnout – nezávislých odhadů je méně než {MIN_NEZAVISLYCH_ODHADU}.")
+    if redukce["kontrolni_pozadovana"] and not redukce["kontrolni"]:
+        print("Kontrolní proměnnou nelze použít – model nemá analyticky známý očekávaný výnos.")
+    elif redukce["kontrolni"]:
+        print(f"Kontrolní proměnná: konečná hodnota bez rebalancování, "
+              f"E = {redukce['ocekavana_kontrolni_hodnota']:.2f} Kč")
+
+    def cislo(hodnota, fmt):
+        return "-" if hodnota is None else f"{hodnota:{fmt}}"
+
+    print(f"{'Metrika':<22}{'Průměr':>16}{'Směr. chyba':>14}{'Redukce metody':>16}"
+          f"{'Redukce celkem':>16}{'Korelace C':>12}")
+    for r in redukce["radky"]:
+        print(f"{r['metrika']:<22}{cislo(r['prumer'], '.4f'):>16}{cislo(r['smerodatna_chyba'], '.4f'):>14}"
+              f"{cislo(r['redukce_metody'], '.2f'):>16}{cislo(r['redukce'], '.2f'):>16}"
+              f"{cislo(r['korelace_kontrolni'], '.3f'):>12}")
+    print("Redukce = rozptyl prostého Monte Carla / rozptyl odhadu (kolikrát víc scénářů by prosté MC potřebovalo).")
@@ -1,30 +1,67 @@
 # simulace.py
 
-import random
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+import numpy as np
 from konfigurace import PARAMETRY_TYPU_AKTIVA, preved_na_denni
-from rebalancovani import rebalancuj_portfolio, je_odchylka_prilis_velka
+from modely import ziskej_model, priprav_parametry
+from rebalancovani import (simuluj_rebalancovani, simuluj_rebalancovani_scenaru,
+                           simuluj_rebalancovani_portfolii, zapis_udalosti_mnozstvi,
+                           _rebalancuj_vektor, _soucet_aktiv)
+from uloziste import klic_scenaru
+from statistiky import PrubeznySouhrnScenaru
+from redukce_rozptylu import velikost_davky_sobol, zdroj_soku
+import mereni
+
+# ========================
+# GENERÁTORY NÁHODNÝCH ČÍSEL
+# ========================
+
+def vytvor_generator(rng=None):
+    """
+    Vrátí np.random.Generator. Přijímá seed (int), np.random.SeedSequence,
+    hotový generátor (vrátí ho beze změny) nebo None (náhodná inicializace).
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng
+    return np.random.default_rng(rng)
+
+def _proudy_davek(rng, pocet_davek):
+    """
+    Odvodí nezávislé SeedSequence pro jednotlivé dávky scénářů.
+    Proud dávky závisí jen na seedu a pořadí dávky, ne na počtu procesů.
+    """
+    if isinstance(rng, np.random.Generator):
+        return rng.bit_generator.seed_seq.spawn(pocet_davek)
+    if not isinstance(rng, np.random.SeedSequence):
+        rng = np.random.SeedSequence(rng)
+    # Nová SeedSequence se stejnou entropií, aby opakované volání dalo stejné proudy
+    return np.random.SeedSequence(rng.entropy, spawn_key=rng.spawn_key).spawn(pocet_davek)
 
 # ========================
 # MODELY VÝVOJE CEN
 # ========================
 
-def simuluj_den_nahodny(aktualni_cena, denni_volatilita=0.02):
+def simuluj_den_nahodny(aktualni_cena, denni_volatilita=0.02, rng=None):
     """Náhodný model: cena +- uniform(denni_volatilita)."""
-    delta = random.uniform(-denni_volatilita, denni_volatilita)
+    delta = vytvor_generator(rng).uniform(-denni_volatilita, denni_volatilita)
     return aktualni_cena * (1 + delta)
 
-def simuluj_den_typove(aktivum):
+def simuluj_den_typove(aktivum, rng=None):
     """Typový model: cena podle oček. výnosu a volatility aktiva."""
     typ = aktivum.get("typ", "akcie")
     param = PARAMETRY_TYPU_AKTIVA.get(typ, PARAMETRY_TYPU_AKTIVA["akcie"])
     denni_vynos, denni_vol = preved_na_denni(param["ocekavany_vynos"], param["volatilita"])
-    zmena = random.gauss(denni_vynos, denni_vol)
+    zmena = vytvor_generator(rng).normal(denni_vynos, denni_vol)
     return aktivum["ceny"][-1] * (1 + zmena)
 
-def simuluj_den_korelacni(aktivum, index_zmena, denni_volatilita=0.02):
+def simuluj_den_korelacni(aktivum, index_zmena, denni_volatilita=0.02, rng=None):
     """Korelační model: kombinace změny indexu a náhodné složky."""
     korelace = aktivum.get("korelace", 0.5)
-    nahodna_slozka = random.uniform(-denni_volatilita, denni_volatilita)
+    nahodna_slozka = vytvor_generator(rng).uniform(-denni_volatilita, denni_volatilita)
     zmena = korelace * index_zmena + (1 - korelace) * nahodna_slozka
     return aktivum["ceny"][-1] * (1 + zmena)
 
@@ -32,47 +69,98 @@ def simuluj_den_korelacni(aktivum, index_zmena, denni_volatilita=0.02):
 # GENEROVÁNÍ SDÍLENÝCH CEN
 # ========================
 
-def generuj_sdilene_ceny(portfolio, pocet_dni, model="typovy", denni_volatilita=0.02):
+BLOK_DNI_MODELU = 256  # délka bloku dnů pro modely závislé na cestě
+
+def generuj_ceny_scenaru(portfolio, pocet_dni, pocet_scenaru, model="typovy", denni_volatilita=0.02, rng=None,
+                         redukce="zadna"):
+    """
+    Vygeneruje ceny všech aktiv pro více scénářů najednou jako tenzor
+    tvaru (pocet_scenaru, pocet_dni + 1, pocet_aktiv).
+    Den 0 obsahuje počáteční ceny, poslední osa odpovídá pořadí aktiv v portfoliu.
+    Model (viz modely.MODELY) generuje denní změny po celých blocích, ceny vzniknou kumulativním součinem.
+    redukce -- metoda redukce rozptylu šoků (redukce_rozptylu.METODY)
+    """
+    rng = zdroj_soku(vytvor_generator(rng), redukce)
+    model = ziskej_model(model)
+    parametry = priprav_parametry(portfolio, denni_volatilita)
+
+    ceny = np.empty((pocet_scenaru, pocet_dni + 1, len(portfolio)))
+    ceny[:, 0] = portfolio.pocatecni_ceny
+
+    # Model bez paměti vygeneruje celý horizont jedním voláním,
+    # model se stavem po blocích dnů s předáváním stavu
+    blok = pocet_dni if model.nezavisly_na_ceste else BLOK_DNI_MODELU
+    stav = None
+    for od in range(0, pocet_dni, max(blok, 1)):
+        do = min(od + blok, pocet_dni)
+        zmeny, stav = model.generuj(parametry, pocet_scenaru, do - od, rng, stav)
+        ceny[:, od + 1:do + 1] = zmeny
+
+    ceny[:, 1:] += 1
+    np.cumprod(ceny[:, 1:], axis=1, out=ceny[:, 1:])
+    ceny[:, 1:] *= ceny[:, :1]
+    return ceny
+
+def generuj_ceny_matice(portfolio, pocet_dni, model="typovy", denni_volatilita=0.02, rng=None):
+    """
+    Vygeneruje ceny jednoho scénáře jako matici tvaru (pocet_dni + 1, pocet_aktiv).
+    """
+    return generuj_ceny_scenaru(portfolio, pocet_dni, 1, model, denni_volatilita, rng)[0]
+
+def generuj_sdilene_ceny(portfolio, pocet_dni, model="typovy", denni_volatilita=0.02, rng=None,
+                         uloziste=None):
     """
     Vygeneruje sdílené ceny pro všechna aktiva dle vybraného modelu.
-    Vrací slovník {nazev_aktiva: seznam_cen}.
-    """
-    ceny_aktiv = {a["nazev"]: [a["cena"]] for a in portfolio}
-
-    index = [100.0]  # jen pro korelační model
-
-    for den in range(1, pocet_dni + 1):
-        if model == "nahodny":
-            for aktivum in portfolio:
-                nazev = aktivum["nazev"]
-                posledni_cena = ceny_aktiv[nazev][-1]
-                delta = random.uniform(-denni_volatilita, denni_volatilita)
-                ceny_aktiv[nazev].append(posledni_cena * (1 + delta))
-
-        elif model == "typovy":
-            for aktivum in portfolio:
-                nazev = aktivum["nazev"]
-                posledni_cena = ceny_aktiv[nazev][-1]
-                typ = aktivum.get("typ", "akcie")
-                param = PARAMETRY_TYPU_AKTIVA.get(typ, PARAMETRY_TYPU_AKTIVA["akcie"])
-                denni_vynos, denni_vol = preved_na_denni(param["ocekavany_vynos"], param["volatilita"])
-                zmena = random.gauss(denni_vynos, denni_vol)
-                ceny_aktiv[nazev].append(posledni_cena * (1 + zmena))
-
-        elif model == "korelacni":
-            zmena_indexu = random.uniform(-denni_volatilita, denni_volatilita)
-            nova_index = index[-1] * (1 + zmena_indexu)
-            index_zmena = (nova_index - index[-1]) / index[-1]
-            index.append(nova_index)
-            for aktivum in portfolio:
-                nazev = aktivum["nazev"]
-                korelace = aktivum.get("korelace", 0.5)
-                nahodna_slozka = random.uniform(-denni_volatilita, denni_volatilita)
-                zmena = korelace * index_zmena + (1 - korelace) * nahodna_slozka
-                posledni_cena = ceny_aktiv[nazev][-1]
-                ceny_aktiv[nazev].append(posledni_cena * (1 + zmena))
-
-    return ceny_aktiv
+    Vrací slovník {nazev_aktiva: seznam_cen}; maticový tvar vrací generuj_sdilenou_matici.
+    """
+    ceny = generuj_sdilenou_matici(portfolio, pocet_dni, model, denni_volatilita, rng, uloziste)
+    return {nazev: ceny[:, j].tolist() for j, nazev in enumerate(portfolio.nazvy.tolist())}
+
+def generuj_sdilenou_matici(portfolio, pocet_dni, model="typovy", denni_volatilita=0.02, rng=None,
+                            uloziste=None):
+    """
+    Vygeneruje sdílené ceny všech aktiv jako matici (pocet_dni + 1) x aktiva.
+
+    S úložištěm scénářů (uloziste.UlozisteScenaru) se ceny pro stejný model, parametry,
+    horizont a stav generátoru nejdřív hledají na disku. Generátor se pak posune do stejného
+    stavu, jako kdyby se ceny generovaly, takže další výpočty dávají stejné výsledky.
+    """
+    klic = None
+    if uloziste is not None:
+        klic = klic_scenaru(ziskej_model(model), priprav_parametry(portfolio, denni_volatilita),
+                            portfolio, pocet_dni, 1, rng)
+    rng = vytvor_generator(rng)
+
+    ulozene = uloziste.nacti(klic) if klic is not None else None
+    if ulozene is not None:
+        ceny, metadata = ulozene
+        rng.bit_generator.state = metadata["stav_generatoru"]
+    else:
+        ceny = generuj_ceny_matice(portfolio, pocet_dni, model=model, denni_volatilita=denni_volatilita, rng=rng)
+        if klic is not None:
+            uloziste.uloz(klic, ceny, {"stav_generatoru": rng.bit_generator.state})
+    return ceny
+
+def ceny_portfolia(ceny_vesmiru, vesmir, portfolio, sloupce):
+    """
+    Ceny aktiv portfolia ze sdílených cen vesmíru aktiv (portfolio.sjednot_portfolia).
+    ceny_vesmiru -- pole (... x dny x aktiva vesmíru), jedna cesta i tenzor scénářů
+    sloupce -- sloupce vesmíru s aktivy portfolia (v pořadí aktiv portfolia)
+
+    Tvoří-li sloupce souvislý úsek (vždy u prvního portfolia), vrací pohled bez kopírování,
+    jinak kopii jen vybraných sloupců. Má-li portfolio u aktiva jinou počáteční cenu než vesmír,
+    cesta se přeškáluje na jeho cenu (výnosy zůstanou stejné).
+    """
+    sloupce = np.asarray(sloupce)
+    zacatek = int(sloupce[0]) if len(sloupce) else 0
+    if np.array_equal(sloupce, np.arange(zacatek, zacatek + len(sloupce))):
+        ceny = ceny_vesmiru[..., zacatek:zacatek + len(sloupce)]
+    else:
+        ceny = ceny_vesmiru[..., sloupce]
+    meritko = portfolio.pocatecni_ceny / vesmir.pocatecni_ceny[sloupce]
+    if (meritko != 1).any():
+        ceny = ceny * meritko
+    return ceny
 
 
 # ========================
@@ -81,71 +169,513 @@ def generuj_sdilene_ceny(portfolio, pocet_dni, model="typovy", denni_volatilita=
 
 def simuluj_portfolio(portfolio, cilove_vahy, pocet_dni, rebalancovaci_perioda,
                       zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
-                      model="typovy", denni_volatilita=0.02, sdilena_simulace=False):
-    """Simuluje vývoj portfolia dle zvoleného modelu."""
-    vyvoj = []
+                      model="typovy", denni_volatilita=0.02, sdilena_simulace=False, rng=None):
+    """Simuluje vývoj portfolia dle zvoleného modelu (celá historie – zhmotněný proud bloků)."""
+    ceny = np.empty((pocet_dni + 1, len(portfolio)))
+    ceny[0] = portfolio.pocatecni_ceny
+    vyvoj = np.empty(pocet_dni)
     historie = []
+    udalosti = []
+
+    for blok in simuluj_portfolio_proud(
+        portfolio, cilove_vahy, pocet_dni, rebalancovaci_perioda,
+        zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+        model=model, denni_volatilita=denni_volatilita, rng=rng
+    ):
+        prvni_den = blok["prvni_den"]
+        pocet = len(blok["hodnoty"])
+        ceny[prvni_den:prvni_den + pocet] = blok["ceny"][1:]
+        vyvoj[prvni_den - 1:prvni_den - 1 + pocet] = blok["hodnoty"]
+        historie.extend(blok["historie"])
+        udalosti.extend(blok["udalosti"])
 
-    for aktivum in portfolio:
-        aktivum["ceny"] = [aktivum["cena"]]
-
-    index = [100.0]
-
-    for den in range(1, pocet_dni + 1):
-        if model == "nahodny":
-            for aktivum in portfolio:
-                aktivum["ceny"].append(simuluj_den_nahodny(aktivum["ceny"][-1], denni_volatilita))
-        elif model == "typovy":
-            for aktivum in portfolio:
-                aktivum["ceny"].append(simuluj_den_typove(aktivum))
-        elif model == "korelacni":
-            zmena_indexu = random.uniform(-denni_volatilita, denni_volatilita)
-            nova_index = index[-1] * (1 + zmena_indexu)
-            index_zmena = (nova_index - index[-1]) / index[-1]
-            index.append(nova_index)
-            for aktivum in portfolio:
-                aktivum["ceny"].append(simuluj_den_korelacni(aktivum, index_zmena, denni_volatilita))
-
-        # Rebalancování
-        if (
-            (zpusob_rebalancovani == "periodicky" and den % rebalancovaci_perioda == 0) or
-            (zpusob_rebalancovani == "podle_odchylky" and je_odchylka_prilis_velka(portfolio, cilove_vahy, tolerance_vahy)) or
-            (zpusob_rebalancovani == "kombinovane" and (
-                den % rebalancovaci_perioda == 0 or je_odchylka_prilis_velka(portfolio, cilove_vahy, tolerance_vahy)
-            ))
-        ):
-            rebalancuj_portfolio(portfolio, den, cilove_vahy, historie, transakcni_poplatek)
-
-        hodnota = sum(aktivum["ceny"][-1] * aktivum["mnozstvi"] for aktivum in portfolio)
-        vyvoj.append(hodnota)
-
-    return vyvoj, historie
+    _uloz_do_portfolia(portfolio, ceny, udalosti)
+    return vyvoj.tolist(), historie
 
 def simuluj_portfolio_sdilene(portfolio, cilove_vahy, ceny_aktiv, rebalancovaci_perioda,
                               zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek):
     """Simulace portfolia nad již vygenerovanými sdílenými cenami."""
-    vyvoj = []
-    historie = []
+    nazvy = portfolio.nazvy.tolist()
+    ceny = np.array([ceny_aktiv[nazev] for nazev in nazvy], dtype=float).T
+    ceny[0] = portfolio.pocatecni_ceny
+    return simuluj_portfolio_nad_cenami(
+        portfolio, cilove_vahy, ceny, rebalancovaci_perioda,
+        zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek
+    )
+
+def simuluj_portfolio_nad_cenami(portfolio, cilove_vahy, ceny, rebalancovaci_perioda,
+                                 zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek):
+    """
+    Simulace portfolia nad maticí cen (pocet_dni + 1) x aktiva v pořadí aktiv portfolia,
+    např. nad historickými cenami (backtest). Řádek 0 jsou ceny v den nákupu.
+    """
+    nazvy = portfolio.nazvy.tolist()
+    ceny = np.asarray(ceny, dtype=float)
+    vyvoj, historie, udalosti = simuluj_rebalancovani(
+        ceny, portfolio.mnozstvi,
+        [cilove_vahy[nazev] for nazev in nazvy], nazvy,
+        rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek
+    )
+    mereni.pricti("simulovane_dny", len(vyvoj))
+    mereni.pricti("rebalancovani", len(historie))
+
+    _uloz_do_portfolia(portfolio, ceny, udalosti)
+    return vyvoj.tolist(), historie
+
+def _uloz_do_portfolia(portfolio, ceny, udalosti):
+    """Zapíše ceny, konečná množství a historii množství zpět do portfolia."""
+    portfolio.ceny = ceny
+    zapis_udalosti_mnozstvi(portfolio, udalosti)
+
+
+# ========================
+# PROUDOVÁ SIMULACE
+# ========================
+
+VELIKOST_BLOKU = 2520  # počet dnů v jednom bloku proudové simulace (cca 10 let)
+
+def generuj_ceny_proud(portfolio, pocet_dni, model="typovy", denni_volatilita=0.02, rng=None,
+                       velikost_bloku=VELIKOST_BLOKU):
+    """
+    Generátor cen po blocích dnů s konstantní pamětí.
+    Vrací dvojice (prvni_den, ceny), kde ceny mají tvar (n + 1, pocet_aktiv):
+    řádek 0 jsou ceny předchozího dne, řádky 1..n dny prvni_den .. prvni_den + n - 1.
+    """
+    rng = vytvor_generator(rng)
+    model = ziskej_model(model)
+    parametry = priprav_parametry(portfolio, denni_volatilita)
+
+    predchozi = portfolio.pocatecni_ceny.copy()
+    stav = None
+    for prvni_den in range(1, pocet_dni + 1, velikost_bloku):
+        pocet = min(velikost_bloku, pocet_dni - prvni_den + 1)
+        zmeny, stav = model.generuj(parametry, 1, pocet, rng, stav)
+
+        ceny = np.empty((pocet + 1, len(portfolio)))
+        ceny[0] = predchozi
+        ceny[1:] = zmeny[0]
+        ceny[1:] += 1
+        np.cumprod(ceny[1:], axis=0, out=ceny[1:])
+        ceny[1:] *= predchozi
+        predchozi = ceny[-1]
+        yield prvni_den, ceny
+
+def simuluj_portfolio_proud(portfolio, cilove_vahy, pocet_dni, rebalancovaci_perioda,
+                            zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+                            model="typovy", denni_volatilita=0.02, rng=None,
+                            velikost_bloku=VELIKOST_BLOKU):
+    """
+    Proudová simulace portfolia: generátor bloků výsledků s pamětí nezávislou na délce horizontu.
+    Portfolio se nemění (množství se předávají mezi bloky uvnitř generátoru).
+
+    Každý blok je slovník:
+        'prvni_den' -- číslo prvního dne bloku
+        'ceny' -- ceny (n + 1, pocet_aktiv), řádek 0 je předchozí den
+        'hodnoty' -- hodnota portfolia ve dnech bloku
+        'historie' -- záznamy rebalancování v bloku
+        'udalosti' -- (den, puvodni_mnozstvi, nova_mnozstvi) pro rebalancování v bloku
+    """
+    nazvy = portfolio.nazvy.tolist()
+    vahy = [cilove_vahy[nazev] for nazev in nazvy]
+    mnozstvi = portfolio.mnozstvi.copy()
+
+    for prvni_den, ceny in generuj_ceny_proud(portfolio, pocet_dni, model, denni_volatilita, rng, velikost_bloku):
+        hodnoty, historie, udalosti = simuluj_rebalancovani(
+            ceny, mnozstvi, vahy, nazvy, rebalancovaci_perioda,
+            zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+            posun_dni=prvni_den - 1
+        )
+        if udalosti:
+            mnozstvi = udalosti[-1][2]
+        mereni.pricti("simulovane_dny", len(hodnoty))
+        mereni.pricti("rebalancovani", len(historie))
+        yield {
+            "prvni_den": prvni_den,
+            "ceny": ceny,
+            "hodnoty": hodnoty,
+            "historie": historie,
+            "udalosti": udalosti
+        }
+
+# ========================
+# MONTE CARLO – DÁVKOVÁ SIMULACE
+# ========================
+
+def _simuluj_davku_periodicky(ceny, mnozstvi, vahy, rebalancovaci_perioda, transakcni_poplatek, rebalancovat):
+    """
+    Periodické rebalancování (nebo žádné) nad tenzorem cen jedné dávky scénářů.
+    Mezi dny rebalancování se hodnota počítá pro celý úsek najednou. Rebalancování i součty přes
+    aktiva jsou stejné jako v rebalancovani.simuluj_rebalancovani (_rebalancuj_vektor, _soucet_aktiv),
+    takže každý scénář dává bitově stejné výsledky jako simulace jedné cesty.
+    mnozstvi a vahy mají tvar (aktiva), nebo (portfolia x aktiva) – pak mají výsledky
+    úvodní osu portfolií (portfolia x scénáře x ...).
+    """
+    pocet_scenaru, pocet_radku, _ = ceny.shape
+    pocet_dni = pocet_radku - 1
+    uvod = np.shape(mnozstvi)[:-1]
+    hodnoty = np.empty(uvod + (pocet_scenaru, pocet_dni))
+    poplatky = np.zeros(uvod + (pocet_scenaru,))
+    pocet_rebalancovani = np.zeros(uvod + (pocet_scenaru,), dtype=int)
+    mnozstvi = np.repeat(np.asarray(mnozstvi)[..., None, :], pocet_scenaru, axis=-2)
+    vahy = np.asarray(vahy)[..., None, :] if uvod else vahy
+
+    if rebalancovat:
+        dny_udalosti = list(range(rebalancovaci_perioda, pocet_dni + 1, rebalancovaci_perioda))
+    else:
+        dny_udalosti = []
+
+    zacatek = 1
+    for den in dny_udalosti + [pocet_dni + 1]:
+        # Úsek dnů bez rebalancování: zacatek .. den - 1
+        if den > zacatek:
+            # Součet přes aktiva zleva jako _soucet_aktiv, bez mezivýsledku (... x scénáře x dny x aktiva)
+            usek = ceny[:, zacatek:den]
+            cast = hodnoty[..., zacatek - 1:den - 1]
+            cast[...] = usek[..., 0] * mnozstvi[..., :, None, 0]
+            for j in range(1, usek.shape[-1]):
+                cast += usek[..., j] * mnozstvi[..., :, None, j]
+        if den <= pocet_dni:
+            _, poplatek, mnozstvi = _rebalancuj_vektor(ceny[:, den], mnozstvi, vahy, transakcni_poplatek)
+            poplatky += _soucet_aktiv(poplatek)
+            pocet_rebalancovani += 1
+            hodnoty[..., den - 1] = _soucet_aktiv(ceny[:, den] * mnozstvi)
+        zacatek = den + 1
+
+    return hodnoty, poplatky, pocet_rebalancovani
+
+def vyhodnot_scenare(portfolio, cilove_vahy, ceny, rebalancovaci_perioda,
+                     zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek):
+    """
+    Vyhodnotí jednu rebalancovací strategii nad tenzorem cen (scénáře x dny x aktiva).
+    Vrací (hodnoty, poplatky, pocet_rebalancovani) – hodnoty ve dnech 1..pocet_dni pro každý scénář.
+    """
+    vahy = np.array([cilove_vahy[nazev] for nazev in portfolio.nazvy.tolist()])
+    if zpusob_rebalancovani in ("podle_odchylky", "kombinovane"):
+        # Strategie závislé na odchylce vah – všechny scénáře po dnech najednou s maskou rebalancování
+        return simuluj_rebalancovani_scenaru(
+            ceny, portfolio.mnozstvi, vahy, rebalancovaci_perioda,
+            zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek
+        )
+    return _simuluj_davku_periodicky(
+        ceny, portfolio.mnozstvi, vahy, rebalancovaci_perioda, transakcni_poplatek,
+        rebalancovat=zpusob_rebalancovani == "periodicky"
+    )
+
+def vyhodnot_portfolia(ceny, mnozstvi, vahy, rebalancovaci_perioda,
+                       zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek):
+    """
+    Vyhodnotí více portfolií (řádky matic mnozstvi a vahy, portfolia x aktiva) stejnou strategií
+    nad jedním tenzorem cen (scénáře x dny x aktiva).
+    Vrací (hodnoty, poplatky, pocet_rebalancovani) s úvodní osou portfolií, hodnoty mají tvar
+    (portfolia x scénáře x pocet_dni).
+    """
+    if zpusob_rebalancovani in ("podle_odchylky", "kombinovane"):
+        return simuluj_rebalancovani_portfolii(
+            ceny, mnozstvi, vahy, rebalancovaci_perioda,
+            zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek
+        )
+    return _simuluj_davku_periodicky(
+        ceny, mnozstvi, vahy, rebalancovaci_perioda, transakcni_poplatek,
+        rebalancovat=zpusob_rebalancovani == "periodicky"
+    )
+
+def ceny_davky(portfolio, pocet_dni, pocet_scenaru, model, denni_volatilita, seed_davky,
+               soubor_cen=None, od=0, zapis=False, redukce="zadna"):
+    """
+    Ceny jedné dávky scénářů (od .. od + pocet_scenaru). Je-li zadán soubor_cen z úložiště scénářů,
+    dávka se z něj přečte přes mmap, nebo se (zapis=True) vygeneruje a do souboru zapíše.
+    """
+    if soubor_cen is not None and not zapis:
+        return np.load(soubor_cen, mmap_mode="r")[od:od + pocet_scenaru]
 
-    for aktivum in portfolio:
-        aktivum["ceny"] = [aktivum["cena"]]
+    ceny = generuj_ceny_scenaru(portfolio, pocet_dni, pocet_scenaru, model, denni_volatilita,
+                                vytvor_generator(seed_davky), redukce)
+    if zapis:
+        cil = np.load(soubor_cen, mmap_mode="r+")
+        cil[od:od + pocet_scenaru] = ceny
+        cil.flush()
+        del cil
+    return ceny
+
+def priprav_uloziste_davek(uloziste, portfolio, pocet_dni, pocet_scenaru, model, denni_volatilita,
+                           davky, proudy, redukce="zadna"):
+    """
+    Najde scénáře dávek v úložišti. Vrací (klic, soubor_cen, zapis):
+    uložené scénáře se čtou ze souboru, jinak se připraví nový soubor, do kterého dávky zapíší
+    vygenerované ceny (po doběhnutí se zveřejní přes uloziste.dokonci). Bez úložiště nebo seedu
+    vrací (None, None, False).
+    """
+    if uloziste is None:
+        return None, None, False
+    # Bez redukce rozptylu zůstává klíč stejný jako dřív (uložené scénáře platí dál)
+    dalsi = [davky] if redukce in (None, "zadna") else [davky, redukce]
+    klic = klic_scenaru(ziskej_model(model), priprav_parametry(portfolio, denni_volatilita),
+                        portfolio, pocet_dni, pocet_scenaru, list(proudy), *dalsi)
+    if klic is None:
+        return None, None, False
+    ulozene = uloziste.nacti(klic)
+    if ulozene is not None:
+        return klic, ulozene[0].filename, False
+    return klic, uloziste.vytvor(klic, (pocet_scenaru, pocet_dni + 1, len(portfolio))), True
+
+def _simuluj_davku_mc(vesmir, portfolia, sloupce, cilove_vahy, pocet_dni, pocet_scenaru,
+                      rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+                      model, denni_volatilita, seed_davky, soubor_cen=None, od=0, zapis=False,
+                      redukce="zadna"):
+    """
+    Vygeneruje (nebo z úložiště načte) jednu dávku scénářů vesmíru aktiv s vlastním proudem
+    náhodných čísel a vyhodnotí na ní všechna portfolia. Vrací seznam výsledků po portfoliích
+    (hodnoty, poplatky, pocet_rebalancovani, kontrolni_hodnota) – kontrolní hodnota je konečná
+    hodnota počátečních množství bez rebalancování.
+    """
+    ceny = ceny_davky(vesmir, pocet_dni, pocet_scenaru, model, denni_volatilita, seed_davky,
+                      soubor_cen, od, zapis, redukce)
+    vysledky = []
+    for portfolio, sloupce_portfolia, vahy in zip(portfolia, sloupce, cilove_vahy):
+        ceny_p = ceny_portfolia(ceny, vesmir, portfolio, sloupce_portfolia)
+        vysledky.append(vyhodnot_scenare(
+            portfolio, vahy, ceny_p,
+            rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek
+        ) + (ceny_p[:, -1] @ portfolio.mnozstvi,))
+    return vysledky
+
+def _ocekavane_kontrolni_hodnoty(vesmir, portfolia, sloupce, pocet_dni, model, denni_volatilita):
+    """
+    Střední hodnota kontrolní proměnné (konečná hodnota bez rebalancování) pro každé portfolio:
+    E[cena na konci] = počáteční cena * (1 + denní výnos)^dny. None, pokud ji model nezná.
+    """
+    denni_vynos = ziskej_model(model).ocekavany_denni_vynos(priprav_parametry(vesmir, denni_volatilita))
+    return [
+        None if denni_vynos is None else float(
+            (portfolio.pocatecni_ceny * portfolio.mnozstvi) @ (1 + denni_vynos[sloupce_portfolia]) ** pocet_dni
+        )
+        for portfolio, sloupce_portfolia in zip(portfolia, sloupce)
+    ]
+
+def rozdel_na_davky(pocet_scenaru, velikost_davky, rng=None, redukce="zadna"):
+    """
+    Rozdělí scénáře na dávky po `velikost_davky`. Vrací (davky, proudy):
+    seznam rozsahů (od, do) a ke každé dávce vlastní SeedSequence odvozenou z `rng`.
+    U Sobolovy posloupnosti je velikost dávky mocnina dvou (redukce_rozptylu.velikost_davky_sobol)
+    a počet scénářů se zaokrouhlí nahoru na celé dávky – skutečný počet je konec poslední dávky.
+    """
+    if redukce == "sobol":
+        velikost_davky = velikost_davky_sobol(pocet_scenaru, velikost_davky)
+        pocet_scenaru = -(-pocet_scenaru // velikost_davky) * velikost_davky
+    hranice = list(range(0, pocet_scenaru, velikost_davky)) + [pocet_scenaru]
+    davky = list(zip(hranice[:-1], hranice[1:]))
+    return davky, _proudy_davek(rng, len(davky))
+
+def simuluj_portfolio_mc(portfolio, cilove_vahy, pocet_dni, pocet_scenaru, rebalancovaci_perioda,
+                         zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+                         model="typovy", denni_volatilita=0.02, rng=None, velikost_davky=250,
+                         pocet_procesu=1, uloziste=None, redukce="zadna"):
+    """
+    Monte Carlo simulace portfolia přes `pocet_scenaru` náhodných cenových scénářů.
+    Ceny se generují po dávkách scénářů jako jeden tenzor (scénáře x dny x aktiva),
+    aby paměť zůstala omezená i pro desetitisíce scénářů.
+
+    Každá dávka má vlastní proud náhodných čísel odvozený ze seedu `rng`, takže
+    výsledek je pro daný seed a velikost dávky stejný při libovolném `pocet_procesu`.
+    pocet_procesu > 1 rozdělí dávky mezi procesy, 0 použije všechna jádra.
+    S úložištěm scénářů (uloziste.UlozisteScenaru) se tenzor cen pro stejné vstupy a seed
+    čte z disku přes mmap; nové scénáře se do úložiště zapíší.
+    redukce -- metoda redukce rozptylu šoků (redukce_rozptylu.METODY); antitetické páry
+    i Sobolovy body se tvoří v rámci dávky.
+
+    Vrací slovník:
+        'hodnoty' -- pole (pocet_scenaru, pocet_dni) s hodnotou portfolia ve dnech 1..pocet_dni
+        'poplatky' -- pole celkových transakčních poplatků pro každý scénář
+        'pocet_rebalancovani' -- pole počtu rebalancování pro každý scénář
+        'kontrolni_hodnota' -- konečná hodnota bez rebalancování pro každý scénář
+        'ocekavana_kontrolni_hodnota' -- její analytická střední hodnota (None, pokud ji model nezná)
+        'davky' -- rozsahy (od, do) dávek scénářů
+    """
+    return simuluj_portfolia_mc(
+        portfolio, [portfolio], [np.arange(len(portfolio))], [cilove_vahy], pocet_dni, pocet_scenaru,
+        rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+        model=model, denni_volatilita=denni_volatilita, rng=rng, velikost_davky=velikost_davky,
+        pocet_procesu=pocet_procesu, uloziste=uloziste, redukce=redukce
+    )[0]
+
+def simuluj_portfolia_mc(vesmir, portfolia, sloupce, cilove_vahy, pocet_dni, pocet_scenaru,
+                         rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+                         model="typovy", denni_volatilita=0.02, rng=None, velikost_davky=250,
+                         pocet_procesu=1, uloziste=None, redukce="zadna"):
+    """
+    Monte Carlo simulace více portfolií na stejných scénářích (jako simuluj_portfolio_mc).
+    Každá dávka scénářů se vygeneruje jen jednou pro celý vesmír aktiv (portfolio.sjednot_portfolia)
+    a každé portfolio se vyhodnotí na sloupcích svých aktiv (ceny_portfolia).
+
+    sloupce -- pro každé portfolio sloupce vesmíru s jeho aktivy
+    cilove_vahy -- pro každé portfolio slovník {nazev: vaha}
+
+    Vrací seznam slovníků (po portfoliích) ve tvaru výsledku simuluj_portfolio_mc.
+    """
+    davky, proudy = rozdel_na_davky(pocet_scenaru, velikost_davky, rng, redukce)
+    pocet_scenaru = davky[-1][1]
+    pocet_procesu = pocet_procesu or os.cpu_count() or 1
+    pocet_procesu = min(pocet_procesu, len(davky))
+
+    klic, soubor_cen, zapis = priprav_uloziste_davek(
+        uloziste, vesmir, pocet_dni, pocet_scenaru, model, denni_volatilita, davky, proudy, redukce
+    )
+
+    argumenty = [
+        (vesmir, portfolia, sloupce, cilove_vahy, pocet_dni, do - od, rebalancovaci_perioda,
+         zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+         model, denni_volatilita, proud, soubor_cen, od, zapis, redukce)
+        for (od, do), proud in zip(davky, proudy)
+    ]
+
+    vysledky = [
+        {
+            "hodnoty": np.empty((pocet_scenaru, pocet_dni)),
+            "poplatky": np.empty(pocet_scenaru),
+            "pocet_rebalancovani": np.empty(pocet_scenaru, dtype=int),
+            "kontrolni_hodnota": np.empty(pocet_scenaru),
+            "ocekavana_kontrolni_hodnota": ocekavana,
+            "davky": davky,
+        }
+        for ocekavana in _ocekavane_kontrolni_hodnoty(vesmir, portfolia, sloupce, pocet_dni, model,
+                                                      denni_volatilita)
+    ]
+
+    def zapis_davku(od, do, vysledky_davky):
+        for vysledek, (hodnoty, poplatky, pocet_rebalancovani, kontrolni) in zip(vysledky, vysledky_davky):
+            vysledek["hodnoty"][od:do] = hodnoty
+            vysledek["poplatky"][od:do] = poplatky
+            vysledek["pocet_rebalancovani"][od:do] = pocet_rebalancovani
+            vysledek["kontrolni_hodnota"][od:do] = kontrolni
+
+    if pocet_procesu > 1:
+        with ProcessPoolExecutor(max_workers=pocet_procesu) as executor:
+            for (od, do), vysledky_davky in zip(davky, executor.map(_simuluj_davku_mc, *zip(*argumenty))):
+                zapis_davku(od, do, vysledky_davky)
+    else:
+        for (od, do), arg in zip(davky, argumenty):
+            zapis_davku(od, do, _simuluj_davku_mc(*arg))
+
+    if zapis:
+        uloziste.dokonci(klic, soubor_cen)
+    # Čítače se počítají tady – pracovní procesy mají vlastní (nezapnuté) měření
+    mereni.pricti("simulovane_dny", pocet_dni * pocet_scenaru * len(portfolia))
+    mereni.pricti("rebalancovani", int(sum(v["pocet_rebalancovani"].sum() for v in vysledky)))
+
+    return vysledky
+
+# ========================
+# ADAPTIVNÍ MONTE CARLO
+# ========================
+
+def _vysledky_davek_postupne(argumenty, pocet_procesu=1):
+    """
+    Vyhodnocuje dávky (_simuluj_davku_mc) a vrací jejich výsledky v pořadí dávek.
+    S více procesy jich počítá nejvýš pocet_procesu dopředu; po ukončení generátoru
+    se nespuštěné dávky zruší.
+    """
+    if pocet_procesu <= 1:
+        for arg in argumenty:
+            yield _simuluj_davku_mc(*arg)
+        return
+    argumenty = iter(argumenty)
+    with ProcessPoolExecutor(max_workers=pocet_procesu) as executor:
+        cekajici = deque()
+        try:
+            while True:
+                for arg in islice(argumenty, pocet_procesu - len(cekajici)):
+                    cekajici.append(executor.submit(_simuluj_davku_mc, *arg))
+                if not cekajici:
+                    return
+                yield cekajici.popleft().result()
+        finally:
+            for budouci in cekajici:
+                budouci.cancel()
+
+def simuluj_portfolia_mc_adaptivne(vesmir, portfolia, sloupce, cilove_vahy, pocet_dni,
+                                   rebalancovaci_perioda, zpusob_rebalancovani, tolerance_vahy,
+                                   transakcni_poplatek, metriky=("konecna_hodnota",), tolerance=0.01,
+                                   spolehlivost=0.95, max_scenaru=100000, max_cas=None,
+                                   uchovat_scenaru=1000, model="typovy", denni_volatilita=0.02, rng=None,
+                                   velikost_davky=250, pocet_procesu=1, redukce="zadna"):
+    """
+    Monte Carlo simulace více portfolií (jako simuluj_portfolia_mc) bez předem daného počtu scénářů.
+    Dávky se simulují postupně a po každé dávce se průběžné odhady metrik
+    (statistiky.PrubeznySouhrnScenaru) porovnají s tolerancí. Simulace skončí, jakmile má
+    každá z `metriky` u všech portfolií relativní šířku intervalu spolehlivosti nejvýš `tolerance`,
+    nebo po `max_scenaru` scénářích, nebo po `max_cas` sekundách (None = bez omezení).
+
+    Dávky a jejich proudy náhodných čísel jsou stejné jako u simuluj_portfolia_mc se stejným seedem,
+    velikostí dávky a počtem scénářů max_scenaru; o konci se rozhoduje po dávkách v jejich pořadí,
+    takže výsledek (bez časového limitu) nezávisí na počtu procesů. Úložiště scénářů se nepoužívá.
+
+    Celý vývoj hodnot se drží jen pro prvních `uchovat_scenaru` scénářů – pro
+    vějířový graf, souhrn percentilů a export.
+
+    Vrací seznam slovníků po portfoliích ve tvaru výsledku simuluj_portfolia_mc (pro uchované
+    scénáře) doplněný o:
+        'souhrn' -- statistiky.PrubeznySouhrnScenaru přes všechny simulované scénáře
+        'prubeh' -- {"pocet_scenaru", "duvod" ("konvergence", "max_scenaru", "max_cas"), "cas_s"}
+    """
+    zacatek = time.perf_counter()
+    davky, proudy = rozdel_na_davky(max_scenaru, velikost_davky, rng, redukce)
+    if redukce == "sobol":
+        # Uchované scénáře po celých dávkách – dávky Sobola jsou nezávislé repliky (redukce_rozptylu)
+        velikost = davky[0][1] - davky[0][0]
+        uchovat_scenaru = -(-uchovat_scenaru // velikost) * velikost
+    pocet_procesu = pocet_procesu or os.cpu_count() or 1
+    pocet_procesu = min(pocet_procesu, len(davky))
 
-    pocet_dni = len(next(iter(ceny_aktiv.values()))) - 1
+    argumenty = (
+        (vesmir, portfolia, sloupce, cilove_vahy, pocet_dni, do - od, rebalancovaci_perioda,
+         zpusob_rebalancovani, tolerance_vahy, transakcni_poplatek,
+         model, denni_volatilita, proud, None, od, False, redukce)
+        for (od, do), proud in zip(davky, proudy)
+    )
 
-    for den in range(1, pocet_dni + 1):
-        for aktivum in portfolio:
-            aktivum["ceny"].append(ceny_aktiv[aktivum["nazev"]][den])
+    souhrny = [PrubeznySouhrnScenaru(spolehlivost, redukce) for _ in portfolia]
+    uchovane = [[] for _ in portfolia]
+    uchovane_davky = []
+    pocet_scenaru, pocet_rebalancovani_celkem, duvod = 0, 0, "max_scenaru"
+    vysledky_davek = _vysledky_davek_postupne(argumenty, pocet_procesu)
+    try:
+        for (od, do), vysledky_davky in zip(davky, vysledky_davek):
+            for souhrn, seznam, vysledek in zip(souhrny, uchovane, vysledky_davky):
+                souhrn.pridej(vysledek[0], vysledek[1])
+                pocet_rebalancovani_celkem += int(vysledek[2].sum())
+                if od < uchovat_scenaru:
+                    seznam.append(vysledek)
+            if od < uchovat_scenaru:
+                uchovane_davky.append((od, min(do, uchovat_scenaru)))
+            pocet_scenaru = do
 
-        if (
-            (zpusob_rebalancovani == "periodicky" and den % rebalancovaci_perioda == 0) or
-            (zpusob_rebalancovani == "podle_odchylky" and je_odchylka_prilis_velka(portfolio, cilove_vahy, tolerance_vahy)) or
-            (zpusob_rebalancovani == "kombinovane" and (
-                den % rebalancovaci_perioda == 0 or je_odchylka_prilis_velka(portfolio, cilove_vahy, tolerance_vahy)
-            ))
-        ):
-            rebalancuj_portfolio(portfolio, den, cilove_vahy, historie, transakcni_poplatek)
+            if all(souhrn.konvergovano(metriky, tolerance) for souhrn in souhrny):
+                duvod = "konvergence"
+                break
+            if max_cas is not None and time.perf_counter() - zacatek >= max_cas:
+                duvod = "max_cas"
+                break
+    finally:
+        vysledky_davek.close()
 
-        hodnota = sum(aktivum["ceny"][-1] * aktivum["mnozstvi"] for aktivum in portfolio)
-        vyvoj.append(hodnota)
+    prubeh = {"pocet_scenaru": pocet_scenaru, "duvod": duvod, "cas_s": time.perf_counter() - zacatek}
+    vysledky = []
+    for souhrn, seznam, ocekavana in zip(souhrny, uchovane, _ocekavane_kontrolni_hodnoty(
+            vesmir, portfolia, sloupce, pocet_dni, model, denni_volatilita)):
+        hodnoty, poplatky, pocet_rebalancovani, kontrolni = (
+            np.concatenate(cast)[:uchovat_scenaru] for cast in zip(*seznam)
+        )
+        vysledky.append({
+            "hodnoty": hodnoty,
+            "poplatky": poplatky,
+            "pocet_rebalancovani": pocet_rebalancovani,
+            "kontrolni_hodnota": kontrolni,
+            "ocekavana_kontrolni_hodnota": ocekavana,
+            "davky": uchovane_davky,
+            "souhrn": souhrn,
+            "prubeh": prubeh,
+        })
 
-    return vyvoj, historie
\ No newline at end of file
+    mereni.pricti("simulovane_dny", pocet_dni * pocet_scenaru * len(portfolia))
+    mereni.pricti("rebalancovani", pocet_rebalancovani_celkem)
+    return vysledky
@@ -1,8 +1,11 @@
 # soubory.py
 
 import csv
-import statistics
+import json
 import os
+import numpy as np
+import mereni
+from statistiky import Statistiky, spocitej_statistiky
 
 # ========================
 # SPRÁVA SLOŽEK
@@ -44,6 +47,7 @@ def uloz_transakce_do_csv(historie, prefix=''):
                     'Poplatek': f"{t.get('poplatek', 0):.2f}"
                 })
 
+    mereni.zapsany_soubor(nazev_souboru)
     print(f"Transakce byly uloženy do souboru '{nazev_souboru}'.")
 
 # ========================
@@ -64,6 +68,7 @@ def uloz_vyvoj_portfolia_do_csv(vyvoj, prefix=''):
         writer.writerow(['Den', 'Hodnota portfolia (Kč)'])
         for den, hodnota in enumerate(vyvoj):
             writer.writerow([den, f"{hodnota:.2f}"])
+    mereni.zapsany_soubor(nazev_souboru)
 
 # ========================
 # 3. VÝVOJ CEN AKTIV
@@ -75,54 +80,43 @@ def uloz_ceny_aktiv_do_csv(portfolio, prefix=''):
         print("Portfolio je prázdné.")
         return
     
-    pocet_dni = len(portfolio[0]['ceny'])
     zajisti_slozku_vystupy(prefix)
     nazev_souboru = os.path.join("vystupy", prefix, "statistiky", f"{prefix}_ceny.csv")
 
     with open(nazev_souboru, mode='w', newline='', encoding='utf-8') as csvfile:
         writer = csv.writer(csvfile, delimiter=';')
-        hlavicka = ['Den'] + [aktivum['nazev'] for aktivum in portfolio]
+        hlavicka = ['Den'] + portfolio.nazvy.tolist()
         writer.writerow(hlavicka)
 
-        for den in range(pocet_dni):
-            radek = [den] + [f"{aktivum['ceny'][den]:.4f}" for aktivum in portfolio]
+        for den, ceny_dne in enumerate(portfolio.ceny.tolist()):
+            radek = [den] + [f"{cena:.4f}" for cena in ceny_dne]
             writer.writerow(radek)
+    mereni.zapsany_soubor(nazev_souboru)
 
 # ========================
 # 4. STATISTIKY PORTFOLIA
 # ========================
 
-def uloz_statistiky_do_csv(vyvoj, prefix='', bezrizikova_sazba=0.01):
-    """Vypočítá a uloží statistiky portfolia do CSV a TXT souboru."""
-    if not vyvoj or len(vyvoj) < 2:
+def uloz_statistiky_do_csv(statistiky, prefix='', bezrizikova_sazba=0.01):
+    """
+    Uloží statistiky portfolia do CSV a TXT souboru.
+    statistiky -- objekt statistiky.Statistiky (např. ten, který se už vypsal na obrazovku);
+    předá-li se místo něj řada hodnot portfolia, statistiky se z ní spočítají.
+    """
+    if not isinstance(statistiky, Statistiky):
+        statistiky = spocitej_statistiky(statistiky, bezrizikova_sazba)
+    if statistiky is None:
         print("Nedostatek dat pro statistiku.")
         return
 
     zajisti_slozku_vystupy(prefix)
     slozka = os.path.join("vystupy", prefix, "statistiky")
 
-    zacatek = vyvoj[0]
-    konec = vyvoj[-1]
-    pocet_dni = len(vyvoj) - 1
-    roky = pocet_dni / 252  # přibližný počet obchodních dní v roce
-
-    celkove_zhodnoceni = (konec - zacatek) / zacatek * 100
-    cagr = (konec / zacatek) ** (1 / roky) - 1
-
-    denni_vynosy = [(vyvoj[i] - vyvoj[i-1])/vyvoj[i-1] for i in range(1, len(vyvoj))]
-    smerodatna_odchylka_denni = statistics.stdev(denni_vynosy)
-    smerodatna_odchylka_rocni = smerodatna_odchylka_denni * (252 ** 0.5)
-    sharpe_ratio = (cagr - bezrizikova_sazba) / smerodatna_odchylka_rocni if smerodatna_odchylka_rocni != 0 else float('nan')
-
-    max_so_far = vyvoj[0]
-    max_drawdown = 0
-    for hodnota in vyvoj:
-        max_so_far = max(max_so_far, hodnota)
-        drawdown = (hodnota - max_so_far) / max_so_far
-        max_drawdown = min(max_drawdown, drawdown)
-
-    minimum = min(vyvoj)
-    maximum = max(vyvoj)
+    s = statistiky
+    zacatek, konec, cagr = s.zacatek, s.konec, s.cagr
+    celkove_zhodnoceni, sharpe_ratio = s.celkove_zhodnoceni, s.sharpe_ratio
+    smerodatna_odchylka_denni, smerodatna_odchylka_rocni = s.smerodatna_odchylka_denni, s.smerodatna_odchylka_rocni
+    maximum, minimum, max_drawdown = s.maximum, s.minimum, s.max_drawdown
 
     # CSV
     csv_soubor = os.path.join(slozka, f"{prefix}_statistiky.csv")
@@ -155,4 +149,330 @@ def uloz_statistiky_do_csv(vyvoj, prefix='', bezrizikova_sazba=0.01):
         f.write(f"Minimum: {minimum:.2f} Kč\n")
         f.write(f"Maximální pokles (drawdown): {max_drawdown*100:.2f} %\n")
 
+    mereni.zapsany_soubor(csv_soubor)
+    mereni.zapsany_soubor(txt_soubor)
     print(f"Statistiky byly exportovány do '{csv_soubor}' a '{txt_soubor}'.")
+
+# ========================
+# 5. PROUDOVÝ EXPORT
+# ========================
+
+class ProudovyExport:
+    """
+    Zapisuje vývoj portfolia, ceny aktiv a transakce do CSV průběžně po blocích
+    proudové simulace (simulace.simuluj_portfolio_proud). Soubory mají stejný formát
+    jako uloz_vyvoj_portfolia_do_csv, uloz_ceny_aktiv_do_csv a uloz_transakce_do_csv.
+    """
+
+    def __init__(self, nazvy_aktiv, prefix=''):
+        zajisti_slozku_vystupy(prefix)
+        slozka = os.path.join("vystupy", prefix, "statistiky")
+        self.soubory = []
+
+        self.vyvoj = csv.writer(self._otevri(os.path.join(slozka, f"{prefix}_vyvoj.csv")), delimiter=';')
+        self.vyvoj.writerow(['Den', 'Hodnota portfolia (Kč)'])
+
+        self.ceny = csv.writer(self._otevri(os.path.join(slozka, f"{prefix}_ceny.csv")), delimiter=';')
+        self.ceny.writerow(['Den'] + list(nazvy_aktiv))
+
+        self.transakce = csv.writer(self._otevri(os.path.join(slozka, f"{prefix}_transakce.csv")), delimiter=';')
+        self.transakce.writerow(['Den', 'Aktivum', 'Původní množství', 'Nové množství', 'Změna', 'Poplatek'])
+
+    def _otevri(self, cesta):
+        soubor = open(cesta, mode='w', newline='', encoding='utf-8')
+        self.soubory.append(soubor)
+        return soubor
+
+    def pridej(self, blok):
+        """Zapíše jeden blok výsledků simulace."""
+        prvni_den = blok["prvni_den"]
+
+        # Hodnota portfolia – číslování řádků od 0 jako v uloz_vyvoj_portfolia_do_csv
+        self.vyvoj.writerows(
+            [den, f"{hodnota:.2f}"]
+            for den, hodnota in enumerate(blok["hodnoty"].tolist(), start=prvni_den - 1)
+        )
+
+        # Ceny – řádek 0 bloku je předchozí den, zapisuje se jen u úplně prvního bloku (den 0)
+        od_radku = 0 if prvni_den == 1 else 1
+        self.ceny.writerows(
+            [den] + [f"{cena:.4f}" for cena in radek]
+            for den, radek in enumerate(blok["ceny"][od_radku:].tolist(), start=prvni_den - 1 + od_radku)
+        )
+
+        for zaznam in blok["historie"]:
+            for t in zaznam['transakce']:
+                self.transakce.writerow([
+                    zaznam['den'], t['aktivum'], f"{t['puvodni']:.4f}", f"{t['nove']:.4f}",
+                    f"{t['rozdil']:+.4f}", f"{t.get('poplatek', 0):.2f}"
+                ])
+
+    def uzavri(self):
+        for soubor in self.soubory:
+            soubor.close()
+            mereni.zapsany_soubor(soubor.name)
+        self.soubory = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.uzavri()
+
+# ========================
+# 6. PRŮZKUM PARAMETRŮ A POROVNÁNÍ PORTFOLIÍ
+# ========================
+
+def uloz_pruzkum_do_csv(tabulka, prefix=''):
+    """Uloží tabulku průzkumu parametrů (pruzkum.pruzkum_parametru) do CSV – jeden řádek na kombinaci."""
+    if not tabulka:
+        print("Tabulka průzkumu je prázdná.")
+        return
+
+    zajisti_slozku_vystupy(prefix)
+    nazev_souboru = os.path.join("vystupy", prefix, "statistiky", f"{prefix}_pruzkum.csv")
+
+    with open(nazev_souboru, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, delimiter=';')
+        writer.writerow([
+            'Způsob', 'Perioda', 'Tolerance', 'Poplatek', 'Konečná hodnota (Kč)',
+            'Konečná hodnota 5. percentil (Kč)', 'CAGR (%)', 'Sharpe ratio', 'Max drawdown (%)',
+            'Poplatky celkem (Kč)', 'Počet rebalancování'
+        ])
+        for r in tabulka:
+            writer.writerow([
+                r['zpusob'], r['perioda'], r['tolerance'], r['poplatek'],
+                f"{r['konecna_hodnota']:.2f}", f"{r['konecna_hodnota_p5']:.2f}",
+                f"{r['cagr']*100:.4f}", f"{r['sharpe_ratio']:.4f}", f"{r['max_drawdown']*100:.2f}",
+                f"{r['poplatky']:.2f}", f"{r['pocet_rebalancovani']:.2f}"
+            ])
+
+    mereni.zapsany_soubor(nazev_souboru)
+    print(f"Průzkum parametrů byl uložen do souboru '{nazev_souboru}'.")
+
+def uloz_porovnani_do_csv(serazena, nazvy_aktiv, prefix='porovnani'):
+    """
+    Uloží seřazenou tabulku porovnání portfolií (porovnani.serad_tabulku) do CSV –
+    jeden řádek na portfolio s pořadím, metrikami a vahami všech aktiv vesmíru.
+    """
+    if not serazena:
+        print("Tabulka porovnání je prázdná.")
+        return
+
+    zajisti_slozku_vystupy(prefix)
+    nazev_souboru = os.path.join("vystupy", prefix, "statistiky", f"{prefix}_portfolii.csv")
+
+    with open(nazev_souboru, mode='w', newline='', encoding='utf-8') as csvfile:
+        writer = csv.writer(csvfile, delimiter=';')
+        writer.writerow([
+            'Pořadí', 'Portfolio', 'Konečná hodnota (Kč)', 'Konečná hodnota 5. percentil (Kč)',
+            'CAGR (%)', 'Sharpe ratio', 'Max drawdown (%)', 'Poplatky celkem (Kč)', 'Počet rebalancování'
+        ] + [f"Váha {nazev}" for nazev in nazvy_aktiv])
+        for r in serazena:
+            writer.writerow([
+                r['poradi'], r['portfolio'],
+                f"{r['konecna_hodnota']:.2f}", f"{r['konecna_hodnota_p5']:.2f}",
+                f"{r['cagr']*100:.4f}", f"{r['sharpe_ratio']:.4f}", f"{r['max_drawdown']*100:.2f}",
+                f"{r['poplatky']:.2f}", f"{r['pocet_rebalancovani']:.2f}"
+            ] + [f"{v:.4f}" for v in r['vahy'].tolist()])
+
+    mereni.zapsany_soubor(nazev_souboru)
+    print(f"Porovnání portfolií bylo uloženo do souboru '{nazev_souboru}'.")
+
+# ========================
+# 7. BINÁRNÍ SLOUPCOVÝ VÝSTUP
+# ========================
+
+FORMATY_VYSTUPU = ("csv", "npy", "npz", "parquet")
+
+def _slozka_dat(prefix):
+    """Složka binárních výstupů vystupy/{prefix}/data."""
+    slozka = os.path.join("vystupy", prefix, "data")
+    os.makedirs(slozka, exist_ok=True)
+    return slozka
+
+def _je_pyarrow_dostupny():
+    try:
+        import pyarrow
+        return True
+    except ImportError:
+        return False
+
+def transakce_jako_sloupce(historie):
+    """Převede historii rebalancování na sloupce (den, aktivum, puvodni, nove, rozdil, poplatek)."""
+    transakce = [(z['den'], t) for z in historie for t in z['transakce']]
+    return {
+        "den": np.array([den for den, _ in transakce], dtype=np.int64),
+        "aktivum": np.array([t['aktivum'] for _, t in transakce], dtype=str),
+        "puvodni": np.array([t['puvodni'] for _, t in transakce], dtype=float),
+        "nove": np.array([t['nove'] for _, t in transakce], dtype=float),
+        "rozdil": np.array([t['rozdil'] for _, t in transakce], dtype=float),
+        "poplatek": np.array([t.get('poplatek', 0) for _, t in transakce], dtype=float),
+    }
+
+def uloz_sloupce(sloupce, prefix, nazev, format_vystupu="npy", pocet_radku=None):
+    """
+    Uloží sadu pojmenovaných polí (sloupců) jedním zápisem v plné přesnosti.
+        npy     -- každý sloupec jako vystupy/{prefix}/data/{nazev}/{sloupec}.npy (lze číst přes mmap)
+        npz     -- všechny sloupce v jednom souboru vystupy/{prefix}/data/{prefix}_{nazev}.npz
+        parquet -- tabulka vystupy/{prefix}/data/{prefix}_{nazev}.parquet (vyžaduje pyarrow);
+                   2-D pole se ukládá jako sloupce {sloupec}_{j}, pole jiné délky do metadat tabulky
+    pocet_radku -- počet řádků tabulky parquet; výchozí je první rozměr prvního 2-D pole (dny),
+                   bez 2-D pole délka nejdelšího sloupce
+    Vrací cestu k uloženému souboru/složce.
+    """
+    slozka = _slozka_dat(prefix)
+
+    if format_vystupu == "parquet":
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            print("Knihovna pyarrow není nainstalována – výstup se uloží ve formátu npz.")
+            format_vystupu = "npz"
+        else:
+            tabulka = {}
+            for klic, pole in sloupce.items():
+                pole = np.asarray(pole)
+                if pole.ndim == 2:
+                    if pocet_radku is None:
+                        pocet_radku = pole.shape[0]
+                    tabulka.update({f"{klic}_{j}": pole[:, j] for j in range(pole.shape[1])})
+                else:
+                    tabulka[klic] = pole
+            # Pole jiné délky (např. názvy aktiv) se uloží do metadat tabulky
+            if pocet_radku is None:
+                pocet_radku = max(len(pole) for pole in tabulka.values())
+            metadata = {k: json.dumps(np.asarray(p).tolist()) for k, p in tabulka.items() if len(p) != pocet_radku}
+            tabulka = {k: p for k, p in tabulka.items() if len(p) == pocet_radku}
+            cesta = os.path.join(slozka, f"{prefix}_{nazev}.parquet")
+            pq.write_table(pa.table(tabulka, metadata=metadata), cesta)
+            mereni.zapsany_soubor(cesta)
+            return cesta
+
+    if format_vystupu == "npz":
+        cesta = os.path.join(slozka, f"{prefix}_{nazev}.npz")
+        np.savez(cesta, **sloupce)
+        mereni.zapsany_soubor(cesta)
+        return cesta
+
+    cesta = os.path.join(slozka, nazev)
+    os.makedirs(cesta, exist_ok=True)
+    for klic, pole in sloupce.items():
+        np.save(os.path.join(cesta, f"{klic}.npy"), np.asarray(pole))
+        mereni.zapsany_soubor(os.path.join(cesta, f"{klic}.npy"))
+    return cesta
+
+def uloz_vysledky_binarne(prefix='', format_vystupu="npy", portfolio=None, vyvoj=None,
+                          historie=None, hodnoty_scenaru=None):
+    """
+    Uloží ceny aktiv, vývoj portfolia, transakce a případně hodnoty Monte Carlo scénářů
+    v binárním sloupcovém formátu (viz uloz_sloupce). Binární obdoba CSV exportů.
+    """
+    if format_vystupu not in FORMATY_VYSTUPU[1:]:
+        print(f"Neznámý binární formát výstupu '{format_vystupu}'.")
+        return
+    if format_vystupu == "parquet" and not _je_pyarrow_dostupny():
+        print("Knihovna pyarrow není nainstalována – výstup se uloží ve formátu npz.")
+        format_vystupu = "npz"
+
+    ulozeno = []
+    if portfolio is not None and portfolio.ceny is not None:
+        ulozeno.append(uloz_sloupce(
+            {"ceny": portfolio.ceny, "nazvy": portfolio.nazvy}, prefix, "ceny", format_vystupu
+        ))
+    if vyvoj is not None:
+        ulozeno.append(uloz_sloupce({"hodnota": np.asarray(vyvoj, dtype=float)}, prefix, "vyvoj", format_vystupu))
+    if historie:
+        ulozeno.append(uloz_sloupce(transakce_jako_sloupce(historie), prefix, "transakce", format_vystupu))
+    if hodnoty_scenaru is not None:
+        # Scénáře jako sloupce (dny x scénáře) – sloupcový formát čte jednotlivé scénáře nezávisle
+        ulozeno.append(uloz_sloupce({"scenar": np.asarray(hodnoty_scenaru).T}, prefix, "scenare", format_vystupu))
+
+    print(f"Binární výstupy byly uloženy do: {', '.join(ulozeno)}")
+
+def _cas_zapisu(cesta):
+    """Čas změny souboru, u složky sloupců npy nejnovější z jejích souborů; None, pokud neexistuje."""
+    if os.path.isdir(cesta):
+        casy = [os.path.getmtime(os.path.join(cesta, s)) for s in os.listdir(cesta) if s.endswith(".npy")]
+        return max(casy) if casy else None
+    return os.path.getmtime(cesta) if os.path.exists(cesta) else None
+
+def _cesty_sloupcu(prefix, nazev):
+    slozka = os.path.join("vystupy", prefix, "data")
+    return {
+        "npy": os.path.join(slozka, nazev),
+        "npz": os.path.join(slozka, f"{prefix}_{nazev}.npz"),
+        "parquet": os.path.join(slozka, f"{prefix}_{nazev}.parquet"),
+    }
+
+def posledni_binarni_format(prefix, nazev):
+    """(format, cas_zapisu) naposledy zapsaného binárního výstupu `nazev`, nebo (None, None)."""
+    casy = {f: _cas_zapisu(cesta) for f, cesta in _cesty_sloupcu(prefix, nazev).items()}
+    casy = {f: cas for f, cas in casy.items() if cas is not None}
+    if not casy:
+        return None, None
+    format_vystupu = max(casy, key=casy.get)
+    return format_vystupu, casy[format_vystupu]
+
+def nacti_sloupce(prefix, nazev, format_vystupu=None):
+    """
+    Načte sadu sloupců uloženou přes uloz_sloupce jako slovník {sloupec: pole}.
+    Formát npy se otevírá přes mmap (bez kopírování do paměti), parquet přes memory map pyarrow.
+    npz mmap neumožňuje – načte se celý do paměti. Bez zadání formátu se použije naposledy zapsaný
+    (starší výstup v jiném formátu z dřívějšího běhu se ignoruje).
+    """
+    cesty = _cesty_sloupcu(prefix, nazev)
+    if format_vystupu is None:
+        format_vystupu, _ = posledni_binarni_format(prefix, nazev)
+        if format_vystupu is None:
+            raise FileNotFoundError(f"Výstup '{nazev}' pro '{prefix}' nebyl nalezen ve složce "
+                                    f"'{os.path.dirname(cesty['npz'])}'.")
+    cesta = cesty[format_vystupu]
+
+    if format_vystupu == "parquet":
+        import pyarrow.parquet as pq
+        tabulka = pq.read_table(cesta, memory_map=True)
+        sloupce = {klic: tabulka.column(klic).to_numpy() for klic in tabulka.column_names}
+        for klic, hodnota in (tabulka.schema.metadata or {}).items():
+            sloupce[klic.decode()] = np.array(json.loads(hodnota))
+        return sloupce
+    if format_vystupu == "npz":
+        with np.load(cesta) as archiv:
+            return {klic: archiv[klic] for klic in archiv.files}
+    return {
+        os.path.splitext(soubor)[0]: np.load(os.path.join(cesta, soubor), mmap_mode='r')
+        for soubor in sorted(os.listdir(cesta)) if soubor.endswith(".npy")
+    }
+
+def nacti_vysledky(prefix):
+    """
+    Načte uložené výsledky portfolia – ceny aktiv a vývoj hodnoty – z naposledy zapsaného
+    výstupu: binárního (npy/npz/parquet), nebo CSV, podle času zápisu. Starší výstup v jiném
+    formátu z dřívějšího běhu tak nepřebije čerstvý. Vrací slovník {'nazvy', 'ceny', 'vyvoj'}.
+    """
+    slozka = os.path.join("vystupy", prefix, "statistiky")
+    cesta_cen = os.path.join(slozka, f"{prefix}_ceny.csv")
+    format_cen, cas_binarni = posledni_binarni_format(prefix, "ceny")
+    cas_csv = _cas_zapisu(cesta_cen)
+    try:
+        if format_cen is None or (cas_csv is not None and cas_csv > cas_binarni):
+            raise FileNotFoundError(cesta_cen)
+        ceny = nacti_sloupce(prefix, "ceny", format_cen)
+        vyvoj = nacti_sloupce(prefix, "vyvoj")
+        if "ceny" in ceny:
+            nazvy, matice = list(ceny["nazvy"]), ceny["ceny"]
+        else:
+            # Parquet ukládá 2-D pole jako sloupce ceny_0, ceny_1, ...
+            nazvy = list(ceny["nazvy"]) if "nazvy" in ceny else []
+            sloupce = sorted((k for k in ceny if k.startswith("ceny_")), key=lambda k: int(k[5:]))
+            matice = np.column_stack([ceny[k] for k in sloupce])
+        return {"nazvy": [str(n) for n in nazvy], "ceny": matice, "vyvoj": vyvoj["hodnota"]}
+    except FileNotFoundError:
+        pass
+
+    with open(cesta_cen, newline='', encoding='utf-8') as csvfile:
+        nazvy = next(csv.reader(csvfile, delimiter=';'))[1:]
+    ceny = np.loadtxt(cesta_cen, delimiter=';', skiprows=1, ndmin=2)[:, 1:]
+    vyvoj = np.loadtxt(os.path.join(slozka, f"{prefix}_vyvoj.csv"), delimiter=';', skiprows=1, ndmin=2)[:, 1]
+    return {"nazvy": nazvy, "ceny": ceny, "vyvoj": vyvoj}
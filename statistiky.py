@@ -1,52 +1,356 @@
 # statistiky.py
 
-import statistics
+import numpy as np
+from redukce_rozptylu import MIN_NEZAVISLYCH_ODHADU, nezavisle_odhady
+
+DNI_V_ROCE = 252  # přibližný počet obchodních dní v roce
+
+# ========================
+# VÝSLEDEK STATISTIKY
+# ========================
+
+class Statistiky:
+    """
+    Metriky vývoje portfolia spočítané jedním průchodem (spocitej_statistiky, PrubeznaStatistika).
+    Pro vstup (scénáře x dny) obsahuje každé pole pole hodnot pro jednotlivé scénáře.
+    Výnosy a odchylky jsou v desetinném tvaru (0.05 = 5 %), celkové zhodnocení v procentech.
+    """
+    __slots__ = (
+        "zacatek", "konec", "celkove_zhodnoceni", "cagr",
+        "smerodatna_odchylka_denni", "smerodatna_odchylka_rocni",
+        "sharpe_ratio", "maximum", "minimum", "max_drawdown"
+    )
+
+    def __init__(self, zacatek, konec, smerodatna_odchylka_denni, maximum, minimum, max_drawdown,
+                 pocet_dni, bezrizikova_sazba=0.01):
+        roky = pocet_dni / DNI_V_ROCE
+        self.zacatek = zacatek
+        self.konec = konec
+        self.celkove_zhodnoceni = (konec - zacatek) / zacatek * 100
+        self.cagr = (konec / zacatek) ** (1 / roky) - 1  # Compound annual growth rate
+        self.smerodatna_odchylka_denni = smerodatna_odchylka_denni
+        self.smerodatna_odchylka_rocni = smerodatna_odchylka_denni * (DNI_V_ROCE ** 0.5)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            self.sharpe_ratio = np.where(
+                self.smerodatna_odchylka_rocni != 0,
+                (self.cagr - bezrizikova_sazba) / self.smerodatna_odchylka_rocni,
+                float('nan')
+            )
+        if np.ndim(self.sharpe_ratio) == 0:
+            self.sharpe_ratio = float(self.sharpe_ratio)
+        self.maximum = maximum
+        self.minimum = minimum
+        self.max_drawdown = max_drawdown
+
+    def jako_slovnik(self):
+        """Metriky jako slovník {nazev: hodnota}."""
+        return {pole: getattr(self, pole) for pole in self.__slots__}
+
+# ========================
+# VÝPOČET A VÝPIS
+# ========================
+
+def spocitej_statistiky(vyvoj, bezrizikova_sazba=0.01):
+    """
+    Spočítá všechny metriky vývoje portfolia jedním vektorovým průchodem.
+    vyvoj -- 1-D řada hodnot portfolia, nebo 2-D pole (scénáře x dny) – pak jsou metriky po scénářích.
+    Vrací Statistiky, nebo None při nedostatku dat.
+    """
+    hodnoty = np.asarray(vyvoj, dtype=float)
+    if hodnoty.ndim == 0 or hodnoty.shape[-1] < 2:
+        return None
+
+    denni_vynosy = np.diff(hodnoty, axis=-1) / hodnoty[..., :-1]
+    smerodatna_odchylka_denni = denni_vynosy.std(axis=-1, ddof=1) if denni_vynosy.shape[-1] > 1 else np.zeros(hodnoty.shape[:-1])
+    maxima = np.maximum.accumulate(hodnoty, axis=-1)
+    max_drawdown = np.minimum(((hodnoty - maxima) / maxima).min(axis=-1), 0.0)
+
+    statistiky = Statistiky(
+        hodnoty[..., 0], hodnoty[..., -1], smerodatna_odchylka_denni,
+        hodnoty.max(axis=-1), hodnoty.min(axis=-1), max_drawdown,
+        pocet_dni=hodnoty.shape[-1] - 1, bezrizikova_sazba=bezrizikova_sazba
+    )
+    if hodnoty.ndim == 1:
+        for pole in Statistiky.__slots__:
+            setattr(statistiky, pole, float(getattr(statistiky, pole)))
+    return statistiky
 
 def vypis_statistiku(vyvoj, bezrizikova_sazba=0.01):
     """Vypíše základní statistické údaje o vývoji portfolia."""
-
-    if not vyvoj or len(vyvoj) < 2:
+    statistiky = spocitej_statistiky(vyvoj, bezrizikova_sazba)
+    if statistiky is None:
         print("Nedostatek dat pro statistiku.")
         return
-    
-    zacatek = vyvoj[0]
-    konec = vyvoj[-1]
-    pocet_dni = len(vyvoj) - 1
-    roky = pocet_dni / 252  # přibližný počet obchodních dní v roce
+    vypis_metriky(statistiky)
 
-    celkove_zhodnoceni = (konec - zacatek) / zacatek * 100
-    cagr = (konec / zacatek) ** (1 / roky) - 1  # Compound annual growth rate
+def vypis_metriky(statistiky):
+    """Vypíše již spočítané metriky vývoje portfolia (objekt Statistiky)."""
+    s = statistiky
+    print("\n--- Statistika vývoje portfolia ---")
+    print(f"Počáteční hodnota: {s.zacatek:.2f} Kč")
+    print(f"Konečná hodnota:   {s.konec:.2f} Kč")
+    print(f"Celkové zhodnocení: {s.celkove_zhodnoceni:.2f} %")
+    print(f"Průměrné roční zhodnocení (CAGR): {s.cagr*100:.4f} %")
+    print(f"Denní směrodatná odchylka: {s.smerodatna_odchylka_denni*100:.4f} %")
+    print(f"Roční směrodatná odchylka: {s.smerodatna_odchylka_rocni*100:.4f} %")
+    print(f"Sharpe ratio: {s.sharpe_ratio:.4f}")
+    print(f"Maximum hodnoty: {s.maximum:.2f} Kč")
+    print(f"Minimum hodnoty: {s.minimum:.2f} Kč")
+    print(f"Max drawdown: {s.max_drawdown*100:.2f} %")
 
-    # Výpočet denních výnosů
-    denni_vynosy = [(vyvoj[i] - vyvoj[i - 1]) / vyvoj[i - 1] for i in range(1, len(vyvoj))]
+# ========================
+# PRŮBĚŽNÁ STATISTIKA
+# ========================
 
-    # Výpočet volatility
-    smerodatna_odchylka_denni = statistics.stdev(denni_vynosy)
-    smerodatna_odchylka_rocni = smerodatna_odchylka_denni * (252 ** 0.5)
+class PrubeznaStatistika:
+    """
+    Statistika vývoje portfolia počítaná průběžně po blocích hodnot s konstantní pamětí.
+    Rozptyl denních výnosů se slučuje Welfordovou/Chanovou metodou, drawdown přes průběžné maximum.
+    """
 
-    # Sharpe ratio
-    sharpe_ratio = (cagr - bezrizikova_sazba) / smerodatna_odchylka_rocni if smerodatna_odchylka_rocni != 0 else float('nan')
+    def __init__(self):
+        self.pocet_hodnot = 0
+        self.zacatek = None
+        self.konec = None
+        self.minimum = float("inf")
+        self.maximum = float("-inf")
+        self.max_so_far = None
+        self.max_drawdown = 0.0
+        # Denní výnosy: počet, průměr a součet čtverců odchylek
+        self.pocet_vynosu = 0
+        self.prumer_vynosu = 0.0
+        self.m2_vynosu = 0.0
 
-    # Max drawdown
-    max_so_far = vyvoj[0]
-    max_drawdown = 0
-    for hodnota in vyvoj:
-        max_so_far = max(max_so_far, hodnota)
-        drawdown = (hodnota - max_so_far) / max_so_far
-        max_drawdown = min(max_drawdown, drawdown)
+    def pridej(self, hodnoty):
+        """Započítá další blok hodnot portfolia (navazující na předchozí blok)."""
+        hodnoty = np.asarray(hodnoty, dtype=float)
+        if hodnoty.size == 0:
+            return
 
-    minimum = min(vyvoj)
-    maximum = max(vyvoj)
+        if self.zacatek is None:
+            self.zacatek = hodnoty[0]
+            self.max_so_far = hodnoty[0]
+            navazujici = hodnoty
+        else:
+            navazujici = np.concatenate(([self.konec], hodnoty))
 
-    # Výpis
-    print("\n--- Statistika vývoje portfolia ---")
-    print(f"Počáteční hodnota: {zacatek:.2f} Kč")
-    print(f"Konečná hodnota:   {konec:.2f} Kč")
-    print(f"Celkové zhodnocení: {celkove_zhodnoceni:.2f} %")
-    print(f"Průměrné roční zhodnocení (CAGR): {cagr*100:.4f} %")
-    print(f"Denní směrodatná odchylka: {smerodatna_odchylka_denni*100:.4f} %")
-    print(f"Roční směrodatná odchylka: {smerodatna_odchylka_rocni*100:.4f} %")
-    print(f"Sharpe ratio: {sharpe_ratio:.4f}")
-    print(f"Maximum hodnoty: {maximum:.2f} Kč")
-    print(f"Minimum hodnoty: {minimum:.2f} Kč")
-    print(f"Max drawdown: {max_drawdown*100:.2f} %")
+        vynosy = np.diff(navazujici) / navazujici[:-1]
+        if vynosy.size:
+            n = vynosy.size
+            prumer = vynosy.mean()
+            m2 = ((vynosy - prumer) ** 2).sum()
+            celkem = self.pocet_vynosu + n
+            delta = prumer - self.prumer_vynosu
+            self.m2_vynosu += m2 + delta ** 2 * self.pocet_vynosu * n / celkem
+            self.prumer_vynosu += delta * n / celkem
+            self.pocet_vynosu = celkem
+
+        maxima = np.maximum.accumulate(np.maximum(hodnoty, self.max_so_far))
+        self.max_drawdown = min(self.max_drawdown, float(((hodnoty - maxima) / maxima).min()))
+        self.max_so_far = maxima[-1]
+
+        self.minimum = min(self.minimum, hodnoty.min())
+        self.maximum = max(self.maximum, hodnoty.max())
+        self.konec = hodnoty[-1]
+        self.pocet_hodnot += hodnoty.size
+
+    def vysledek(self, bezrizikova_sazba=0.01):
+        """Vrátí Statistiky za všechny dosud přidané bloky (None při nedostatku dat)."""
+        if self.pocet_hodnot < 2:
+            return None
+        smerodatna_odchylka_denni = (self.m2_vynosu / (self.pocet_vynosu - 1)) ** 0.5 if self.pocet_vynosu > 1 else 0.0
+        return Statistiky(
+            float(self.zacatek), float(self.konec), smerodatna_odchylka_denni,
+            float(self.maximum), float(self.minimum), self.max_drawdown,
+            pocet_dni=self.pocet_hodnot - 1, bezrizikova_sazba=bezrizikova_sazba
+        )
+
+
+# ========================
+# MONTE CARLO SOUHRN
+# ========================
+
+def souhrn_scenaru(hodnoty, percentily=(5, 25, 50, 75, 95)):
+    """
+    Spočítá rozdělení metrik přes Monte Carlo scénáře.
+    hodnoty -- pole (pocet_scenaru, pocet_dni) s vývojem hodnoty portfolia v každém scénáři.
+    """
+    hodnoty = np.asarray(hodnoty, dtype=float)
+    statistiky = spocitej_statistiky(hodnoty)
+
+    return {
+        "pocet_scenaru": hodnoty.shape[0],
+        "percentily": list(percentily),
+        "vejir": np.percentile(hodnoty, percentily, axis=0),
+        "konecna_hodnota": statistiky.konec,
+        "cagr": statistiky.cagr,
+        "max_drawdown": statistiky.max_drawdown,
+        "statistiky": statistiky,
+    }
+
+def vypis_souhrn_scenaru(souhrn):
+    """Vypíše percentily konečné hodnoty, CAGR a max drawdownu přes všechny scénáře."""
+    percentily = souhrn["percentily"]
+    print(f"\n--- Monte Carlo: {souhrn['pocet_scenaru']} scénářů ---")
+    print("Percentil:          " + "".join(f"{p:>12}" for p in percentily))
+    radky = [
+        ("Konečná hodnota (Kč)", souhrn["konecna_hodnota"], 1, ".2f"),
+        ("CAGR (%)", souhrn["cagr"], 100, ".4f"),
+        ("Max drawdown (%)", souhrn["max_drawdown"], 100, ".2f"),
+    ]
+    for popis, hodnoty, nasobek, fmt in radky:
+        hodnoty_percentilu = np.percentile(hodnoty, percentily) * nasobek
+        print(f"{popis:<20}" + "".join(f"{h:>12{fmt}}" for h in hodnoty_percentilu))
+
+# ========================
+# ADAPTIVNÍ MONTE CARLO
+# ========================
+
+# Metriky scénáře sledované průběžně (jedno číslo na scénář); percentil se zadává příponou _p<q>
+METRIKY_PRUBEZNE = ("konecna_hodnota", "cagr", "max_drawdown", "poplatky")
+
+# Nejmenší jmenovatel relativní šířky intervalu (typická velikost metriky). Metriky, jejichž odhad
+# může být nulový (poplatky strategie bez rebalancování, CAGR modelu "nahodny"), se u nuly posuzují
+# absolutně: CAGR a drawdown vůči 0,01 procentního bodu, konečná hodnota a poplatky vůči 0,01 %
+# počáteční hodnoty portfolia. Je to jen pojistka proti dělení nulou – u běžných odhadů se
+# uplatní skutečná relativní šířka.
+MIN_MERITKO = {"konecna_hodnota": 1e-4, "cagr": 1e-4, "max_drawdown": 1e-4, "poplatky": 1e-4}
+METRIKY_V_HODNOTE = ("konecna_hodnota", "poplatky")  # MIN_MERITKO je násobek počáteční hodnoty
+
+def rozloz_metriku(nazev):
+    """'konecna_hodnota_p5' -> ('konecna_hodnota', 5.0), 'cagr' -> ('cagr', None)."""
+    zaklad, _, percentil = nazev.rpartition("_p")
+    if zaklad in METRIKY_PRUBEZNE and percentil.replace(".", "", 1).isdigit():
+        return zaklad, float(percentil)
+    if nazev in METRIKY_PRUBEZNE:
+        return nazev, None
+    raise ValueError(f"Neznámá metrika: {nazev} (dostupné: {', '.join(METRIKY_PRUBEZNE)}, s příponou _p<percentil>)")
+
+class PrubeznySouhrnScenaru:
+    """
+    Průběžné odhady metrik Monte Carla s intervaly spolehlivosti, doplňované po dávkách scénářů.
+
+    Průměry se slučují Welfordovou/Chanovou metodou z nezávislých odhadů dávky
+    (scénáře, antitetické páry nebo průměr dávky u Sobola – viz redukce_rozptylu.nezavisle_odhady),
+    interval je normální aproximace. Pro percentily se drží jen hodnota metriky za scénář
+    (ne celý vývoj) a interval se bere z pořadových statistik (binomická aproximace).
+    """
+
+    def __init__(self, spolehlivost=0.95, redukce="zadna"):
+        from statistics import NormalDist
+        self.spolehlivost = spolehlivost
+        self.redukce = redukce
+        self.z = NormalDist().inv_cdf((1 + spolehlivost) / 2)
+        self.pocet_scenaru = 0
+        self.pocet_odhadu = 0
+        self.pocatecni_hodnota = None
+        self.prumer = np.zeros(len(METRIKY_PRUBEZNE))
+        self.m2 = np.zeros(len(METRIKY_PRUBEZNE))
+        self._hodnoty = [[] for _ in METRIKY_PRUBEZNE]
+
+    def pridej(self, hodnoty, poplatky):
+        """Započítá dávku scénářů: hodnoty (scénáře x dny) a poplatky po scénářích."""
+        statistiky = spocitej_statistiky(hodnoty)
+        if self.pocatecni_hodnota is None and len(hodnoty):
+            self.pocatecni_hodnota = float(np.asarray(hodnoty)[0, 0])
+        metriky = np.array([
+            statistiky.konec, statistiky.cagr, statistiky.max_drawdown, np.asarray(poplatky, dtype=float)
+        ])
+        for seznam, radek in zip(self._hodnoty, metriky):
+            seznam.append(radek)
+
+        odhady = np.stack([nezavisle_odhady(radek, self.redukce, [(0, len(radek))]) for radek in metriky])
+        n = odhady.shape[1]
+        if n:
+            prumer = odhady.mean(axis=1)
+            m2 = ((odhady - prumer[:, None]) ** 2).sum(axis=1)
+            celkem = self.pocet_odhadu + n
+            delta = prumer - self.prumer
+            self.m2 += m2 + delta ** 2 * self.pocet_odhadu * n / celkem
+            self.prumer += delta * n / celkem
+            self.pocet_odhadu = celkem
+        self.pocet_scenaru += len(hodnoty)
+
+    def hodnoty(self, metrika):
+        """Všechny dosavadní hodnoty metriky (METRIKY_PRUBEZNE) po scénářích."""
+        seznam = self._hodnoty[METRIKY_PRUBEZNE.index(metrika)]
+        if len(seznam) > 1:
+            seznam[:] = [np.concatenate(seznam)]
+        return seznam[0] if seznam else np.empty(0)
+
+    def meritko(self, metrika):
+        """Nejmenší jmenovatel relativní šířky intervalu metriky (MIN_MERITKO)."""
+        meritko = MIN_MERITKO[metrika]
+        if metrika in METRIKY_V_HODNOTE:
+            meritko *= abs(self.pocatecni_hodnota or 0.0)
+        return meritko
+
+    def odhad(self, nazev):
+        """
+        Odhad metriky s intervalem spolehlivosti: {"odhad", "dolni", "horni", "sirka", "relativni_sirka"}.
+        Relativní šířka je šířka / max(|odhad|, meritko(metrika)), u nulového odhadu tedy absolutní.
+        """
+        metrika, percentil = rozloz_metriku(nazev)
+        if percentil is None:
+            i = METRIKY_PRUBEZNE.index(metrika)
+            odhad = self.prumer[i]
+            if self.pocet_odhadu > 1:
+                pulka = self.z * np.sqrt(self.m2[i] / (self.pocet_odhadu - 1) / self.pocet_odhadu)
+            else:
+                pulka = float("inf")
+            dolni, horni = odhad - pulka, odhad + pulka
+        else:
+            hodnoty = np.sort(self.hodnoty(metrika))
+            n = len(hodnoty)
+            if n == 0:
+                return {"odhad": float("nan"), "dolni": float("nan"), "horni": float("nan"),
+                        "sirka": float("inf"), "relativni_sirka": float("inf")}
+            odhad = np.percentile(hodnoty, percentil)
+            p = percentil / 100
+            rozptyl_poradi = self.z * np.sqrt(n * p * (1 - p))
+            dolni = hodnoty[max(int(np.floor(n * p - rozptyl_poradi)), 0)]
+            horni = hodnoty[min(int(np.ceil(n * p + rozptyl_poradi)), n - 1)]
+        sirka = horni - dolni
+        return {
+            "odhad": float(odhad), "dolni": float(dolni), "horni": float(horni), "sirka": float(sirka),
+            "relativni_sirka": _relativni_sirka(sirka, odhad, self.meritko(metrika)),
+        }
+
+    def konvergovano(self, metriky, tolerance):
+        """
+        True, pokud je relativní šířka intervalu každé metriky nejvýš `tolerance`
+        (u metrik s odhadem u nuly vůči meritko(), viz MIN_MERITKO).
+        """
+        if self.pocet_odhadu < MIN_NEZAVISLYCH_ODHADU:
+            return False
+        return all(self.odhad(nazev)["relativni_sirka"] <= tolerance for nazev in metriky)
+
+def _relativni_sirka(sirka, odhad, meritko):
+    jmenovatel = max(abs(odhad), meritko)
+    if jmenovatel > 0:
+        return float(sirka / jmenovatel)
+    return 0.0 if sirka == 0 else float("inf")
+
+def vypis_adaptivni_souhrn(souhrn, metriky, tolerance, prubeh):
+    """
+    Vypíše výsledek adaptivního Monte Carla: počet scénářů, důvod ukončení a odhady
+    metrik s intervaly spolehlivosti (PrubeznySouhrnScenaru).
+    prubeh -- {"pocet_scenaru", "duvod", "cas_s"} ze simulace.simuluj_portfolia_mc_adaptivne
+    """
+    duvody = {
+        "konvergence": "intervaly spolehlivosti všech metrik jsou užší než tolerance",
+        "max_scenaru": "vyčerpán rozpočet scénářů",
+        "max_cas": "vyčerpán časový rozpočet",
+    }
+    print(f"\n--- Adaptivní Monte Carlo: {prubeh['pocet_scenaru']} scénářů za {prubeh['cas_s']:.1f} s ---")
+    print(f"Ukončeno: {duvody.get(prubeh['duvod'], prubeh['duvod'])}")
+    print(f"Spolehlivost {souhrn.spolehlivost:.0%}, tolerance relativní šířky intervalu {tolerance:.2%}")
+    print(f"{'Metrika':<26}{'Odhad':>16}{'Dolní mez':>16}{'Horní mez':>16}{'Šířka':>14}{'Rel. šířka':>12}")
+    for nazev in metriky:
+        o = souhrn.odhad(nazev)
+        nasobek = 100 if rozloz_metriku(nazev)[0] in ("cagr", "max_drawdown") else 1
+        znacka = "" if o["relativni_sirka"] <= tolerance else "  *"
+        print(f"{nazev:<26}{o['odhad'] * nasobek:>16.4f}{o['dolni'] * nasobek:>16.4f}"
+              f"{o['horni'] * nasobek:>16.4f}{o['sirka'] * nasobek:>14.4f}{o['relativni_sirka']:>12.2%}{znacka}")
+    print("CAGR a max drawdown v %, * = interval zatím širší než tolerance. Odhady u nuly se posuzují absolutně\n"
+          "(CAGR a drawdown vůči 0,01 p. b., hodnota a poplatky vůči 0,01 % počáteční hodnoty).")
@@ -0,0 +1,68 @@
+# testy/test_adaptivni_mc.py
+#
+# Adaptivní Monte Carlo: ukončení podle intervalů spolehlivosti i u metrik s nulovým průměrem.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+
+import simulace as sim
+from portfolio import nacti_portfolio, vypocitej_zakladni_mnozstvi
+from statistiky import PrubeznySouhrnScenaru
+
+def _portfolio():
+    portfolio = nacti_portfolio(os.path.join(KOREN, "portfolio_konzervativni.csv"))
+    vypocitej_zakladni_mnozstvi(portfolio, 100000)
+    return portfolio
+
+def test_nulove_poplatky_konverguji():
+    """Poplatky přesně 0 ve všech scénářích mají nulovou šířku intervalu – nesmí bránit konvergenci."""
+    rng = np.random.default_rng(1)
+    souhrn = PrubeznySouhrnScenaru()
+    for _ in range(4):
+        hodnoty = 100000 * np.cumprod(1 + rng.normal(0.0003, 0.001, (50, 253)), axis=1)
+        hodnoty[:, 0] = 100000
+        souhrn.pridej(hodnoty, np.zeros(50))
+
+    odhad = souhrn.odhad("poplatky")
+    assert odhad["odhad"] == 0.0
+    assert odhad["relativni_sirka"] == 0.0
+    assert souhrn.konvergovano(["poplatky"], 0.01)
+
+def test_adaptivni_mc_bez_rebalancovani_skonci_konvergenci():
+    """Strategie bez rebalancování (poplatky 0) skončí dřív než po celém rozpočtu scénářů."""
+    portfolio = _portfolio()
+    pocet_dni, max_scenaru = 252, 20000
+    vysledek, = sim.simuluj_portfolia_mc_adaptivne(
+        portfolio, [portfolio], [np.arange(len(portfolio))], [portfolio.cilove_vahy()], pocet_dni,
+        rebalancovaci_perioda=10 * pocet_dni, zpusob_rebalancovani="periodicky", tolerance_vahy=0.05,
+        transakcni_poplatek=0.01, metriky=("konecna_hodnota", "poplatky"), tolerance=0.05,
+        max_scenaru=max_scenaru, uchovat_scenaru=100, rng=42
+    )
+
+    assert not vysledek["poplatky"].any()
+    assert vysledek["prubeh"]["duvod"] == "konvergence"
+    assert vysledek["prubeh"]["pocet_scenaru"] < max_scenaru
+
+def test_adaptivni_mc_cagr_v_toleranci():
+    """Po ukončení konvergencí je polovina intervalu CAGR nejvýš tolerance * |CAGR| (bez široké pojistky u nuly)."""
+    portfolio = _portfolio()
+    tolerance = 0.1
+    vysledek, = sim.simuluj_portfolia_mc_adaptivne(
+        portfolio, [portfolio], [np.arange(len(portfolio))], [portfolio.cilove_vahy()], 252,
+        rebalancovaci_perioda=21, zpusob_rebalancovani="periodicky", tolerance_vahy=0.05,
+        transakcni_poplatek=0.001, metriky=("cagr",), tolerance=tolerance,
+        max_scenaru=200000, uchovat_scenaru=100, rng=7
+    )
+
+    assert vysledek["prubeh"]["duvod"] == "konvergence"
+    odhad = vysledek["souhrn"].odhad("cagr")
+    assert abs(odhad["odhad"]) > 1e-3
+    assert odhad["sirka"] / 2 <= tolerance * abs(odhad["odhad"])
+    assert odhad["relativni_sirka"] == odhad["sirka"] / abs(odhad["odhad"])
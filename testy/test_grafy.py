@@ -0,0 +1,57 @@
+# testy/test_grafy.py
+#
+# Zmenšení dlouhých křivek metodou LTTB: krajní body, počet bodů, poslední koš a vrcholy křivky.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+import pytest
+
+grafy = pytest.importorskip("grafy")
+
+@pytest.mark.parametrize("n, pocet_bodu", [(10000, 200), (1001, 1000), (50, 3), (2521, 97)])
+def test_lttb_krajni_body_a_pocet(n, pocet_bodu):
+    y = np.cumsum(np.random.default_rng(n).normal(size=n))
+    indexy = grafy.lttb(y, pocet_bodu)
+    assert len(indexy) == pocet_bodu
+    assert indexy[0] == 0 and indexy[-1] == n - 1
+    assert (np.diff(indexy) > 0).all()
+
+def test_lttb_kratka_krivka_beze_zmeny():
+    np.testing.assert_array_equal(grafy.lttb(np.arange(5.0), 10), np.arange(5))
+    np.testing.assert_array_equal(grafy.lttb(np.arange(5.0), 2), np.arange(5))
+
+def test_lttb_vrchol_v_poslednim_kosi():
+    """Poslední koš se porovnává s posledním bodem křivky – jeho výrazný vrchol se zachová."""
+    n, pocet_bodu = 1000, 20
+    y = np.zeros(n)
+    y[n - 5] = 100.0
+    y[400] = -50.0
+    indexy = grafy.lttb(y, pocet_bodu)
+    assert n - 5 in indexy
+    assert 400 in indexy
+    assert indexy[-2] < indexy[-1] == n - 1
+
+def test_lttb_s_osou_x():
+    x = np.linspace(0, 1, 500) ** 2
+    y = np.sin(20 * x)
+    indexy = grafy.lttb(y, 50, x)
+    assert indexy[0] == 0 and indexy[-1] == 499
+    assert len(np.unique(indexy)) == 50
+
+def test_zmensi_vynecha_chybejici_hodnoty():
+    grafy.nastav_vystup(max_bodu=10)
+    try:
+        y = np.arange(100, dtype=float)
+        y[[0, 50]] = np.nan
+        x, zmensene = grafy._zmensi(y)
+        assert len(x) == 10 and x[0] == 1 and x[-1] == 99
+        assert np.isfinite(zmensene).all()
+    finally:
+        grafy.nastav_vystup(max_bodu=2000)
@@ -0,0 +1,59 @@
+# testy/test_korelace.py
+#
+# Korelační matice: načtení z CSV a oprava na pozitivně definitní korelační matici.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+import pytest
+
+from korelace import (nacti_matici, priprav_korelacni_matici, je_pozitivne_definitni,
+                      nejblizsi_korelacni_matice)
+
+def _zapis(slozka, obsah):
+    cesta = os.path.join(slozka, "matice.csv")
+    with open(cesta, "w", encoding="utf-8") as f:
+        f.write(obsah)
+    return cesta
+
+def test_nacti_matici_v_poradi_nazvu(tmp_path):
+    cesta = _zapis(tmp_path, "Asset,A,B,C\nA,1,0.2,0.3\nB,0.2,1,0.4\nC,0.3,0.4,1\n")
+    matice = nacti_matici(cesta, ["C", "A", "B"])
+    np.testing.assert_array_equal(matice, [[1, 0.3, 0.4], [0.3, 1, 0.2], [0.4, 0.2, 1]])
+
+def test_nacti_matici_kratky_radek(tmp_path):
+    cesta = _zapis(tmp_path, "Asset,A,B,C\nA,1,0.2,0.3\nB,0.2,1\nC,0.3,0.4,1\n")
+    with pytest.raises(ValueError, match=r"matice\.csv', řádek 3 \(B\)"):
+        nacti_matici(cesta, ["A", "B", "C"])
+
+def test_nacti_matici_chybejici_aktivum(tmp_path):
+    cesta = _zapis(tmp_path, "Asset,A,B\nA,1,0.2\nB,0.2,1\n")
+    with pytest.raises(ValueError, match="neobsahuje aktiva: C"):
+        nacti_matici(cesta, ["A", "B", "C"])
+
+def test_kovariance_na_korelaci():
+    volatility = np.array([0.2, 0.05])
+    korelace = np.array([[1.0, -0.3], [-0.3, 1.0]])
+    matice, vol = priprav_korelacni_matici(korelace * np.outer(volatility, volatility))
+    np.testing.assert_allclose(matice, korelace)
+    np.testing.assert_allclose(vol, volatility)
+
+def test_oprava_na_pozitivne_definitni():
+    matice = np.array([[1.0, 0.9, -0.9], [0.9, 1.0, 0.9], [-0.9, 0.9, 1.0]])
+    assert not je_pozitivne_definitni(matice)
+    opravena, _ = priprav_korelacni_matici(matice)
+    assert je_pozitivne_definitni(opravena)
+    np.testing.assert_allclose(np.diag(opravena), 1.0)
+    np.testing.assert_allclose(opravena, opravena.T)
+    # Oprava zachová platnou matici beze změny
+    np.testing.assert_allclose(nejblizsi_korelacni_matice(opravena), opravena, atol=1e-6)
+
+def test_nesymetricka_matice():
+    with pytest.raises(ValueError, match="symetrická"):
+        priprav_korelacni_matici([[1.0, 0.2], [0.3, 1.0]])
@@ -0,0 +1,35 @@
+# testy/test_pruzkum.py
+#
+# Průzkum parametrů počítá metriky stejně jako Monte Carlo (statistiky.souhrn_scenaru).
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+import pytest
+
+import simulace as sim
+from portfolio import nacti_portfolio, vypocitej_zakladni_mnozstvi
+from pruzkum import pruzkum_parametru
+from statistiky import souhrn_scenaru
+
+def test_pruzkum_odpovida_monte_carlu():
+    portfolio = nacti_portfolio(os.path.join(KOREN, "portfolio_konzervativni.csv"))
+    vypocitej_zakladni_mnozstvi(portfolio, 100000)
+    cilove_vahy = portfolio.cilove_vahy()
+
+    radek, = pruzkum_parametru(portfolio, cilove_vahy, 126, 200, [21], [0.05], [0.002], ["periodicky"],
+                               rng=11, velikost_davky=50)
+    mc = sim.simuluj_portfolio_mc(portfolio, cilove_vahy, 126, 200, 21, "periodicky", 0.05, 0.002,
+                                  rng=11, velikost_davky=50)
+    souhrn = souhrn_scenaru(mc["hodnoty"])
+
+    assert radek["konecna_hodnota"] == pytest.approx(souhrn["konecna_hodnota"].mean(), rel=1e-12)
+    assert radek["cagr"] == pytest.approx(souhrn["cagr"].mean(), rel=1e-12)
+    assert radek["max_drawdown"] == pytest.approx(souhrn["max_drawdown"].mean(), rel=1e-12)
+    assert radek["poplatky"] == pytest.approx(mc["poplatky"].mean(), rel=1e-12)
@@ -0,0 +1,97 @@
+# testy/test_rebalancovani.py
+#
+# Maticový rebalancovací engine (skoky mezi dny rebalancování) proti původní smyčce den po dni
+# s rebalancováním po jednotlivých aktivech.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+import pytest
+
+from rebalancovani import simuluj_rebalancovani
+
+NAZVY = ["A", "B", "C"]
+PERIODA = 15
+TOLERANCE = 0.04
+POPLATEK = 0.003
+
+def _ceny(pocet_dni=700, seed=5):
+    rng = np.random.default_rng(seed)
+    vynosy = rng.normal(0.0002, [0.006, 0.015, 0.025], (pocet_dni, 3))
+    ceny = np.empty((pocet_dni + 1, 3))
+    ceny[0] = [80.0, 35.0, 12.0]
+    ceny[1:] = ceny[0] * np.cumprod(1 + vynosy, axis=0)
+    return ceny
+
+def _smycka_po_dnech(ceny, mnozstvi, vahy, zpusob):
+    """Původní simulace: každý den kontrola odchylky, rebalancování po aktivech, hodnota jako sum()."""
+    ceny = ceny.tolist()
+    mnozstvi = list(map(float, mnozstvi))
+    vahy = list(map(float, vahy))
+    vyvoj, historie = [], []
+    for den in range(1, len(ceny)):
+        cena = ceny[den]
+        hodnota = sum(c * m for c, m in zip(cena, mnozstvi))
+        odchylka = any(abs(m * c / hodnota - v) > TOLERANCE for c, m, v in zip(cena, mnozstvi, vahy))
+        if ((zpusob == "periodicky" and den % PERIODA == 0) or
+                (zpusob == "podle_odchylky" and odchylka) or
+                (zpusob == "kombinovane" and (den % PERIODA == 0 or odchylka))):
+            poplatky = []
+            nova = []
+            for c, m, v in zip(cena, mnozstvi, vahy):
+                cilova_castka = hodnota * v
+                rozdil_castky = cilova_castka - m * c
+                poplatek = abs(rozdil_castky) * POPLATEK
+                skutecna_castka = cilova_castka - poplatek if rozdil_castky > 0 else cilova_castka + poplatek
+                nova.append(skutecna_castka / c)
+                poplatky.append(poplatek)
+            historie.append((den, poplatky))
+            mnozstvi = nova
+        vyvoj.append(sum(c * m for c, m in zip(cena, mnozstvi)))
+    return vyvoj, historie
+
+@pytest.mark.parametrize("zpusob", ["periodicky", "podle_odchylky", "kombinovane", "zadny"])
+def test_engine_odpovida_smycce_po_dnech(zpusob):
+    ceny = _ceny()
+    vahy = np.array([0.5, 0.3, 0.2])
+    mnozstvi = 10000 * vahy / ceny[0]
+
+    vyvoj, historie, udalosti = simuluj_rebalancovani(
+        ceny, mnozstvi, vahy, NAZVY, PERIODA, zpusob, TOLERANCE, POPLATEK
+    )
+    ocekavany_vyvoj, ocekavana_historie = _smycka_po_dnech(ceny, mnozstvi, vahy, zpusob)
+
+    np.testing.assert_allclose(vyvoj, ocekavany_vyvoj, rtol=1e-12)
+    assert [zaznam["den"] for zaznam in historie] == [den for den, _ in ocekavana_historie]
+    assert [u[0] for u in udalosti] == [den for den, _ in ocekavana_historie]
+    for zaznam, (_, poplatky) in zip(historie, ocekavana_historie):
+        np.testing.assert_allclose([t["poplatek"] for t in zaznam["transakce"]], poplatky, rtol=1e-12)
+    if zpusob == "zadny":
+        assert historie == []
+
+@pytest.mark.parametrize("zpusob", ["periodicky", "kombinovane"])
+def test_zpracovani_po_blocich_se_shoduje(zpusob):
+    """posun_dni: simulace rozdělená na bloky dnů dává stejný vývoj i dny rebalancování."""
+    ceny = _ceny(pocet_dni=400, seed=9)
+    vahy = np.array([0.2, 0.5, 0.3])
+    mnozstvi = 10000 * vahy / ceny[0]
+
+    vyvoj, historie, _ = simuluj_rebalancovani(ceny, mnozstvi, vahy, NAZVY, PERIODA, zpusob, TOLERANCE, POPLATEK)
+
+    hranice = 137
+    vyvoj_1, historie_1, udalosti_1 = simuluj_rebalancovani(
+        ceny[:hranice + 1], mnozstvi, vahy, NAZVY, PERIODA, zpusob, TOLERANCE, POPLATEK
+    )
+    mnozstvi_2 = udalosti_1[-1][2] if udalosti_1 else mnozstvi
+    vyvoj_2, historie_2, _ = simuluj_rebalancovani(
+        ceny[hranice:], mnozstvi_2, vahy, NAZVY, PERIODA, zpusob, TOLERANCE, POPLATEK, posun_dni=hranice
+    )
+
+    np.testing.assert_array_equal(np.concatenate([vyvoj_1, vyvoj_2]), vyvoj)
+    assert [z["den"] for z in historie_1 + historie_2] == [z["den"] for z in historie]
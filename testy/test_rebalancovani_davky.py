@@ -0,0 +1,77 @@
+# testy/test_rebalancovani_davky.py
+#
+# Dávkové rebalancovací jádra (scénáře, portfolia) musí dávat pro každý scénář stejné výsledky
+# jako simulace jedné cesty rebalancovani.simuluj_rebalancovani.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+import pytest
+
+import simulace as sim
+from rebalancovani import simuluj_rebalancovani
+
+POCET_SCENARU = 12
+POCET_DNI = 300
+PERIODA = 21
+TOLERANCE = 0.03
+POPLATEK = 0.002
+ZPUSOBY = ("periodicky", "podle_odchylky", "kombinovane", "zadny")
+
+def _ceny(seed=3):
+    rng = np.random.default_rng(seed)
+    vynosy = rng.normal(0.0003, [0.004, 0.012, 0.02, 0.008], (POCET_SCENARU, POCET_DNI, 4))
+    ceny = np.empty((POCET_SCENARU, POCET_DNI + 1, 4))
+    ceny[:, 0] = [100.0, 50.0, 20.0, 250.0]
+    ceny[:, 1:] = ceny[:, :1] * np.cumprod(1 + vynosy, axis=1)
+    return ceny
+
+def _jedna_cesta(ceny, mnozstvi, vahy, zpusob):
+    vyvoj, historie, udalosti = simuluj_rebalancovani(
+        ceny, mnozstvi, vahy, ["A", "B", "C", "D"], PERIODA, zpusob, TOLERANCE, POPLATEK
+    )
+    poplatky = sum(sum(t["poplatek"] for t in zaznam["transakce"]) for zaznam in historie)
+    return vyvoj, poplatky, len(udalosti)
+
+@pytest.mark.parametrize("zpusob", ZPUSOBY)
+def test_davka_scenaru_odpovida_jedne_ceste(zpusob):
+    ceny = _ceny()
+    vahy = np.array([0.4, 0.3, 0.1, 0.2])
+    mnozstvi = 100000 * vahy / ceny[0, 0]
+    if zpusob in ("podle_odchylky", "kombinovane"):
+        hodnoty, poplatky, pocty = sim.simuluj_rebalancovani_scenaru(
+            ceny, mnozstvi, vahy, PERIODA, zpusob, TOLERANCE, POPLATEK
+        )
+    else:
+        hodnoty, poplatky, pocty = sim._simuluj_davku_periodicky(
+            ceny, mnozstvi, vahy, PERIODA, POPLATEK, rebalancovat=zpusob == "periodicky"
+        )
+
+    for s in range(POCET_SCENARU):
+        vyvoj, poplatky_cesty, pocet = _jedna_cesta(ceny[s], mnozstvi, vahy, zpusob)
+        np.testing.assert_array_equal(hodnoty[s], vyvoj)
+        assert pocty[s] == pocet
+        assert poplatky[s] == pytest.approx(poplatky_cesty, rel=1e-12, abs=1e-12)
+
+@pytest.mark.parametrize("zpusob", ZPUSOBY)
+def test_davka_portfolii_odpovida_jedne_ceste(zpusob):
+    ceny = _ceny(seed=8)
+    vahy = np.array([[0.4, 0.3, 0.1, 0.2], [0.1, 0.1, 0.5, 0.3], [0.25, 0.25, 0.25, 0.25]])
+    mnozstvi = 50000 * vahy / ceny[0, 0]
+    hodnoty, poplatky, pocty = sim.vyhodnot_portfolia(
+        ceny, mnozstvi, vahy, PERIODA, zpusob, TOLERANCE, POPLATEK
+    )
+    assert hodnoty.shape == (len(vahy), POCET_SCENARU, POCET_DNI)
+
+    for p in range(len(vahy)):
+        for s in range(POCET_SCENARU):
+            vyvoj, poplatky_cesty, pocet = _jedna_cesta(ceny[s], mnozstvi[p], vahy[p], zpusob)
+            np.testing.assert_array_equal(hodnoty[p, s], vyvoj)
+            assert pocty[p, s] == pocet
+            assert poplatky[p, s] == pytest.approx(poplatky_cesty, rel=1e-12, abs=1e-12)
@@ -0,0 +1,92 @@
+# testy/test_soubory.py
+#
+# Binární sloupcové výstupy (npy, npz, parquet) a CSV: uložení a zpětné načtení výsledků,
+# včetně portfolia s více aktivy, než je dnů simulace.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+import pytest
+
+import soubory
+from portfolio import Portfolio
+
+def _portfolio(pocet_aktiv, pocet_dni, seed=1):
+    nazvy = [f"Aktivum{j}" for j in range(pocet_aktiv)]
+    portfolio = Portfolio(nazvy, ["akcie"] * pocet_aktiv, [100.0] * pocet_aktiv,
+                          [1 / pocet_aktiv] * pocet_aktiv, [0.5] * pocet_aktiv)
+    portfolio.ceny = 100 * np.random.default_rng(seed).random((pocet_dni + 1, pocet_aktiv)) + 1
+    return portfolio
+
+@pytest.fixture(autouse=True)
+def _pracovni_slozka(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+
+def _formaty():
+    formaty = ["npy", "npz"]
+    if soubory._je_pyarrow_dostupny():
+        formaty.append("parquet")
+    return formaty
+
+@pytest.mark.parametrize("format_vystupu", _formaty())
+@pytest.mark.parametrize("pocet_aktiv, pocet_dni", [(4, 30), (12, 5), (6, 5)])
+def test_binarni_vystup_tam_a_zpet(format_vystupu, pocet_aktiv, pocet_dni):
+    """Včetně více aktiv, než je řádků cen (12 > 6), a stejného počtu (6 == 6)."""
+    portfolio = _portfolio(pocet_aktiv, pocet_dni)
+    vyvoj = portfolio.ceny[1:].sum(axis=1)
+    historie = [{"den": 3, "transakce": [
+        {"aktivum": "Aktivum0", "puvodni": 1.0, "nove": 1.5, "rozdil": 0.5, "poplatek": 0.01}
+    ]}]
+    soubory.uloz_vysledky_binarne("test", format_vystupu, portfolio=portfolio, vyvoj=vyvoj,
+                                  historie=historie, hodnoty_scenaru=np.ones((3, pocet_dni)))
+
+    vysledky = soubory.nacti_vysledky("test")
+    assert vysledky["nazvy"] == portfolio.nazvy.tolist()
+    np.testing.assert_array_equal(vysledky["ceny"], portfolio.ceny)
+    np.testing.assert_array_equal(vysledky["vyvoj"], vyvoj)
+
+    transakce = soubory.nacti_sloupce("test", "transakce", format_vystupu)
+    np.testing.assert_array_equal(transakce["den"], [3])
+    np.testing.assert_array_equal(transakce["poplatek"], [0.01])
+
+def test_parquet_pocet_radku_podle_dnu():
+    """Řádky tabulky jsou dny cen i u portfolia s více aktivy, než je dnů (názvy jdou do metadat)."""
+    pq = pytest.importorskip("pyarrow.parquet")
+    ceny = np.arange(3 * 8, dtype=float).reshape(3, 8)
+    cesta = soubory.uloz_sloupce({"ceny": ceny, "nazvy": np.array(list("abcdefgh"))}, "test", "ceny", "parquet")
+    tabulka = pq.read_table(cesta)
+    assert tabulka.num_rows == 3
+    assert tabulka.column_names == [f"ceny_{j}" for j in range(8)]
+
+    sloupce = soubory.nacti_sloupce("test", "ceny", "parquet")
+    np.testing.assert_array_equal(np.column_stack([sloupce[f"ceny_{j}"] for j in range(8)]), ceny)
+    assert list(sloupce["nazvy"]) == list("abcdefgh")
+
+def test_csv_tam_a_zpet():
+    portfolio = _portfolio(12, 5)
+    vyvoj = portfolio.ceny[1:].sum(axis=1)
+    soubory.uloz_ceny_aktiv_do_csv(portfolio, "test")
+    soubory.uloz_vyvoj_portfolia_do_csv(vyvoj.tolist(), "test")
+
+    vysledky = soubory.nacti_vysledky("test")
+    assert vysledky["nazvy"] == portfolio.nazvy.tolist()
+    np.testing.assert_allclose(vysledky["ceny"], portfolio.ceny, atol=5e-5)
+    np.testing.assert_allclose(vysledky["vyvoj"], vyvoj, atol=5e-3)
+
+def test_nacte_se_naposledy_zapsany_format():
+    """Starší binární výstup nepřebije novější CSV."""
+    stare = _portfolio(3, 10, seed=1)
+    soubory.uloz_vysledky_binarne("test", "npz", portfolio=stare, vyvoj=stare.ceny[1:].sum(axis=1))
+    cas = os.path.getmtime(os.path.join("vystupy", "test", "data", "test_ceny.npz")) - 10
+    os.utime(os.path.join("vystupy", "test", "data", "test_ceny.npz"), (cas, cas))
+
+    nove = _portfolio(3, 10, seed=2)
+    soubory.uloz_ceny_aktiv_do_csv(nove, "test")
+    soubory.uloz_vyvoj_portfolia_do_csv(nove.ceny[1:].sum(axis=1).tolist(), "test")
+    np.testing.assert_allclose(soubory.nacti_vysledky("test")["ceny"], nove.ceny, atol=5e-5)
@@ -0,0 +1,110 @@
+# testy/test_uloziste.py
+#
+# Úložiště scénářů a mezipaměť běhu: kontrola poškozených položek, mazání nejdéle nepoužitých
+# položek (LRU) a nedokončené soubory po přerušeném běhu.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+import time
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+
+import uloziste
+from mezipamet import MezipametBehu
+from uloziste import UlozisteScenaru
+
+VELIKOST = 10 * 100 * 8  # bajty dat jedné položky tvaru (10, 100)
+
+def _ceny(seed):
+    return np.random.default_rng(seed).random((10, 100))
+
+def _zestarni(cesta, sekund):
+    cas = time.time() - sekund
+    os.utime(cesta, (cas, cas))
+
+def test_ulozeni_a_nacteni(tmp_path):
+    ul = UlozisteScenaru(str(tmp_path))
+    ceny = _ceny(1)
+    ul.uloz("a", ceny, {"model": "typovy"})
+
+    nactene, metadata = ul.nacti("a")
+    np.testing.assert_array_equal(nactene, ceny)
+    assert metadata["model"] == "typovy"
+    assert metadata["tvar"] == [10, 100]
+    assert ul.nacti("b") is None
+
+def test_zkraceny_soubor_se_smaze(tmp_path, capsys):
+    ul = UlozisteScenaru(str(tmp_path))
+    ul.uloz("a", _ceny(1))
+    cesta_dat, cesta_meta = ul._cesty("a")
+    with open(cesta_dat, "r+b") as f:
+        f.truncate(os.path.getsize(cesta_dat) - 8)
+
+    assert ul.nacti("a") is None
+    assert "poškozené" in capsys.readouterr().out
+    assert not os.path.exists(cesta_dat) and not os.path.exists(cesta_meta)
+
+def test_hlavicka_neodpovida_metadatum(tmp_path):
+    ul = UlozisteScenaru(str(tmp_path))
+    ul.uloz("a", _ceny(1))
+    cesta_dat, _ = ul._cesty("a")
+    np.save(cesta_dat, _ceny(2)[:, :50])
+
+    assert ul.nacti("a") is None
+    assert not os.path.exists(cesta_dat)
+
+def test_lru_smaze_nejdele_nepouzitou(tmp_path):
+    ul = UlozisteScenaru(str(tmp_path), max_velikost=2 * VELIKOST + 1000)
+    ul.uloz("a", _ceny(1))
+    ul.uloz("b", _ceny(2))
+    _zestarni(ul._cesty("a")[1], 20)
+    _zestarni(ul._cesty("b")[1], 10)
+    ul.nacti("a")  # "a" použita naposledy – smaže se "b"
+
+    ul.uloz("c", _ceny(3))
+    assert ul.nacti("a") is not None
+    assert ul.nacti("b") is None
+    assert ul.nacti("c") is not None
+
+def test_stare_nedokoncene_soubory_se_smazou(tmp_path):
+    ul = UlozisteScenaru(str(tmp_path), max_velikost=2 * VELIKOST + 1000)
+    ul.uloz("a", _ceny(1))
+    stary_tmp = ul.cesta_docasna("x").replace(str(os.getpid()), "1")
+    np.save(stary_tmp, _ceny(4))
+    sirotek = os.path.join(str(tmp_path), "y.npy")  # data bez metadat
+    np.save(sirotek, _ceny(5))
+    for cesta in (stary_tmp, sirotek):
+        _zestarni(cesta, time.time() - uloziste.ZACATEK_PROCESU + 60)
+
+    ul.uloz("b", _ceny(2))
+    assert not os.path.exists(stary_tmp) and not os.path.exists(sirotek)
+    assert ul.nacti("a") is not None and ul.nacti("b") is not None
+
+def test_rozpracovane_soubory_se_pocitaji_do_limitu(tmp_path):
+    """Soubor rozpracovaný jiným běžícím procesem se nesmaže, ale zabírá místo."""
+    ul = UlozisteScenaru(str(tmp_path), max_velikost=2 * VELIKOST + 1000)
+    ul.uloz("a", _ceny(1))
+    rozpracovany = ul.cesta_docasna("x").replace(str(os.getpid()), "1")
+    np.save(rozpracovany, _ceny(4))
+
+    ul.uloz("b", _ceny(2))
+    assert os.path.exists(rozpracovany)
+    assert ul.nacti("a") is None
+    assert ul.nacti("b") is not None
+
+def test_mezipamet_poskozena_polozka_se_spocita_znovu(tmp_path):
+    mezipamet = MezipametBehu(str(tmp_path))
+    klic = mezipamet.klic("etapa", 1, "x")
+    assert mezipamet.ziskej(klic, lambda: {"hodnota": 1}) == {"hodnota": 1}
+    assert mezipamet.ziskej(klic, lambda: {"hodnota": 2}) == {"hodnota": 1}
+
+    cesta_dat, _ = mezipamet._cesty(klic)
+    with open(cesta_dat, "r+b") as f:
+        f.truncate(3)
+    assert mezipamet.ziskej(klic, lambda: {"hodnota": 3}) == {"hodnota": 3}
+    assert (mezipamet.zasahy, mezipamet.vypocty) == (1, 2)
@@ -0,0 +1,55 @@
+# testy/test_vesmir_aktiv.py
+#
+# Sjednocení více portfolií do společného vesmíru aktiv: korelace dvojic aktiv ze zadaných matic,
+# jednofaktorové odhady jen pro dvojice, které žádná matice nepokrývá.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import numpy as np
+import pytest
+
+from portfolio import Portfolio, nacti_portfolio, sjednot_portfolia
+
+def _portfolio(nazvy, korelace, korelacni_matice=None):
+    return Portfolio(nazvy, ["akcie"] * len(nazvy), [100.0] * len(nazvy), [1 / len(nazvy)] * len(nazvy),
+                     korelace, korelacni_matice=korelacni_matice)
+
+def test_zadana_matice_ma_prednost_pred_odhadem():
+    """Matice pozdějšího portfolia přepíše jednofaktorový odhad dřívějšího portfolia bez matice."""
+    bez_matice = _portfolio(["A", "B", "C"], [0.2, 0.2, 0.1])
+    zadana = np.array([[1.0, -0.2, 0.1], [-0.2, 1.0, 0.3], [0.1, 0.3, 1.0]])
+    s_matici = _portfolio(["A", "B", "C"], [0.6, 0.5, 0.2], korelacni_matice=zadana)
+
+    vesmir, indexy = sjednot_portfolia([bez_matice, s_matici])
+    np.testing.assert_allclose(vesmir.korelacni_matice, zadana)
+    np.testing.assert_array_equal(indexy[1], [0, 1, 2])
+
+def test_odhad_jen_pro_chybejici_dvojice():
+    zadana = np.array([[1.0, -0.5], [-0.5, 1.0]])
+    prvni = _portfolio(["A", "B"], [0.5, 0.4], korelacni_matice=zadana)
+    druhe = _portfolio(["B", "C"], [0.3, 0.6])
+
+    matice = sjednot_portfolia([druhe, prvni])[0].korelacni_matice  # vesmír B, C, A
+    assert matice[2, 0] == pytest.approx(-0.5)       # A-B ze zadané matice
+    assert matice[0, 1] == pytest.approx(0.3 * 0.6)  # B-C odhad druhého portfolia
+    assert matice[1, 2] == pytest.approx(0.6 * 0.5)  # C-A korelace s indexem
+
+def test_nesouhlasici_matice_varuji(capsys):
+    prvni = _portfolio(["A", "B"], [0.5, 0.4], korelacni_matice=np.array([[1.0, 0.2], [0.2, 1.0]]))
+    druhe = _portfolio(["A", "B"], [0.5, 0.4], korelacni_matice=np.array([[1.0, 0.7], [0.7, 1.0]]))
+
+    matice = sjednot_portfolia([prvni, druhe])[0].korelacni_matice
+    assert "liší" in capsys.readouterr().out
+    assert matice[0, 1] == pytest.approx(0.2)
+
+def test_dodana_portfolia_pouziji_matici_rizikoveho():
+    konzervativni = nacti_portfolio(os.path.join(KOREN, "portfolio_konzervativni.csv"))
+    rizikove = nacti_portfolio(os.path.join(KOREN, "portfolio_rizikove.csv"))
+    vesmir, _ = sjednot_portfolia([konzervativni, rizikove])
+    np.testing.assert_allclose(vesmir.korelacni_matice, rizikove.korelacni_matice)
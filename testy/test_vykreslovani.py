@@ -0,0 +1,63 @@
+# testy/test_vykreslovani.py
+#
+# Fronta grafů: přeskočení nezměněných grafů podle manifestu a nové vykreslení po změně kódu grafů.
+#
+#   python -m pytest -q testy
+
+import os
+import sys
+
+KOREN = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, KOREN)
+
+import pytest
+
+import vykreslovani
+from vykreslovani import Vykreslovani
+
+@pytest.fixture
+def vykreslene(tmp_path, monkeypatch):
+    """Místo matplotlibu jen zapíše soubor grafu; vrací seznam vykreslených grafů."""
+    seznam = []
+
+    def _vykresli(nazev_funkce, dpi, format, max_bodu, args, kwargs):
+        cesta = os.path.join(str(tmp_path), f"{kwargs['prefix']}_{nazev_funkce}.{format}")
+        with open(cesta, "w") as f:
+            f.write("graf")
+        seznam.append(nazev_funkce)
+        return cesta
+
+    monkeypatch.setattr(vykreslovani, "_vykresli", _vykresli)
+    return seznam
+
+def _vykresli_vyvoj(manifest, vyvoj):
+    with Vykreslovani(pocet_procesu=1, soubor_manifestu=manifest) as fronta:
+        fronta.pridej("vykresli_vyvoj_portfolia", vyvoj, prefix="test")
+
+def test_nezmeneny_graf_se_preskoci(tmp_path, vykreslene):
+    manifest = os.path.join(str(tmp_path), "manifest.json")
+    _vykresli_vyvoj(manifest, [1.0, 2.0, 3.0])
+    _vykresli_vyvoj(manifest, [1.0, 2.0, 3.0])
+    assert len(vykreslene) == 1
+
+    _vykresli_vyvoj(manifest, [1.0, 2.0, 4.0])
+    assert len(vykreslene) == 2
+
+def test_zmena_kodu_grafu_vykresli_znovu(tmp_path, vykreslene, monkeypatch):
+    manifest = os.path.join(str(tmp_path), "manifest.json")
+    _vykresli_vyvoj(manifest, [1.0, 2.0, 3.0])
+
+    monkeypatch.setattr(vykreslovani, "verze_kodu_grafu", lambda slozka=None: "upraveny kod")
+    _vykresli_vyvoj(manifest, [1.0, 2.0, 3.0])
+    assert len(vykreslene) == 2
+
+def test_verze_kodu_grafu_zavisi_na_grafy_py(tmp_path):
+    for soubor in vykreslovani.SOUBORY_KODU_GRAFU:
+        with open(os.path.join(KOREN, soubor), "rb") as zdroj, open(os.path.join(str(tmp_path), soubor), "wb") as cil:
+            cil.write(zdroj.read())
+    puvodni = vykreslovani.verze_kodu_grafu(str(tmp_path))
+    assert puvodni == vykreslovani.verze_kodu_grafu(KOREN)
+
+    with open(os.path.join(str(tmp_path), "grafy.py"), "ab") as f:
+        f.write(b"\n# zmena\n")
+    assert vykreslovani.verze_kodu_grafu(str(tmp_path)) != puvodni
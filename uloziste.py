@@ -0,0 +1,242 @@
+# uloziste.py
+
+import hashlib
+import json
+import os
+import time
+import numpy as np
+
+VERZE_ULOZISTE = 1  # změna formátu nebo generování cen zneplatní všechny uložené scénáře
+ZACATEK_PROCESU = time.time()  # nedokončené soubory starší než tento proces zůstaly po přerušeném běhu
+
+# ========================
+# KLÍČ SCÉNÁŘŮ
+# ========================
+
+def _pridej_do_hashe(h, hodnota):
+    """Přidá hodnotu (číslo, text, pole, seznam, slovník, objekt se __slots__) do hashe deterministicky podle obsahu."""
+    if isinstance(hodnota, dict):
+        h.update(b"{")
+        for klic in sorted(hodnota):
+            _pridej_do_hashe(h, klic)
+            _pridej_do_hashe(h, hodnota[klic])
+        h.update(b"}")
+    elif isinstance(hodnota, (list, tuple)):
+        h.update(b"[")
+        for prvek in hodnota:
+            _pridej_do_hashe(h, prvek)
+        h.update(b"]")
+    elif isinstance(hodnota, np.ndarray):
+        pole = np.ascontiguousarray(hodnota)
+        h.update(f"ndarray{pole.dtype.str}{pole.shape}".encode())
+        h.update(pole.tobytes())
+    elif hasattr(type(hodnota), "__slots__"):
+        # Objekty se __slots__ (např. portfolio.Portfolio) podle obsahu všech polí
+        h.update(type(hodnota).__name__.encode())
+        _pridej_do_hashe(h, {pole: getattr(hodnota, pole, None) for pole in type(hodnota).__slots__})
+    else:
+        h.update(repr(hodnota).encode())
+
+def hash_obsahu(*hodnoty):
+    """SHA-256 (hex) ze všech zadaných hodnot."""
+    h = hashlib.sha256()
+    for hodnota in hodnoty:
+        _pridej_do_hashe(h, hodnota)
+    return h.hexdigest()
+
+def popis_seedu(seed):
+    """
+    Deterministický popis SeedSequence (nebo seznamu SeedSequence) pro klíč uložiště.
+    Vrací None pro náhodnou inicializaci bez seedu – takové scénáře nemá smysl ukládat.
+    """
+    if isinstance(seed, (list, tuple)):
+        popisy = [popis_seedu(s) for s in seed]
+        return None if any(p is None for p in popisy) else popisy
+    if seed is None:
+        return None
+    if isinstance(seed, np.random.Generator):
+        return {"stav": seed.bit_generator.state}
+    if not isinstance(seed, np.random.SeedSequence):
+        seed = np.random.SeedSequence(seed)
+    return {"entropie": seed.entropy, "spawn_key": list(seed.spawn_key), "potomci": seed.n_children_spawned}
+
+def klic_scenaru(model, parametry, portfolio, pocet_dni, pocet_scenaru, seed, *dalsi):
+    """
+    Klíč scénářů cen: hash modelu (včetně jeho nastavení), parametrů aktiv, počátečních cen,
+    horizontu, počtu scénářů a seedu. Vrací None, pokud scénáře nejsou opakovatelné (bez seedu).
+    """
+    popis = popis_seedu(seed)
+    if popis is None:
+        return None
+    nastaveni_modelu = {
+        k: v for k, v in vars(type(model)).items()
+        if not k.startswith("_") and not callable(v) and not isinstance(v, (staticmethod, classmethod))
+    }
+    return hash_obsahu(
+        VERZE_ULOZISTE, np.__version__, model.nazev, nastaveni_modelu, parametry,
+        portfolio.nazvy, portfolio.pocatecni_ceny, pocet_dni, pocet_scenaru, popis, list(dalsi)
+    )
+
+# ========================
+# ÚLOŽIŠTĚ
+# ========================
+
+class UlozisteScenaru:
+    """
+    Úložiště vygenerovaných tenzorů cen na disku. Každá položka je soubor <klic>.npy
+    (otevírá se přes mmap, takže se do paměti nenačítá celý) a metadata <klic>.json.
+    Při otevření se kontroluje hlavička .npy proti metadatům (verze, tvar, typ, velikost souboru);
+    poškozená položka se smaže. Celková velikost je omezena `max_velikost` bajtů,
+    při překročení se mažou nejdéle nepoužité položky (LRU podle času posledního použití).
+    Do obsazeného místa se počítají i nedokončené soubory (*.tmp*, data bez metadat); ty,
+    které zbyly po dřívějším přerušeném běhu, se při uvolňování místa smažou.
+    """
+
+    PRIPONA_DAT = ".npy"
+
+    def __init__(self, slozka="cache_scenaru", max_velikost=2 * 1024 ** 3):
+        self.slozka = slozka
+        self.max_velikost = max_velikost
+        os.makedirs(slozka, exist_ok=True)
+
+    def _cesty(self, klic):
+        zaklad = os.path.join(self.slozka, klic)
+        return zaklad + self.PRIPONA_DAT, zaklad + ".json"
+
+    def cesta_docasna(self, klic):
+        """Cesta k rozpracovanému souboru položky (před dokonci)."""
+        return os.path.join(self.slozka, f"{klic}.{os.getpid()}.tmp{self.PRIPONA_DAT}")
+
+    def nacti(self, klic):
+        """
+        Otevře uložené ceny pro klíč jen pro čtení přes mmap. Vrací (ceny, metadata),
+        nebo None, pokud položka neexistuje nebo neprošla kontrolou hlavičky.
+        """
+        if klic is None:
+            return None
+        cesta_dat, cesta_meta = self._cesty(klic)
+        if not (os.path.exists(cesta_dat) and os.path.exists(cesta_meta)):
+            return None
+        try:
+            with open(cesta_meta, encoding="utf-8") as f:
+                metadata = json.load(f)
+            self._over_hlavicku(cesta_dat, klic, metadata)
+            ceny = np.load(cesta_dat, mmap_mode="r")
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Pozor: uložené scénáře '{klic[:12]}' jsou poškozené ({e}) – vygenerují se znovu.")
+            self.smaz(klic)
+            return None
+
+        # Poslední použití pro LRU
+        os.utime(cesta_meta)
+        return ceny, metadata
+
+    def _over_hlavicku(self, cesta_dat, klic, metadata):
+        """Ověří, že hlavička .npy a velikost souboru odpovídají metadatům."""
+        if metadata.get("verze") != VERZE_ULOZISTE or metadata.get("klic") != klic:
+            raise ValueError("nesouhlasí verze nebo klíč")
+        with open(cesta_dat, "rb") as f:
+            verze = np.lib.format.read_magic(f)
+            if verze == (1, 0):
+                tvar, fortran, typ = np.lib.format.read_array_header_1_0(f)
+            else:
+                tvar, fortran, typ = np.lib.format.read_array_header_2_0(f)
+            zacatek_dat = f.tell()
+        if list(tvar) != metadata["tvar"] or typ.str != metadata["typ"] or fortran:
+            raise ValueError("hlavička neodpovídá metadatům")
+        if os.path.getsize(cesta_dat) != zacatek_dat + int(np.prod(tvar)) * typ.itemsize:
+            raise ValueError("neúplný soubor")
+
+    def vytvor(self, klic, tvar):
+        """
+        Vytvoří rozpracovanou položku a vrátí cestu k souboru .npy daného tvaru (float64),
+        do kterého lze zapisovat i z jiných procesů (np.load(..., mmap_mode='r+')).
+        Položka je viditelná až po zavolání dokonci().
+        """
+        self._uvolni_misto(int(np.prod(tvar)) * 8)
+        cesta = self.cesta_docasna(klic)
+        pole = np.lib.format.open_memmap(cesta, mode="w+", dtype=np.float64, shape=tuple(tvar))
+        del pole
+        return cesta
+
+    def dokonci(self, klic, cesta, metadata=None):
+        """Zveřejní rozpracovanou položku: přejmenuje data a zapíše metadata (jako poslední)."""
+        cesta_dat, cesta_meta = self._cesty(klic)
+        ceny = np.load(cesta, mmap_mode="r")
+        zaznam = dict(metadata or {})
+        zaznam.update({
+            "verze": VERZE_ULOZISTE, "klic": klic, "tvar": list(ceny.shape),
+            "typ": ceny.dtype.str, "vytvoreno": time.time()
+        })
+        del ceny
+        os.replace(cesta, cesta_dat)
+        with open(cesta_meta + ".tmp", "w", encoding="utf-8") as f:
+            json.dump(zaznam, f)
+        os.replace(cesta_meta + ".tmp", cesta_meta)
+        return np.load(cesta_dat, mmap_mode="r")
+
+    def uloz(self, klic, ceny, metadata=None):
+        """Uloží hotové pole cen pod klíč a vrátí ho otevřené přes mmap."""
+        cesta = self.vytvor(klic, np.shape(ceny))
+        cil = np.load(cesta, mmap_mode="r+")
+        cil[...] = ceny
+        cil.flush()
+        del cil
+        return self.dokonci(klic, cesta, metadata)
+
+    def smaz(self, klic):
+        """Odstraní položku (data i metadata)."""
+        for cesta in self._cesty(klic):
+            if os.path.exists(cesta):
+                os.remove(cesta)
+
+    def vymaz(self):
+        """Odstraní všechny položky úložiště."""
+        for soubor in os.listdir(self.slozka):
+            if soubor.endswith((self.PRIPONA_DAT, ".json", ".tmp")):
+                os.remove(os.path.join(self.slozka, soubor))
+
+    def _polozky(self):
+        """
+        Vrací (polozky, nedokoncene): seznam (posledni_pouziti, velikost, klic) dokončených položek
+        a seznam (cas_zmeny, velikost, cesta) souborů mimo ně – rozpracovaných (*.tmp*)
+        a dat bez metadat (zápis přerušený před dokonci()).
+        """
+        soubory = os.listdir(self.slozka)
+        s_metadaty = {soubor[:-len(".json")] for soubor in soubory if soubor.endswith(".json")}
+        polozky, nedokoncene = [], []
+        for soubor in soubory:
+            cesta = os.path.join(self.slozka, soubor)
+            try:
+                info = os.stat(cesta)
+            except OSError:
+                continue  # mezitím smazal jiný proces
+            if soubor.endswith(".json"):
+                cesta_dat, _ = self._cesty(soubor[:-len(".json")])
+                velikost = os.path.getsize(cesta_dat) if os.path.exists(cesta_dat) else 0
+                polozky.append((info.st_mtime, velikost, soubor[:-len(".json")]))
+            elif ".tmp" in soubor or (soubor.endswith(self.PRIPONA_DAT)
+                                      and soubor[:-len(self.PRIPONA_DAT)] not in s_metadaty):
+                nedokoncene.append((info.st_mtime, info.st_size, cesta))
+        return polozky, nedokoncene
+
+    def _uvolni_misto(self, potreba):
+        """
+        Smaže nedokončené soubory starší než tento proces a nejdéle nepoužité položky,
+        aby se nová položka velikosti `potreba` vešla do limitu.
+        """
+        polozky, nedokoncene = self._polozky()
+        polozky.sort()
+        obsazeno = sum(velikost for _, velikost, _ in polozky)
+        for cas_zmeny, velikost, cesta in nedokoncene:
+            if cas_zmeny < ZACATEK_PROCESU:
+                try:
+                    os.remove(cesta)
+                    continue
+                except OSError:
+                    pass
+            obsazeno += velikost  # rozpracovaný zápis jiného běžícího procesu
+        while polozky and obsazeno + potreba > self.max_velikost:
+            _, velikost, klic = polozky.pop(0)
+            self.smaz(klic)
+            obsazeno -= velikost
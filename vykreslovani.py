@@ -0,0 +1,132 @@
+# vykreslovani.py
+
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import mereni
+from uloziste import hash_obsahu
+
+SOUBOR_MANIFESTU = os.path.join("vystupy", ".grafy_manifest.json")
+SOUBORY_KODU_GRAFU = ("grafy.py", "vykreslovani.py")  # změna jejich kódu vykreslí všechny grafy znovu
+
+def verze_kodu_grafu(slozka=None):
+    """Otisk zdrojových kódů, které určují vzhled grafů (SOUBORY_KODU_GRAFU); je součástí otisku grafu."""
+    slozka = slozka or os.path.dirname(os.path.abspath(__file__))
+    h = hashlib.sha256()
+    for soubor in SOUBORY_KODU_GRAFU:
+        h.update(soubor.encode())
+        with open(os.path.join(slozka, soubor), "rb") as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+# ========================
+# ÚLOHY V PRACOVNÍM PROCESU
+# ========================
+
+def _vykresli(nazev_funkce, dpi, format, max_bodu, args, kwargs):
+    """
+    Vykreslí jeden graf funkcí grafy.<nazev_funkce> s daným rozlišením, formátem a počtem bodů křivky.
+    Vrací cestu k souboru.
+    """
+    import grafy
+    grafy.nastav_vystup(dpi=dpi, format=format, max_bodu=max_bodu)
+    return getattr(grafy, nazev_funkce)(*args, **kwargs)
+
+# ========================
+# FRONTA GRAFŮ
+# ========================
+
+class Vykreslovani:
+    """
+    Fronta grafů vykreslovaných mimo obrazovku (matplotlib backend Agg) v procesech na pozadí.
+    Graf se odešle k vykreslení hned při pridej(), takže simulace dalšího portfolia na grafy
+    předchozího nečeká; dokonci() počká na všechny rozpracované grafy.
+
+    Grafy, jejichž vstupy (data, parametry, dpi, formát, počet bodů) ani kód grafů (verze_kodu_grafu)
+    se od posledního vykreslení nezměnily a jejichž soubor stále existuje, se přeskočí.
+    Otisky vstupů se ukládají do SOUBOR_MANIFESTU.
+
+    pocet_procesu -- 0 = všechna jádra, 1 = vykreslovat hned v hlavním procesu
+    max_bodu -- počet bodů, na který se dlouhé křivky zmenší (LTTB); 0 = vykreslit všechny body
+    """
+
+    def __init__(self, pocet_procesu=0, dpi=300, format="png", preskakovat_nezmenene=True,
+                 soubor_manifestu=SOUBOR_MANIFESTU, max_bodu=2000):
+        self.dpi = dpi
+        self.format = format
+        self.max_bodu = max_bodu
+        self.preskakovat_nezmenene = preskakovat_nezmenene
+        self.soubor_manifestu = soubor_manifestu
+        self.manifest = self._nacti_manifest() if preskakovat_nezmenene else {}
+        self.verze_kodu = verze_kodu_grafu() if preskakovat_nezmenene else None
+        self.executor = None
+        if (pocet_procesu or os.cpu_count() or 1) > 1:
+            self.executor = ProcessPoolExecutor(max_workers=pocet_procesu or None)
+        self.rozpracovane = []
+        self.vykresleno = 0
+        self.preskoceno = 0
+
+    def _nacti_manifest(self):
+        try:
+            with open(self.soubor_manifestu, encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _uloz_manifest(self):
+        os.makedirs(os.path.dirname(self.soubor_manifestu), exist_ok=True)
+        with open(self.soubor_manifestu, "w", encoding="utf-8") as f:
+            json.dump(self.manifest, f, indent=1, sort_keys=True)
+
+    def pridej(self, nazev_funkce, *args, **kwargs):
+        """Zařadí graf grafy.<nazev_funkce>(*args, **kwargs) k vykreslení."""
+        identita = hash_obsahu(nazev_funkce, kwargs.get("prefix", ""), kwargs.get("nazev_souboru"),
+                               kwargs.get("vystup"))
+        otisk = None
+        if self.preskakovat_nezmenene:
+            otisk = hash_obsahu(self.verze_kodu, nazev_funkce, args, kwargs, self.dpi, self.format, self.max_bodu)
+            zaznam = self.manifest.get(identita)
+            if zaznam and zaznam["otisk"] == otisk and zaznam["soubor"] and os.path.exists(zaznam["soubor"]):
+                self.preskoceno += 1
+                mereni.pricti("preskocene_grafy")
+                return
+
+        uloha = (nazev_funkce, self.dpi, self.format, self.max_bodu, args, kwargs)
+        if self.executor is None:
+            self._zaznamenej(identita, otisk, _vykresli(*uloha))
+        else:
+            self.rozpracovane.append((identita, otisk, self.executor.submit(_vykresli, *uloha)))
+
+    def _zaznamenej(self, identita, otisk, soubor):
+        self.vykresleno += 1
+        mereni.pricti("vykreslene_grafy")
+        mereni.zapsany_soubor(soubor)
+        if otisk is not None and soubor:
+            self.manifest[identita] = {"otisk": otisk, "soubor": soubor}
+
+    def dokonci(self):
+        """Počká na všechny rozpracované grafy, uloží manifest a ukončí procesy."""
+        for identita, otisk, budoucnost in self.rozpracovane:
+            self._zaznamenej(identita, otisk, budoucnost.result())
+        self.rozpracovane = []
+        if self.executor is not None:
+            self.executor.shutdown()
+            self.executor = None
+        if self.preskakovat_nezmenene:
+            self._uloz_manifest()
+        if self.preskoceno:
+            print(f"Grafy: vykresleno {self.vykresleno}, přeskočeno beze změny {self.preskoceno}.")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.dokonci()
+        return False
+
+def vymaz_manifest(soubor_manifestu=SOUBOR_MANIFESTU):
+    """Zapomene otisky vykreslených grafů – při dalším běhu se vykreslí všechny znovu."""
+    if os.path.exists(soubor_manifestu):
+        os.remove(soubor_manifestu)